@@ -1,19 +1,75 @@
-from django.contrib import admin
+from django.apps import apps
+from django.contrib import admin, messages
+from django.db.models import Exists, OuterRef, Subquery
 from .models import (
     Course,
     Group,
+    GroupMembership,
     Homework,
     HomeworkSubmission,
     Lesson,
     User,
 )
+from .pagination import EstimatedCountPaginator
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
 
+class ActiveModelAdmin(admin.ModelAdmin):
+    """
+    Base admin for ``ActiveModel`` models.
+
+    Adds actions that deactivate or activate the selected rows together with
+    the rows that depend on them, e.g. a course with its lessons, homework,
+    groups, memberships and submissions.
+    """
+
+    actions = ("deactivate_selected", "activate_selected")
+
+    def _set_active(self, request, queryset, is_active, verb):
+        counts = queryset.set_active(is_active)
+        changed = [
+            f"{count} {apps.get_model(label)._meta.verbose_name_plural}"
+            for label, count in counts.items()
+            if count
+        ]
+        if changed:
+            self.message_user(
+                request,
+                _("%(verb)s: %(rows)s.") % {"verb": verb, "rows": ", ".join(changed)},
+            )
+        else:
+            self.message_user(request, _("Nothing to change."), messages.WARNING)
+
+    @admin.action(description=_("Deactivate selected %(verbose_name_plural)s"))
+    def deactivate_selected(self, request, queryset):
+        """Deactivate the selected rows and everything that belongs to them."""
+        self._set_active(request, queryset, False, _("Deactivated"))
+
+    @admin.action(description=_("Activate selected %(verbose_name_plural)s"))
+    def activate_selected(self, request, queryset):
+        """Activate the selected rows and everything that belongs to them."""
+        self._set_active(request, queryset, True, _("Activated"))
+
+
+class LargeTableAdmin(ActiveModelAdmin):
+    """
+    Base admin for tables that grow to millions of rows.
+
+    The changelist estimates the number of rows of the unfiltered table
+    and does not count the whole table next to filtered results.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 class UserAdmin(BaseUserAdmin):
     """Define admin model for custom User model."""
 
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     list_display = (
         "email",
         "first_name",
@@ -69,15 +125,17 @@ class UserAdmin(BaseUserAdmin):
         super().save_model(request, obj, form, change)
 
 
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(ActiveModelAdmin):
     """Admin interface for the Lesson model."""
 
     list_display = ("title", "course", "scheduled_time", "is_active")
     search_fields = ("title", "course__title")
     list_filter = ("course", "scheduled_time", "is_active")
+    list_select_related = ("course",)
+    autocomplete_fields = ("course",)
 
 
-class HomeworkAdmin(admin.ModelAdmin):
+class HomeworkAdmin(LargeTableAdmin):
     """Admin interface for the Homework model."""
 
     list_display = (
@@ -90,11 +148,15 @@ class HomeworkAdmin(admin.ModelAdmin):
         "is_late",
     )
     search_fields = ("title", "submitted_by__email")
+    # Filtering by user would list every user in the sidebar; search by
+    # e-mail instead.
     list_filter = (
-        "submitted_by",
         "is_active",
         "due_date",
     )
+    # The lesson is used by Homework.__str__.
+    list_select_related = ("course", "lesson", "submitted_by")
+    autocomplete_fields = ("course", "lesson", "submitted_by")
 
     def is_late(self, obj):
         """Return whether the homework is submitted late."""
@@ -104,7 +166,7 @@ class HomeworkAdmin(admin.ModelAdmin):
     is_late.short_description = "Late Submission"
 
 
-class HomeworkSubmissionAdmin(admin.ModelAdmin):
+class HomeworkSubmissionAdmin(LargeTableAdmin):
     """Admin interface for the Homework Submission model."""
 
     list_display = (
@@ -115,25 +177,59 @@ class HomeworkSubmissionAdmin(admin.ModelAdmin):
     )
     search_fields = ("homework__title", "student__email")
     list_filter = ("submission_date", "grade")
+    # Homework.__str__ shows the title of its lesson.
+    list_select_related = ("homework__lesson", "student")
+    autocomplete_fields = ("homework", "student")
 
 
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(ActiveModelAdmin):
     list_display = ("title", "teacher", "state")
     search_fields = ("title", "teacher__email")
-    list_filter = ("teacher", "state")
+    list_filter = ("state",)
+    list_select_related = ("teacher",)
+    autocomplete_fields = ("teacher", "groups", "lessons")
 
 
-class GroupAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "get_teacher")
-    search_fields = ("name", "memberships__user__email")
-    list_filter = ("groupmembership__role",)
+class HasTeacherFilter(admin.SimpleListFilter):
+    """Filter groups by whether a teacher is assigned to them."""
 
-    def get_teacher(self, obj):
-        """Return the teacher of the group."""
-        teacher = obj.memberships.filter(groupmembership__role="teacher").first()
-        return teacher.user if teacher else None
+    title = _("teacher assigned")
+    parameter_name = "has_teacher"
+
+    def lookups(self, request, model_admin):
+        return (("yes", _("Yes")), ("no", _("No")))
 
-    get_teacher.short_description = "Teacher"
+    def queryset(self, request, queryset):
+        teachers = GroupMembership.objects.filter(group=OuterRef("pk"), role="teacher")
+        if self.value() == "yes":
+            return queryset.filter(Exists(teachers))
+        if self.value() == "no":
+            return queryset.filter(~Exists(teachers))
+        return queryset
+
+
+class GroupAdmin(ActiveModelAdmin):
+    list_display = ("id", "name", "course", "get_teacher")
+    search_fields = ("name", "memberships__email")
+    list_filter = ("is_active", HasTeacherFilter)
+    list_select_related = ("course",)
+    autocomplete_fields = ("course",)
+
+    def get_queryset(self, request):
+        """Annotate each group with the e-mail of its first teacher."""
+        teachers = GroupMembership.objects.filter(
+            group=OuterRef("pk"), role="teacher"
+        ).order_by("id")
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(teacher_email=Subquery(teachers.values("user__email")[:1]))
+        )
+
+    @admin.display(description="Teacher", ordering="teacher_email")
+    def get_teacher(self, obj):
+        """Return the e-mail of the teacher of the group."""
+        return obj.teacher_email
 
 
 admin.site.register(Group, GroupAdmin)
@@ -4,3 +4,28 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.core.checks import Tags, register
+        from django.db.models.signals import post_save
+
+        from . import (
+            backends,
+            calendar,
+            checks,
+            instrumentation,
+            storage,
+            thumbnails,
+            transitions,
+        )
+        from .models import ChunkedUpload, Homework, HomeworkSubmission
+
+        register(checks.check_shared_cache, Tags.caches)
+        instrumentation.install()
+        backends.track_permission_changes()
+        calendar.track_calendar_changes()
+        storage.track_references(Homework, HomeworkSubmission, ChunkedUpload)
+        post_save.connect(thumbnails.schedule_on_save, sender=HomeworkSubmission)
+        transitions.course_state_changed.connect(
+            transitions.remind_started_courses, dispatch_uid="remind_started_courses"
+        )
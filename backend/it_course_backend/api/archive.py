@@ -0,0 +1,299 @@
+"""
+Archival of completed courses.
+
+``archive_course()`` moves a completed course and every row that belongs to
+it (groups, memberships, lesson series, lessons, homework, submissions and
+the course's many-to-many rows) out of the live tables into
+``ArchivedRecord`` rows, in one transaction per course. The live tables and
+their indexes then only hold courses that are still in use.
+``restore_course()`` puts the rows back with their original IDs.
+
+Archived rows keep the blobs of their files referenced, so
+``collect_blobs`` does not remove the files of archived submissions.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .calendar import invalidate_calendars
+from .models import (
+    ArchivedCourse,
+    ArchivedRecord,
+    Course,
+    Group,
+    GroupMembership,
+    Homework,
+    HomeworkSubmission,
+    Lesson,
+    LessonSeries,
+    User,
+)
+from .storage import adjust_references, blob_fields
+
+BATCH_SIZE = 1000
+
+
+class ArchiveError(Exception):
+    """Raised when a course cannot be archived or restored."""
+
+
+def course_querysets(course_id):
+    """
+    Return querysets of the rows of a course, in the order they are inserted.
+
+    Deleting the course cascades to all of these rows.
+    """
+    lessons = Lesson.objects.filter(course_id=course_id)
+    groups = Group.objects.filter(course_id=course_id)
+    homework = Homework.objects.filter(
+        Q(course_id=course_id) | Q(lesson_id__in=lessons.values("pk"))
+    )
+    return [
+        Course.objects.filter(pk=course_id),
+        groups,
+        GroupMembership.objects.filter(group_id__in=groups.values("pk")),
+        LessonSeries.objects.filter(course_id=course_id),
+        lessons,
+        homework,
+        HomeworkSubmission.objects.filter(homework_id__in=homework.values("pk")),
+        Course.groups.through.objects.filter(
+            Q(course_id=course_id) | Q(group_id__in=groups.values("pk"))
+        ),
+        Course.lessons.through.objects.filter(
+            Q(course_id=course_id) | Q(lesson_id__in=lessons.values("pk"))
+        ),
+    ]
+
+
+def archived_models():
+    """Return the archived models, in the order their rows are inserted."""
+    return [queryset.model for queryset in course_querysets(None)]
+
+
+def stored_fields(model):
+    """Return the fields whose values are archived; generated ones are not."""
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if not getattr(field, "generated", False)
+    ]
+
+
+def archivable_courses(older_than):
+    """
+    Return the completed courses that have had no lesson for ``older_than``.
+
+    Courses without lessons count from their start date.
+
+    Args:
+        older_than (timedelta): The retention window.
+    """
+    cutoff = timezone.now() - older_than
+    return (
+        Course.objects.filter(state="completed")
+        .annotate(last_lesson=Max("lesson__scheduled_time"))
+        .filter(
+            Q(last_lesson__lt=cutoff)
+            | Q(last_lesson__isnull=True, start_date__lt=cutoff.date())
+        )
+    )
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def archive_course(course_id, batch_size=BATCH_SIZE):
+    """
+    Move a completed course and its rows into the archive tables.
+
+    Args:
+        course_id (int): ID of the course.
+        batch_size (int): Rows read and written per query.
+
+    Returns:
+        Counter: Number of archived rows per model label.
+
+    Raises:
+        ArchiveError: If the course does not exist or is not completed.
+    """
+    with transaction.atomic():
+        course = Course.objects.select_for_update().filter(pk=course_id).first()
+        if course is None or course.state != "completed":
+            raise ArchiveError(f"Course {course_id} is not a completed course.")
+
+        archived = ArchivedCourse.objects.create(
+            id=course.pk, title=course.title, teacher_id=course.teacher_id
+        )
+        counts = Counter()
+        files = []
+        for queryset in course_querysets(course.pk):
+            model = queryset.model
+            label = model._meta.label_lower
+            attnames = [field.attname for field in stored_fields(model)]
+            file_attnames = [field.attname for field in blob_fields(model)]
+            rows = queryset.order_by("pk").values(*attnames)
+            records = (
+                ArchivedRecord(
+                    course=archived,
+                    model=label,
+                    object_id=row["id"],
+                    data=row,
+                    files=[row[name] for name in file_attnames if row[name]],
+                )
+                for row in rows.iterator(chunk_size=batch_size)
+            )
+            for batch in _batches(records, batch_size):
+                ArchivedRecord.objects.bulk_create(batch)
+                counts[label] += len(batch)
+                files.extend(name for record in batch for name in record.files)
+
+        # Deleting releases the blob references of the live rows; the
+        # archived rows take them over.
+        course.delete()
+        adjust_references(files, 1)
+        invalidate_calendars([course_id])
+    return counts
+
+
+def restore_course(course_id, batch_size=BATCH_SIZE):
+    """
+    Move an archived course back into the live tables with its original IDs.
+
+    Args:
+        course_id (int): ID of the archived course.
+        batch_size (int): Rows written per query.
+
+    Returns:
+        Counter: Number of restored rows per model label.
+
+    Raises:
+        ArchiveError: If the course is not archived or its ID is in use.
+    """
+    with transaction.atomic():
+        archived = (
+            ArchivedCourse.objects.select_for_update().filter(pk=course_id).first()
+        )
+        if archived is None:
+            raise ArchiveError(f"Course {course_id} is not archived.")
+        if Course.objects.filter(pk=course_id).exists():
+            raise ArchiveError(f"A live course with ID {course_id} exists.")
+
+        counts = Counter()
+        for model in archived_models():
+            label = model._meta.label_lower
+            fields = stored_fields(model)
+            records = archived.records.filter(model=label).order_by("object_id")
+            # Fields added after a course was archived take their default.
+            objects = (
+                model(
+                    **{
+                        field.attname: field.to_python(
+                            record.data.get(field.attname, field.get_default())
+                        )
+                        for field in fields
+                    }
+                )
+                for record in records.iterator(chunk_size=batch_size)
+            )
+            for batch in _batches(objects, batch_size):
+                # A raw insert keeps auto_now values such as submission
+                # dates and sends no signals, so the blob references move
+                # from the archived rows to the restored ones unchanged.
+                model._base_manager._insert(
+                    batch, fields=fields, using=archived._state.db, raw=True
+                )
+                counts[label] += len(batch)
+
+        archived.delete()
+        # The raw inserts send no post_save.
+        invalidate_calendars([course_id])
+    return counts
+
+
+def gradebook(archived):
+    """
+    Build the gradebook of an archived course.
+
+    Returns:
+        dict: The course, its homework ordered by due date, and one row per
+        student with their grades and average grade.
+    """
+    labels = [
+        model._meta.label_lower
+        for model in (GroupMembership, Homework, HomeworkSubmission)
+    ]
+    rows = {label: [] for label in labels}
+    for label, data in archived.records.filter(model__in=labels).values_list(
+        "model", "data"
+    ):
+        rows[label].append(data)
+
+    homework = sorted(
+        rows["api.homework"], key=lambda item: (item["due_date"], item["id"])
+    )
+    student_ids = {
+        item["user_id"]
+        for item in rows["api.groupmembership"]
+        if item["role"] == "student"
+    }
+    grades = {}
+    for item in rows["api.homeworksubmission"]:
+        student_ids.add(item["student_id"])
+        grades.setdefault(item["student_id"], []).append(
+            {
+                "homework": item["homework_id"],
+                "grade": item["grade"],
+                "submitted_at": item["submission_date"],
+            }
+        )
+
+    users = User.objects.in_bulk(student_ids)
+    students = []
+    for student_id in sorted(
+        student_ids, key=lambda pk: users[pk].email if pk in users else ""
+    ):
+        entries = sorted(grades.get(student_id, []), key=lambda e: e["homework"])
+        graded = [entry["grade"] for entry in entries if entry["grade"] is not None]
+        students.append(
+            {
+                "id": student_id,
+                "email": users[student_id].email if student_id in users else None,
+                "grades": entries,
+                "average": round(sum(graded) / len(graded), 2) if graded else None,
+            }
+        )
+
+    return {
+        "course": {
+            "id": archived.pk,
+            "title": archived.title,
+            "teacher": archived.teacher_id,
+            "archived_at": archived.archived_at,
+        },
+        "homework": [
+            {"id": item["id"], "title": item["title"], "due_date": item["due_date"]}
+            for item in homework
+        ],
+        "students": students,
+    }
+
+
+def staff_ids(archived):
+    """Return the IDs of the teacher and the teachers and assistants of groups."""
+    ids = {archived.teacher_id} if archived.teacher_id else set()
+    memberships = archived.records.filter(
+        model=GroupMembership._meta.label_lower,
+        data__role__in=["teacher", "assistant"],
+    ).values_list("data__user_id", flat=True)
+    return ids | set(memberships)
@@ -2,9 +2,18 @@
 This module contains custom authentication backends for the IT course application.
 """
 
+import uuid
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group as AuthGroup, Permission
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from allauth.account.auth_backends import AuthenticationBackend
 
+PERMISSION_VERSION_KEY = "permissions:version"
+
 
 class EmailBackend(AuthenticationBackend):
     """
@@ -32,3 +41,68 @@ class EmailBackend(AuthenticationBackend):
         if user.check_password(password):
             return user
         return None
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that caches permission sets across requests.
+
+    ``ModelBackend`` keeps a user's permissions on the user object, which
+    lives for one request, so every request that checks a model permission
+    runs the permission queries again. This backend also stores the sets in
+    the cache for ``PERMISSION_CACHE_TIMEOUT`` seconds. Any change to
+    permissions or auth group memberships drops all cached sets (see
+    ``track_permission_changes``); with a per-process cache, other processes
+    see the change once their entries expire.
+    """
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        perm_cache_name = f"_{from_name}_perm_cache"
+        if (
+            obj is not None
+            or not user_obj.is_active
+            or user_obj.is_anonymous
+            or hasattr(user_obj, perm_cache_name)
+        ):
+            return super()._get_permissions(user_obj, obj, from_name)
+
+        key = permission_cache_key(user_obj, from_name)
+        perms = cache.get(key)
+        if perms is None:
+            perms = super()._get_permissions(user_obj, obj, from_name)
+            cache.set(key, perms, settings.PERMISSION_CACHE_TIMEOUT)
+        setattr(user_obj, perm_cache_name, perms)
+        return perms
+
+
+def permission_cache_key(user, from_name):
+    """Return the cache key of a user's ``user`` or ``group`` permissions."""
+    version = cache.get_or_set(PERMISSION_VERSION_KEY, uuid.uuid4().hex, None)
+    return f"permissions:{version}:{from_name}:{user.pk}:{user.is_superuser:d}"
+
+
+def invalidate_permission_cache(**kwargs):
+    """Drop all cached permission sets."""
+    cache.set(PERMISSION_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def track_permission_changes():
+    """Invalidate cached permission sets when permissions change."""
+    user_model = get_user_model()
+    for through in (
+        user_model.user_permissions.through,
+        user_model.groups.through,
+        AuthGroup.permissions.through,
+    ):
+        m2m_changed.connect(
+            invalidate_permission_cache,
+            sender=through,
+            dispatch_uid=f"invalidate_permissions_{through._meta.label}",
+        )
+    for model in (AuthGroup, Permission):
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_permission_cache,
+                sender=model,
+                dispatch_uid=f"invalidate_permissions_{model._meta.label}",
+            )
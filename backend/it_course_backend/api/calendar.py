@@ -0,0 +1,310 @@
+"""
+Lesson calendars.
+
+Calendars are read month by month. The lessons a user sees in a month are
+cached per user and month under the user's calendar version, which combines
+the IDs and versions of the courses the user teaches or is an active member
+of. A course's version changes when the transaction commits that saves,
+deletes or switches on or off one of its lessons (see
+``track_calendar_changes()``), creates or edits a lesson series or archives
+or restores the course; only its teacher and group members get new months.
+Joining or leaving a course, or a group or membership being switched off,
+changes the user's courses and so the version. A range is answered from the
+months it overlaps; months missing from the cache are loaded with one query
+over sargable ``scheduled_time`` bounds.
+
+The versions only reach other processes through a shared cache, so
+production must use Redis or Memcached (see ``REDIS_URL`` and the
+``api.E001`` check). Even then a month can be stale: it is read from the
+old version until the commit's ``on_commit`` callback has run, and changes
+that bypass the signals, such as ``QuerySet.update()`` or raw SQL, are not
+seen until ``invalidate_calendars()`` is called with their courses or the
+entry expires after ``CALENDAR_CACHE_TIMEOUT``.
+
+Calendar apps subscribe to an iCalendar feed at a URL with a per-user
+token instead of a JWT. The token is derived from the user's password hash,
+so changing the password revokes it. The feed's ETag depends only on the
+calendar version, the user and the day, so polls of an unchanged calendar
+are answered with ``304 Not Modified`` without building it.
+"""
+
+import datetime
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Course, Lesson, User, active_membership, active_state_changed
+from .serializers import LessonCalendarValuesSerializer
+
+COURSE_VERSION_KEY = "calendar:course:{}"
+
+
+def calendar_course_ids(user):
+    """Return the IDs of the courses whose lessons ``user`` sees, in order."""
+    return list(
+        Course.objects.filter(Q(teacher=user) | active_membership(user, "groups__"))
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+
+
+def calendar_version(user):
+    """
+    Return the current calendar version of ``user``.
+
+    Costs one query for the user's courses and one cache read for their
+    versions.
+    """
+    keys = [COURSE_VERSION_KEY.format(pk) for pk in calendar_course_ids(user)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = cache.get_or_set(key, uuid.uuid4().hex, None)
+    state = ",".join(f"{key}={versions[key]}" for key in keys)
+    return hashlib.md5(state.encode()).hexdigest()
+
+
+def invalidate_calendars(course_ids):
+    """
+    Start new versions of courses once the current transaction commits.
+
+    Only the calendars of the teachers and group members of the courses
+    change; other users keep their cached months.
+
+    Args:
+        course_ids (Iterable[int]): IDs of the courses; None is skipped.
+    """
+    keys = {COURSE_VERSION_KEY.format(pk) for pk in course_ids if pk is not None}
+    if keys:
+        transaction.on_commit(
+            lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+        )
+
+
+def _remember_course(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the course a saved lesson may be moved away from."""
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"course", "course_id"} & update_fields:
+        return
+    instance._calendar_course_ids = list(
+        Lesson.objects.filter(pk=instance.pk).values_list("course_id", flat=True)
+    )
+
+
+def _invalidate_lesson(sender, instance, **kwargs):
+    previous = instance.__dict__.pop("_calendar_course_ids", [])
+    invalidate_calendars([instance.course_id, *previous])
+
+
+def _invalidate_on_active_change(sender, queryset, **kwargs):
+    # Groups and memberships change which courses users see, which their
+    # calendar versions already include.
+    if sender is Lesson:
+        invalidate_calendars(queryset.values_list("course_id", flat=True).distinct())
+
+
+def track_calendar_changes():
+    """Invalidate cached calendars when the lessons of a course change."""
+    pre_save.connect(
+        _remember_course, sender=Lesson, dispatch_uid="calendar_remember_course"
+    )
+    # A lesson deleted through a queryset with deferred fields can only
+    # load its ``course_id`` before the delete.
+    for signal, name in ((post_save, "save"), (pre_delete, "delete")):
+        signal.connect(
+            _invalidate_lesson,
+            sender=Lesson,
+            dispatch_uid=f"invalidate_calendars_on_{name}",
+        )
+    active_state_changed.connect(
+        _invalidate_on_active_change, dispatch_uid="invalidate_calendars_active"
+    )
+
+
+def day_start(day):
+    """Return the start of ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def month_start(year, month):
+    """Return the start of a month in the current time zone."""
+    return day_start(datetime.date(year, month, 1))
+
+
+def _next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def months_between(start, end):
+    """Return the ``(year, month)`` pairs that overlap ``[start, end)``."""
+    start = timezone.localtime(start)
+    end = timezone.localtime(end - datetime.timedelta(microseconds=1))
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = _next_month(year, month)
+    return months
+
+
+def _scheduled_time(row):
+    return datetime.datetime.fromisoformat(row["scheduled_time"])
+
+
+def lesson_queryset(user, start, end):
+    """Return the active lessons of ``user`` scheduled in ``[start, end)``."""
+    return (
+        Lesson.active.filter(
+            Q(course__teacher=user) | active_membership(user, "course__groups__"),
+            scheduled_time__gte=start,
+            scheduled_time__lt=end,
+        )
+        .order_by("scheduled_time", "pk")
+        .distinct()
+    )
+
+
+def lessons_between(user, start, end, version=None):
+    """
+    Return the calendar rows of the lessons of ``user`` in ``[start, end)``.
+
+    Rows are those of ``LessonCalendarSerializer``, in order of
+    ``scheduled_time``. ``version`` is the user's ``calendar_version()``,
+    which is looked up if not given.
+    """
+    if version is None:
+        version = calendar_version(user)
+    months = months_between(start, end)
+    keys = {
+        (year, month): f"calendar:{version}:{user.pk}:{year}-{month:02d}"
+        for year, month in months
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = [month for month in months if keys[month] not in cached]
+    if missing:
+        loaded = {month: [] for month in missing}
+        queryset = lesson_queryset(
+            user, month_start(*missing[0]), month_start(*_next_month(*missing[-1]))
+        )
+        for row in LessonCalendarValuesSerializer(queryset).data:
+            local = timezone.localtime(_scheduled_time(row))
+            if (local.year, local.month) in loaded:
+                loaded[(local.year, local.month)].append(row)
+        cache.set_many(
+            {keys[month]: rows for month, rows in loaded.items()},
+            settings.CALENDAR_CACHE_TIMEOUT,
+        )
+        cached.update({keys[month]: rows for month, rows in loaded.items()})
+
+    return [
+        row
+        for month in months
+        for row in cached[keys[month]]
+        if start <= _scheduled_time(row) < end
+    ]
+
+
+def feed_token(user):
+    """Return the token of the iCalendar feed of ``user``."""
+    digest = salted_hmac(
+        "api.calendar.feed", f"{user.pk}:{user.password}", algorithm="sha256"
+    ).hexdigest()
+    return f"{user.pk}-{digest[:32]}"
+
+
+def user_for_feed_token(token):
+    """Return the active user a feed token belongs to, or None."""
+    pk, _, _ = token.partition("-")
+    if not pk.isdigit():
+        return None
+    user = User.objects.filter(pk=pk, is_active=True).first()
+    if user is None or not constant_time_compare(feed_token(user), token):
+        return None
+    return user
+
+
+def feed_window():
+    """Return the ``[start, end)`` range of lessons in the feed."""
+    today = timezone.localdate()
+    return (
+        day_start(today - datetime.timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)),
+        day_start(today + datetime.timedelta(days=settings.CALENDAR_FEED_FUTURE_DAYS)),
+    )
+
+
+def feed_etag(user, start, version):
+    """Return the ETag of a feed at a ``calendar_version()`` of ``user``."""
+    digest = hashlib.md5(
+        f"{version}:{user.pk}:{user.password}:{start.isoformat()}".encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Fold a content line into pieces of at most 75 octets (RFC 5545)."""
+    pieces = []
+    current, size = [], 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > (75 if not pieces else 74):
+            pieces.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    pieces.append("".join(current))
+    return "\r\n ".join(pieces)
+
+
+def _timestamp(value):
+    return value.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_ics(rows, name):
+    """Render calendar rows as an iCalendar document."""
+    duration = datetime.timedelta(minutes=settings.LESSON_DURATION_MINUTES)
+    stamp = _timestamp(timezone.now())
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//IT Course//Lessons//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    for row in rows:
+        start = _scheduled_time(row)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:lesson-{row['id']}@it-course",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_timestamp(start)}",
+            f"DTEND:{_timestamp(start + duration)}",
+            f"SUMMARY:{_escape(row['title'])}",
+        ]
+        if row["content"]:
+            lines.append(f"DESCRIPTION:{_escape(row['content'])}")
+        if row["meeting_link"]:
+            lines.append(f"URL:{row['meeting_link']}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "".join(f"{_fold(line)}\r\n" for line in lines)
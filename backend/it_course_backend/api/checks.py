@@ -0,0 +1,35 @@
+"""
+System checks of the settings the API relies on.
+"""
+
+from django.conf import settings
+from django.core.checks import Error
+
+# Backends whose entries are private to one process.
+PER_PROCESS_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Refuse a per-process default cache outside development.
+
+    Calendar versions (see ``api.calendar``) are changed by whichever
+    process saves lessons, e.g. a cron command, and must be seen by every
+    web worker. With a memory cache the other processes keep serving their
+    old months.
+
+    Returns:
+        list[Error]: ``api.E001`` if the default cache is per process.
+    """
+    if settings.DEBUG or getattr(settings, "TESTING", False):
+        return []
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [
+        Error(
+            f"The default cache {backend} is not shared between processes.",
+            hint="Set REDIS_URL, or configure CACHES with Redis or Memcached.",
+            id="api.E001",
+        )
+    ]
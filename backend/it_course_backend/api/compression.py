@@ -0,0 +1,158 @@
+"""
+Content-coding of responses.
+
+``negotiate()`` picks the best coding the client accepts from ``CODINGS``:
+zstd and brotli when the ``zstandard`` and ``brotli`` packages are
+installed, and gzip, which is always available. Each coding compresses a
+whole body at once with ``compress()`` or a stream piece by piece with an
+instance, flushing after every piece so streamed responses stay streamed.
+"""
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; everything else, e.g. ZIP archives and
+# images, is compressed already.
+COMPRESSIBLE_TYPES = (
+    "application/javascript",
+    "application/json",
+    "application/xml",
+)
+
+
+def is_compressible(content_type):
+    """Return whether a response of ``content_type`` should be compressed."""
+    content_type = content_type.split(";")[0].strip().lower()
+    return (
+        content_type.startswith("text/")
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith(("+json", "+xml"))
+    )
+
+
+class GzipCoding:
+    """gzip, understood by every client."""
+
+    name = "gzip"
+    level = 6
+
+    @classmethod
+    def compress(cls, data):
+        return gzip.compress(data, compresslevel=cls.level, mtime=0)
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + 15)
+
+    def process(self, chunk):
+        return self.compressor.compress(chunk) + self.compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCoding:
+    """Brotli, with a quality that is fast enough for per-request use."""
+
+    name = "br"
+    quality = 5
+
+    @classmethod
+    def compress(cls, data):
+        return brotli.compress(data, quality=cls.quality)
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=self.quality)
+
+    def process(self, chunk):
+        return self.compressor.process(chunk) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCoding:
+    """Zstandard, which compresses about as well as brotli, faster."""
+
+    name = "zstd"
+    level = 3
+
+    @classmethod
+    def compress(cls, data):
+        return zstandard.ZstdCompressor(level=cls.level).compress(data)
+
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+
+    def process(self, chunk):
+        return self.compressor.compress(chunk) + self.compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+#: Available codings, most preferred first.
+CODINGS = {
+    coding.name: coding
+    for coding, available in (
+        (ZstdCoding, zstandard is not None),
+        (BrotliCoding, brotli is not None),
+        (GzipCoding, True),
+    )
+    if available
+}
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an ``Accept-Encoding`` header.
+
+    Returns:
+        dict: Quality values by lower-case coding name, ``*`` included.
+    """
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate(header):
+    """
+    Return the coding class to use for an ``Accept-Encoding`` header, or
+    None to send the response as it is.
+
+    Codings with the highest quality value win; among those the order of
+    ``CODINGS`` decides.
+    """
+    accepted = parse_accept_encoding(header or "")
+    best, best_quality = None, 0.0
+    for name, coding in CODINGS.items():
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
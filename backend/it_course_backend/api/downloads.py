@@ -0,0 +1,221 @@
+"""
+Serving of stored files.
+
+``file_response()`` hands the transfer of a stored file to the front server
+when ``FILE_DOWNLOAD_BACKEND`` is ``nginx`` (``X-Accel-Redirect``) or
+``sendfile`` (``X-Sendfile``), so no Django worker is busy while the bytes
+are sent. With the default ``django`` backend the file is streamed by a
+``FileResponse`` that supports single byte ranges and conditional requests.
+
+``stream_zip()`` builds a ZIP archive on the fly, yielding it piece by
+piece while the member files are read, so the archive never exists as a
+whole on disk or in memory.
+"""
+
+import os
+import re
+import zipfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+BLOCK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a Range header does not overlap the file."""
+
+
+def parse_range(header, size):
+    """
+    Parse a ``Range`` header with a single byte range.
+
+    Args:
+        header (str): The header value, e.g. ``bytes=0-1023`` or ``bytes=-500``.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        tuple[int, int] | None: First and last byte position, or None when the
+        header is missing or not a single byte range (the whole file is sent).
+
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the end of the file.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of a file, starting at ``start``."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def blob_etag(name):
+    """Return a strong ETag for a content-addressed name, else None."""
+    digest = os.path.splitext(os.path.basename(name))[0]
+    if re.fullmatch(r"[0-9a-f]{64}", digest):
+        return f'"{digest}"'
+    return None
+
+
+def file_response(request, field_file, filename, content_type, as_attachment=True):
+    """
+    Build the response that sends a stored file.
+
+    Args:
+        request (HttpRequest): The request, for Range and conditional headers.
+        field_file (FieldFile): The stored file.
+        filename (str): File name offered to the client.
+        content_type (str): Content type of the response.
+        as_attachment (bool): Whether the browser should download the file.
+
+    Returns:
+        HttpResponse: A front-server redirect, or a full, partial (206),
+        not modified (304) or not satisfiable (416) file response.
+    """
+    backend = settings.FILE_DOWNLOAD_BACKEND
+    disposition = content_disposition_header(as_attachment, filename)
+    etag = blob_etag(field_file.name)
+
+    if etag and etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    if backend in ("nginx", "sendfile"):
+        response = HttpResponse(content_type=content_type)
+        if backend == "nginx":
+            prefix = settings.FILE_ACCEL_REDIRECT_PREFIX.rstrip("/")
+            response["X-Accel-Redirect"] = f"{prefix}/{quote(field_file.name)}"
+        else:
+            response["X-Sendfile"] = field_file.path
+        response["Content-Disposition"] = disposition
+    else:
+        response = _django_file_response(
+            request, field_file, content_type, disposition, etag
+        )
+
+    if etag:
+        response["ETag"] = etag
+        # Content-addressed files never change under the same name.
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
+def _django_file_response(request, field_file, content_type, disposition, etag):
+    size = field_file.size
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if not if_range or (etag and if_range == etag):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    source = field_file.storage.open(field_file.name, "rb")
+    if byte_range is None:
+        response = FileResponse(source, content_type=content_type)
+        response["Content-Length"] = size
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            RangeFile(source, start, length), status=206, content_type=content_type
+        )
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Disposition"] = disposition
+    return response
+
+
+class _ZipBuffer:
+    """Write-only, tell-able buffer that ``zipfile`` treats as unseekable."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yield a ZIP archive of stored files, built while it is sent.
+
+    Members are stored without compression: submissions are mostly PDFs,
+    images and archives that are already compressed, and storing keeps the
+    stream as fast as reading the files.
+
+    Args:
+        entries: Iterable of ``(arcname, field_file, date_time)`` tuples,
+            where ``date_time`` is a ``datetime``. Files missing from storage
+            are skipped.
+
+    Yields:
+        bytes: Consecutive parts of the archive.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for arcname, field_file, date_time in entries:
+            try:
+                size = field_file.size
+                source = field_file.storage.open(field_file.name, "rb")
+            except OSError:
+                continue
+            info = zipfile.ZipInfo(arcname, date_time=date_time.timetuple()[:6])
+            info.file_size = size
+            with source, archive.open(info, "w") as target:
+                for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+                    target.write(block)
+                    yield buffer.pop()
+            data = buffer.pop()
+            if data:
+                yield data
+    yield buffer.pop()
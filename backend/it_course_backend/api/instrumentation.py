@@ -0,0 +1,126 @@
+"""
+Per-request performance counters.
+
+A ``RequestMetrics`` object is bound to the current request through a
+context variable. Database queries are timed with a connection execute
+wrapper and serializer time is measured around ``BaseSerializer.data``.
+"""
+
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Counters collected while a single request is being handled.
+
+    Attributes:
+        queries (int): Number of SQL statements executed.
+        db_time (float): Seconds spent executing SQL.
+        serializer_time (float): Seconds spent producing serializer data.
+        captured (list): ``(alias, sql, duration_ms)`` of the first queries.
+    """
+
+    def __init__(self, max_captured=100):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.captured = []
+        self.max_captured = max_captured
+        self._serializer_depth = 0
+
+    def record_query(self, alias, sql, duration):
+        """
+        Account for one executed SQL statement.
+
+        Args:
+            alias (str): The database alias the query ran on.
+            sql (str): The SQL statement with placeholders.
+            duration (float): Execution time in seconds.
+        """
+        self.queries += 1
+        self.db_time += duration
+        if len(self.captured) < self.max_captured:
+            self.captured.append((alias, sql, round(duration * 1000, 3)))
+
+
+def current_metrics():
+    """Return the metrics of the request being handled, or None."""
+    return _current_metrics.get()
+
+
+class QueryTimer:
+    """
+    Execute wrapper that reports every query to the current request metrics.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics = current_metrics()
+            if metrics is not None:
+                metrics.record_query(self.alias, sql, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_metrics(max_captured=100):
+    """
+    Collect query and serializer metrics for the duration of the block.
+
+    Args:
+        max_captured (int): How many SQL statements to keep for later analysis.
+
+    Yields:
+        RequestMetrics: The metrics object filled in while the block runs.
+    """
+    metrics = RequestMetrics(max_captured=max_captured)
+    token = _current_metrics.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(QueryTimer(connection.alias))
+                )
+            yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def install():
+    """
+    Time ``BaseSerializer.data`` so serializer work shows up in the metrics.
+
+    Only the outermost ``.data`` access is counted, so nested serializers
+    and ``ListSerializer`` are not measured twice.
+    """
+    if getattr(BaseSerializer, "_instrumented", False):
+        return
+
+    original = BaseSerializer.data.fget
+
+    def data(self):
+        metrics = current_metrics()
+        if metrics is None or metrics._serializer_depth:
+            return original(self)
+
+        metrics._serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+            metrics._serializer_depth -= 1
+
+    BaseSerializer.data = property(data)
+    BaseSerializer._instrumented = True
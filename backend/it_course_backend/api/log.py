@@ -0,0 +1,173 @@
+"""
+Logging helpers for the API: a JSON formatter, a sampling filter and a
+queue-backed handler so that log I/O happens off the request thread.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None)).keys()
+) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format log records as one JSON object per line.
+
+    Values passed through ``extra`` are emitted as top-level keys, which is
+    how structured fields (timings, ids, counts) end up in the log.
+    """
+
+    def format(self, record):
+        """
+        Serialize the record to a JSON string.
+
+        Args:
+            record: The log record to format.
+
+        Returns:
+            str: A single-line JSON document.
+        """
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through only every n-th record of a high-volume message.
+
+    Records are grouped by logger name and unformatted message, so each
+    distinct log statement is sampled independently; a record may pass a
+    finer group with ``extra={"sample_key": ...}``. Records above
+    ``max_level`` are never dropped. A record may override the rate with
+    ``extra={"sample_rate": ...}``.
+    """
+
+    def __init__(self, rate=1.0, max_level="INFO"):
+        super().__init__()
+        self.rate = float(rate)
+        self.max_level = logging._checkLevel(max_level)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        """
+        Decide whether the record should be emitted.
+
+        Args:
+            record: The log record being filtered.
+
+        Returns:
+            bool: True if the record should be kept.
+        """
+        if record.levelno > self.max_level:
+            return True
+
+        rate = getattr(record, "sample_rate", self.rate)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+
+        key = (record.name, getattr(record, "sample_key", record.msg))
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+
+        return count % round(1 / rate) == 0
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Queue handler that owns its listener thread.
+
+    The request thread only puts records on an in-memory queue; the wrapped
+    handlers format and write them from a background thread. When the queue
+    is full, records are dropped instead of blocking the caller.
+
+    Configured from ``LOGGING`` as::
+
+        "queue": {
+            "()": "api.log.QueueListenerHandler",
+            "handlers": ["cfg://handlers.file"],
+        }
+    """
+
+    def __init__(self, handlers, maxsize=10000, respect_handler_level=True):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        # Index access makes dictConfig resolve "cfg://" references to handlers.
+        self.listener = QueueListener(
+            self.queue,
+            *[handlers[i] for i in range(len(handlers))],
+            respect_handler_level=respect_handler_level,
+        )
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def enqueue(self, record):
+        """
+        Put the record on the queue without blocking.
+
+        Args:
+            record: The prepared log record.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def prepare(self, record):
+        """
+        Make the record safe to hand to another thread.
+
+        Only the %-style message is rendered here; JSON encoding and
+        timestamp formatting are left to the listener thread. Arguments are
+        dropped afterwards so that the listener never touches request-bound
+        objects such as model instances or querysets.
+
+        Args:
+            record: The log record to prepare.
+
+        Returns:
+            logging.LogRecord: A copy of the record ready to be queued.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def stop(self):
+        """Flush the queue and stop the listener thread."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,33 @@
+"""
+Management command that advances course states from dates and lesson schedules.
+"""
+
+from django.core.management.base import BaseCommand
+
+from ...transitions import advance_course_states
+
+
+class Command(BaseCommand):
+    """
+    Start and complete the courses that are due. Meant to run periodically,
+    e.g. every few minutes from cron; workers that run at the same time skip
+    the run instead of waiting for each other.
+
+    Example:
+        */5 * * * * python manage.py advance_course_states
+    """
+
+    help = "Move courses to in_progress and completed when they are due."
+
+    def handle(self, *args, **options):
+        changed = advance_course_states()
+        if changed is None:
+            self.stdout.write("Another worker is advancing course states.")
+            return
+        for state, course_ids in changed.items():
+            self.stdout.write(f"  {len(course_ids)} courses moved to {state}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Advanced {sum(len(ids) for ids in changed.values())} courses."
+            )
+        )
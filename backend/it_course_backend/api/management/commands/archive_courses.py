@@ -0,0 +1,78 @@
+"""
+Management command that moves old completed courses to the archive tables.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...archive import BATCH_SIZE, ArchiveError, archivable_courses, archive_course
+
+
+class Command(BaseCommand):
+    """
+    Archive completed courses that have had no lesson for the retention
+    window, one transaction per course.
+
+    Example:
+        python manage.py archive_courses --older-than-days 365 --limit 100
+    """
+
+    help = "Move old completed courses out of the live tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.ARCHIVE_COURSES_AFTER_DAYS,
+            help="Archive courses whose last lesson is older than this.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Archive at most this many courses.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows read and written per query.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the courses that would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        courses = archivable_courses(timedelta(days=options["older_than_days"]))
+        course_ids = list(
+            courses.order_by("pk").values_list("pk", flat=True)[: options["limit"]]
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(f"Would archive {len(course_ids)} courses.")
+            return
+
+        started = time.perf_counter()
+        archived = rows = 0
+        for course_id in course_ids:
+            try:
+                counts = archive_course(course_id, batch_size=options["batch_size"])
+            except ArchiveError as exc:
+                # The course changed since it was selected.
+                self.stderr.write(str(exc))
+                continue
+            archived += 1
+            rows += sum(counts.values())
+            self.stdout.write(f"  course {course_id}: {sum(counts.values())} rows")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} courses ({rows} rows) in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,164 @@
+"""
+Management command that maintains the content-addressed submission storage.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from ...models import ArchivedRecord, Blob, submission_storage
+from ...storage import (
+    DEFAULT_GRACE,
+    adjust_references,
+    blob_fields,
+    orphaned_files,
+    tracked_models,
+    unreferenced_blobs,
+)
+
+
+class Command(BaseCommand):
+    """
+    Remove unreferenced blobs and files left without a blob row, rebuild
+    reference counts and move files stored before deduplication into the
+    content-addressed storage.
+
+    Example:
+        python manage.py collect_blobs --import-legacy --recount
+    """
+
+    help = "Garbage-collect and maintain deduplicated submission files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=DEFAULT_GRACE.total_seconds() / 3600,
+            help="Keep unreferenced blobs for this long before removing them.",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Rebuild reference counts from the file fields before collecting.",
+        )
+        parser.add_argument(
+            "--import-legacy",
+            action="store_true",
+            help="Move files stored outside the blob storage into it.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report unreferenced blobs without removing them.",
+        )
+
+    def handle(self, *args, **options):
+        if options["import_legacy"]:
+            self.import_legacy()
+        if options["recount"]:
+            self.recount()
+        self.collect(timedelta(hours=options["grace_hours"]), options["dry_run"])
+
+    def tracked_fields(self):
+        for model in tracked_models:
+            for field in blob_fields(model):
+                yield model, field
+
+    def import_legacy(self):
+        """
+        Re-save files with names from before deduplication through the blob
+        storage and point their rows at the resulting blob.
+        """
+        moved = {}
+        missing = 0
+        for model, field in self.tracked_fields():
+            storage = field.storage
+            legacy = (
+                model.objects.exclude(
+                    **{f"{field.attname}__startswith": storage.prefix + "/"}
+                )
+                .exclude(
+                    Q(**{field.attname: ""}) | Q(**{f"{field.attname}__isnull": True})
+                )
+                .values_list("pk", field.attname)
+            )
+            for pk, name in legacy.iterator():
+                if name not in moved:
+                    if not storage.exists(name):
+                        missing += 1
+                        continue
+                    with storage.open(name, "rb") as content:
+                        moved[name] = storage.save(name, content)
+                with transaction.atomic():
+                    model.objects.filter(pk=pk).update(**{field.attname: moved[name]})
+                    adjust_references([moved[name]], 1)
+
+        storage = submission_storage()
+        for name in moved:
+            storage.delete(name)
+
+        self.stdout.write(
+            f"Imported {len(moved)} legacy files into "
+            f"{len(set(moved.values()))} blobs ({missing} missing)."
+        )
+
+    def recount(self):
+        """Set every blob's reference count to the number of rows using it."""
+        counts = Counter()
+        for model, field in self.tracked_fields():
+            rows = (
+                model.objects.filter(
+                    **{f"{field.attname}__startswith": field.storage.prefix + "/"}
+                )
+                .values_list(field.attname)
+                .annotate(references=Count("pk"))
+            )
+            for name, references in rows.iterator():
+                counts[name] += references
+        # Rows of archived courses keep their files.
+        for files in (
+            ArchivedRecord.objects.exclude(files=[])
+            .values_list("files", flat=True)
+            .iterator()
+        ):
+            counts.update(files)
+
+        changed = []
+        for blob in Blob.objects.only("pk", "name", "ref_count").iterator():
+            if blob.ref_count != counts[blob.name]:
+                blob.ref_count = counts[blob.name]
+                changed.append(blob)
+        Blob.objects.bulk_update(changed, ["ref_count"], batch_size=1000)
+        self.stdout.write(f"Corrected {len(changed)} reference counts.")
+
+    def collect(self, grace, dry_run):
+        """Remove blobs that have had no references for longer than ``grace``."""
+        storage = submission_storage()
+        removed = freed = 0
+        for blob in unreferenced_blobs(grace).iterator():
+            if not dry_run:
+                # The condition is checked again so a blob referenced since
+                # the query started is kept.
+                if not Blob.objects.filter(pk=blob.pk, ref_count__lte=0).delete()[0]:
+                    continue
+                storage.purge(blob.name)
+            removed += 1
+            freed += blob.size
+
+        # Files of blobs whose row was rolled back.
+        orphans = 0
+        for name in orphaned_files(storage, grace):
+            if not dry_run:
+                storage.purge(name)
+            orphans += 1
+
+        verb = "Would remove" if dry_run else "Removed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {removed} unreferenced blobs ({freed} bytes) "
+                f"and {orphans} files without a blob."
+            )
+        )
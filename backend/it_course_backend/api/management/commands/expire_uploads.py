@@ -0,0 +1,62 @@
+"""
+Management command that removes abandoned chunked uploads.
+"""
+
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...uploads import discard, expired_uploads, stray_part_dirs
+
+
+class Command(BaseCommand):
+    """
+    Remove uploads that were never attached, with their part files, and
+    part directories left without an upload.
+
+    Example:
+        python manage.py expire_uploads --older-than-hours 48
+    """
+
+    help = "Remove abandoned chunked uploads and their parts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-hours",
+            type=float,
+            default=settings.UPLOAD_EXPIRY_HOURS,
+            help="Remove unattached uploads started longer ago than this.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the uploads that would be removed.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(hours=options["older_than_hours"])
+        uploads = expired_uploads(older_than)
+        directories = list(stray_part_dirs(older_than))
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would remove {uploads.count()} expired uploads and "
+                f"{len(directories)} part directories without an upload."
+            )
+            return
+
+        removed = 0
+        for upload in uploads.iterator():
+            discard(upload)
+            removed += 1
+        for directory in directories:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Removed {removed} expired uploads and "
+                f"{len(directories)} part directories without an upload."
+            )
+        )
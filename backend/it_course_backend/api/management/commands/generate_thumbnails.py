@@ -0,0 +1,139 @@
+"""
+Management command that backfills thumbnails and previews of submission images.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from ...models import HomeworkSubmission, submission_storage
+from ...thumbnails import (
+    needs_derivatives,
+    render_derivatives,
+    render_options,
+    store_derivatives,
+)
+
+
+class Command(BaseCommand):
+    """
+    Render missing thumbnails and previews in a pool of processes.
+
+    Every distinct image is rendered once, in a worker process; the main
+    process stores the results and points all submissions that use the
+    image at them.
+
+    Example:
+        python manage.py generate_thumbnails --workers 8
+    """
+
+    help = "Generate thumbnails and previews for existing submission images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default: number of CPU cores).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Distinct images rendered per batch.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate derivatives that are already up to date.",
+        )
+
+    def handle(self, *args, **options):
+        force = options["force"]
+        queryset = HomeworkSubmission.objects.exclude(
+            Q(submission_image="") | Q(submission_image__isnull=True)
+        )
+        if not force:
+            queryset = queryset.exclude(preview_source=F("submission_image"))
+        rows = queryset.order_by("submission_image", "pk").values_list(
+            "submission_image", "pk"
+        )
+
+        started = time.perf_counter()
+        rendered = failed = 0
+        # Spawned workers do not inherit the database connections of this
+        # process; they only decode and encode images.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(options["workers"], mp_context=context) as pool:
+            for batch in self.batches(rows.iterator(), options["batch_size"]):
+                done, errors = self.render_batch(pool, batch, force)
+                rendered += done
+                failed += errors
+                self.stdout.write(f"  {rendered} images rendered, {failed} failed")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {rendered} images in {time.perf_counter() - started:.1f}s "
+                f"({failed} failed)."
+            )
+        )
+
+    def batches(self, rows, size):
+        """Yield dicts of image name to submission IDs with ``size`` images."""
+        batch = {}
+        for name, group in groupby(rows, key=lambda row: row[0]):
+            batch[name] = [pk for _, pk in group]
+            if len(batch) >= size:
+                yield batch
+                batch = {}
+        if batch:
+            yield batch
+
+    def render_batch(self, pool, batch, force):
+        storage = submission_storage()
+        options = render_options()
+        futures = {
+            pool.submit(render_derivatives, storage.path(name), **options): name
+            for name in batch
+        }
+        done = failed = 0
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Could not render {name}: {exc}")
+                continue
+            self.store(name, batch[name], result, force)
+            done += 1
+        return done, failed
+
+    def store(self, name, pks, result, force):
+        """Store one rendered image on every submission that still uses it."""
+        stored = None
+        for pk in pks:
+            with transaction.atomic():
+                submission = (
+                    HomeworkSubmission.objects.select_for_update().filter(pk=pk).first()
+                )
+                if submission is None or submission.submission_image.name != name:
+                    continue
+                if not force and not needs_derivatives(submission):
+                    continue
+                if stored is None:
+                    store_derivatives(submission, result)
+                    stored = submission
+                    continue
+                submission.thumbnail.name = stored.thumbnail.name
+                submission.preview.name = stored.preview.name
+                submission.preview_source = name
+                submission.save(
+                    update_fields=["thumbnail", "preview", "preview_source"]
+                )
@@ -0,0 +1,33 @@
+"""
+Management command that moves archived courses back to the live tables.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...archive import ArchiveError, restore_course
+
+
+class Command(BaseCommand):
+    """
+    Restore archived courses with their original IDs.
+
+    Example:
+        python manage.py restore_course 42 57
+    """
+
+    help = "Restore archived courses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_ids", nargs="+", type=int)
+
+    def handle(self, *args, **options):
+        for course_id in options["course_ids"]:
+            try:
+                counts = restore_course(course_id)
+            except ArchiveError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Restored course {course_id} ({sum(counts.values())} rows)."
+                )
+            )
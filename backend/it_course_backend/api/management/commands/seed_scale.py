@@ -0,0 +1,435 @@
+"""
+Management command that generates a production-scale synthetic dataset.
+"""
+
+import csv
+import io
+import math
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from ...models import (
+    Course,
+    Group,
+    GroupMembership,
+    Homework,
+    HomeworkSubmission,
+    Lesson,
+    User,
+)
+
+
+class Command(BaseCommand):
+    """
+    Generate users, courses, groups, memberships, lessons, homework and
+    submissions with realistic distributions.
+
+    Parent rows are created with ``bulk_create`` in chunks. The high-volume
+    leaf tables (memberships, many-to-many links and submissions) are
+    streamed with PostgreSQL ``COPY`` when available. All values come from a
+    seeded random generator, so the same options produce the same data.
+
+    Example:
+        python manage.py seed_scale --students 200000 --courses 2000 \\
+            --students-per-course 80 --lessons-per-course 40 --homework-per-lesson 2
+    """
+
+    help = "Generate a large, deterministic synthetic dataset for performance testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=50)
+        parser.add_argument("--students", type=int, default=5000)
+        parser.add_argument("--courses", type=int, default=200)
+        parser.add_argument(
+            "--students-per-course",
+            type=int,
+            default=40,
+            help="Median group size; sizes follow a log-normal distribution.",
+        )
+        parser.add_argument("--lessons-per-course", type=int, default=30)
+        parser.add_argument("--homework-per-lesson", type=int, default=1)
+        parser.add_argument(
+            "--submission-rate",
+            type=float,
+            default=0.7,
+            help="Average share of students who submit a homework.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=10000)
+        parser.add_argument(
+            "--method",
+            choices=("auto", "copy", "bulk"),
+            default="auto",
+            help="How to load leaf tables; 'auto' uses COPY on PostgreSQL.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefix for generated e-mails and enrollment codes.",
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            default=date(2024, 9, 1),
+            help="First possible course start date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--password",
+            default="password123",
+            help="Password shared by every generated user (hashed once).",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.chunk_size = options["chunk_size"]
+        self.prefix = options["prefix"]
+        self.use_copy = self.resolve_method(options["method"])
+        self.options = options
+
+        if User.objects.filter(email__startswith=f"{self.prefix}.").exists():
+            raise CommandError(
+                f"Users with the prefix '{self.prefix}' already exist; "
+                "use another --prefix."
+            )
+
+        started = time.perf_counter()
+        teachers, students = self.create_users()
+        courses = self.create_courses(teachers)
+        groups = self.create_groups(courses)
+        members = self.create_memberships(courses, groups, students)
+        lessons = self.create_lessons(courses)
+        homework = self.create_homework(lessons)
+        self.create_submissions(homework, members)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dataset generated in {time.perf_counter() - started:.1f}s."
+            )
+        )
+
+    def resolve_method(self, method):
+        """Return True if leaf tables should be loaded with COPY."""
+        if method == "bulk":
+            return False
+        if connection.vendor != "postgresql":
+            if method == "copy":
+                raise CommandError("COPY is only available on PostgreSQL.")
+            return False
+        return True
+
+    def report(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else count
+        self.stdout.write(f"  {label}: {count} rows in {elapsed:.1f}s ({rate:.0f}/s)")
+
+    def chunks(self, rows):
+        """Yield lists of at most ``chunk_size`` rows from an iterable."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def bulk_create(self, model, objects):
+        """Create model instances in chunks and return them with their IDs."""
+        created = []
+        for chunk in self.chunks(objects):
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(chunk))
+        return created
+
+    def load_rows(self, model, fields, rows):
+        """
+        Insert rows of plain values into a model's table.
+
+        Args:
+            model: The model (or auto-created through model) to insert into.
+            fields (list[str]): Field names, in the order of the row values.
+            rows: Iterable of tuples.
+
+        Returns:
+            int: Number of inserted rows.
+        """
+        count = 0
+        if self.use_copy:
+            # COPY does not apply model defaults, so other NOT NULL columns
+            # are sent with their default value. Generated columns are
+            # computed by the database and cannot be written.
+            defaults = [
+                field
+                for field in model._meta.concrete_fields
+                if not field.null
+                and not field.primary_key
+                and not getattr(field, "generated", False)
+                and field.name not in fields
+            ]
+            columns = ", ".join(
+                connection.ops.quote_name(field.column)
+                for field in [model._meta.get_field(name) for name in fields]
+                + defaults
+            )
+            sql = (
+                f"COPY {connection.ops.quote_name(model._meta.db_table)} "
+                f"({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+            )
+            extra = tuple(field.get_default() for field in defaults)
+            for chunk in self.chunks(rows):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(
+                    tuple("\\N" if value is None else value for value in row)
+                    + extra
+                    for row in chunk
+                )
+                buffer.seek(0)
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.copy_expert(sql, buffer)
+                count += len(chunk)
+        else:
+            attnames = [model._meta.get_field(name).attname for name in fields]
+            for chunk in self.chunks(rows):
+                with transaction.atomic():
+                    model.objects.bulk_create(
+                        [model(**dict(zip(attnames, row))) for row in chunk]
+                    )
+                count += len(chunk)
+        return count
+
+    def create_users(self):
+        started = time.perf_counter()
+        password = make_password(self.options["password"])
+        prefix = self.prefix
+
+        teachers = self.bulk_create(
+            User,
+            (
+                User(
+                    email=f"{prefix}.teacher{i}@example.com",
+                    first_name="Teacher",
+                    last_name=str(i),
+                    password=password,
+                )
+                for i in range(self.options["teachers"])
+            ),
+        )
+        students = self.bulk_create(
+            User,
+            (
+                User(
+                    email=f"{prefix}.student{i}@example.com",
+                    first_name="Student",
+                    last_name=str(i),
+                    password=password,
+                )
+                for i in range(self.options["students"])
+            ),
+        )
+        self.report("users", len(teachers) + len(students), started)
+        return [u.id for u in teachers], [u.id for u in students]
+
+    def create_courses(self, teachers):
+        """
+        Create courses. A few teachers teach many courses (Zipf-like), start
+        dates are spread over half a year and the state follows from them.
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        start_date = self.options["start_date"]
+        as_of = start_date + timedelta(days=180)
+        course_weeks = self.options["lessons_per_course"]
+        weights = [1 / (rank + 1) for rank in range(len(teachers))]
+
+        courses = []
+        for i in range(self.options["courses"]):
+            course_start = start_date + timedelta(days=rng.randrange(240))
+            if course_start > as_of:
+                state = "not_started"
+            elif course_start + timedelta(weeks=course_weeks) < as_of:
+                state = "completed"
+            else:
+                state = "in_progress"
+            courses.append(
+                Course(
+                    title=f"Course {i}: {rng.choice(TOPICS)}",
+                    description=f"Synthetic course {i}",
+                    teacher_id=rng.choices(teachers, weights=weights)[0],
+                    enrollment_code=f"{self.prefix[:2]}{i:08d}",
+                    start_date=course_start,
+                    state=state,
+                )
+            )
+
+        courses = self.bulk_create(Course, courses)
+        self.report("courses", len(courses), started)
+        return courses
+
+    def create_groups(self, courses):
+        started = time.perf_counter()
+        groups = self.bulk_create(
+            Group,
+            (Group(name=f"Group of {c.title}", course_id=c.id) for c in courses),
+        )
+        self.load_rows(
+            Course.groups.through,
+            ["course", "group"],
+            ((c.id, g.id) for c, g in zip(courses, groups)),
+        )
+        self.report("groups", len(groups), started)
+        return groups
+
+    def create_memberships(self, courses, groups, students):
+        """
+        Enroll students into course groups.
+
+        Group sizes are log-normal around ``--students-per-course`` and some
+        students are much more likely to enroll than others, so a handful of
+        users end up in many groups.
+
+        Returns:
+            dict: Student IDs per course ID.
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        median = self.options["students_per_course"]
+        members = {}
+
+        for course in courses:
+            size = int(rng.lognormvariate(math.log(max(median, 1)), 0.5))
+            size = max(1, min(size, len(students)))
+            # Squaring a uniform variate skews picks towards low indexes.
+            picked = {int(len(students) * rng.random() ** 2) for _ in range(size)}
+            members[course.id] = sorted(students[i] for i in picked)
+
+        def rows():
+            for course, group in zip(courses, groups):
+                yield (True, course.teacher_id, group.id, "teacher")
+                for student_id in members[course.id]:
+                    if student_id != course.teacher_id:
+                        yield (True, student_id, group.id, "student")
+
+        count = self.load_rows(
+            GroupMembership, ["is_active", "user", "group", "role"], rows()
+        )
+        self.report("group memberships", count, started)
+        return members
+
+    def create_lessons(self, courses):
+        """Create weekly lessons for every course, starting on its start date."""
+        started = time.perf_counter()
+        rng = self.rng
+        per_course = self.options["lessons_per_course"]
+
+        def lessons():
+            for course in courses:
+                hour = rng.randrange(9, 19)
+                for week in range(per_course):
+                    day = course.start_date + timedelta(weeks=week)
+                    yield Lesson(
+                        title=f"Week {week + 1}: {rng.choice(TOPICS)}",
+                        course_id=course.id,
+                        scheduled_time=datetime.combine(
+                            day, dt_time(hour), tzinfo=timezone.utc
+                        ),
+                        content=f"Lesson content for week {week + 1}.",
+                        meeting_link="https://meet.example.com/lesson",
+                    )
+
+        created = self.bulk_create(Lesson, lessons())
+        self.load_rows(
+            Course.lessons.through,
+            ["course", "lesson"],
+            ((lesson.course_id, lesson.id) for lesson in created),
+        )
+        self.report("lessons", len(created), started)
+        return created
+
+    def create_homework(self, lessons):
+        started = time.perf_counter()
+        per_lesson = self.options["homework_per_lesson"]
+        teachers = dict(Course.objects.values_list("id", "teacher_id"))
+
+        created = self.bulk_create(
+            Homework,
+            (
+                Homework(
+                    title=f"Homework {k + 1} for {lesson.title}",
+                    lesson_id=lesson.id,
+                    course_id=lesson.course_id,
+                    description="Solve the exercises from the lesson.",
+                    due_date=lesson.scheduled_time + timedelta(days=7),
+                    submitted_by_id=teachers[lesson.course_id],
+                )
+                for lesson in lessons
+                for k in range(per_lesson)
+            ),
+        )
+        self.report("homework", len(created), started)
+        return created
+
+    def create_submissions(self, homework, members):
+        """
+        Create submissions. Each student has a personal diligence drawn from
+        a beta distribution; about one in ten submissions is late and one in
+        five is not graded yet.
+        """
+        started = time.perf_counter()
+        rng = self.rng
+        rate = self.options["submission_rate"]
+        alpha = max(rate * 4, 0.1)
+        beta = max((1 - rate) * 4, 0.1)
+        diligence = {}
+
+        def rows():
+            for item in homework:
+                for student_id in members[item.course_id]:
+                    if student_id not in diligence:
+                        diligence[student_id] = rng.betavariate(alpha, beta)
+                    if rng.random() >= diligence[student_id]:
+                        continue
+                    if rng.random() < 0.1:
+                        offset = timedelta(hours=rng.randrange(1, 72))
+                    else:
+                        offset = -timedelta(hours=rng.randrange(1, 160))
+                    grade = None
+                    if rng.random() >= 0.2:
+                        grade = max(0, min(100, int(rng.gauss(75, 15))))
+                    yield (
+                        True,
+                        item.id,
+                        student_id,
+                        "Synthetic submission",
+                        (item.due_date + offset).isoformat(),
+                        grade,
+                    )
+
+        fields = [
+            "is_active",
+            "homework",
+            "student",
+            "submission_text",
+            "submission_date",
+            "grade",
+        ]
+        count = self.load_rows(HomeworkSubmission, fields, rows())
+        self.report("homework submissions", count, started)
+
+
+TOPICS = (
+    "Python basics",
+    "Data structures",
+    "Algorithms",
+    "Web development",
+    "Databases",
+    "Networking",
+    "Testing",
+    "DevOps",
+    "Security",
+    "Machine learning",
+)
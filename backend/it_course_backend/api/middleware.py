@@ -0,0 +1,280 @@
+"""
+Middleware for the API.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .compression import is_compressible, negotiate
+from .instrumentation import collect_metrics
+from .routers import replica_reads, replicas
+
+logger = logging.getLogger("api.perf")
+
+
+class ServerTimingMiddleware:
+    """
+    Measure API requests and report the numbers in a ``Server-Timing`` header.
+
+    When ``PERF_INSTRUMENTATION_ENABLED`` is on, the middleware counts SQL
+    queries and measures database, serializer and total view time of every
+    request under ``PERF_PATH_PREFIX``. The numbers are logged as structured
+    fields on the ``api.perf`` logger, sampled per route, and added to the
+    response as ``Server-Timing`` entries for staff users, or for everyone
+    while ``DEBUG`` is on. Requests slower than ``PERF_SLOW_REQUEST_MS`` are
+    logged as warnings together with the SQL they ran.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "PERF_INSTRUMENTATION_ENABLED", False)
+        self.path_prefix = getattr(settings, "PERF_PATH_PREFIX", "/api/")
+        self.slow_request_ms = getattr(settings, "PERF_SLOW_REQUEST_MS", 500)
+        self.max_captured = getattr(settings, "PERF_MAX_CAPTURED_QUERIES", 100)
+
+    def __call__(self, request):
+        if not self.enabled or not request.path.startswith(self.path_prefix):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_metrics(max_captured=self.max_captured) as metrics:
+            response = self.get_response(request)
+        view_ms = (time.perf_counter() - start) * 1000
+        db_ms = metrics.db_time * 1000
+        serializer_ms = metrics.serializer_time * 1000
+
+        if self.shows_timing(request):
+            timing = (
+                f'db;dur={db_ms:.1f};desc="{metrics.queries} queries", '
+                f"serializer;dur={serializer_ms:.1f}, "
+                f"view;dur={view_ms:.1f}"
+            )
+            if response.has_header("Server-Timing"):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response["Server-Timing"] = timing
+
+        match = request.resolver_match
+        route = match.route if match is not None else request.path
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            # Sample each route on its own, not all requests as one message.
+            "sample_key": f"{request.method} {route}",
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(db_ms, 3),
+            "serializer_ms": round(serializer_ms, 3),
+            "view_ms": round(view_ms, 3),
+        }
+        if view_ms >= self.slow_request_ms:
+            fields["sql"] = metrics.captured
+            logger.warning(
+                "Slow request %s %s (%.1f ms)",
+                request.method,
+                request.path,
+                view_ms,
+                extra=fields,
+            )
+        else:
+            logger.info("%s %s", request.method, request.path, extra=fields)
+
+        return response
+
+    def shows_timing(self, request):
+        """Return whether the client may see the ``Server-Timing`` numbers."""
+        if settings.DEBUG:
+            return True
+        # DRF sets the user it authenticated on the underlying request.
+        user = getattr(request, "user", None)
+        return bool(user is not None and user.is_staff)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read from the read replicas during safe requests.
+
+    Once a request writes to the primary, the client gets a
+    ``DATABASE_REPLICA_PIN_COOKIE`` cookie for
+    ``DATABASE_REPLICA_PIN_SECONDS``. Requests that carry it read from the
+    primary, so a client sees its own writes, e.g. a just-submitted
+    homework, before the replicas have caught up.
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie_name = getattr(
+            settings, "DATABASE_REPLICA_PIN_COOKIE", "pin_primary"
+        )
+        self.pin_seconds = getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 10)
+
+    def __call__(self, request):
+        if not replicas():
+            return self.get_response(request)
+
+        use_replicas = (
+            request.method in self.safe_methods
+            and self.cookie_name not in request.COOKIES
+        )
+        with replica_reads(use_replicas) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=self.pin_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses with the best coding the client accepts.
+
+    Responses under ``COMPRESSION_PATH_PREFIX`` with a text or JSON content
+    type are compressed once they reach ``COMPRESSION_MIN_SIZE`` bytes.
+    Bodies of responses with a strong ``ETag`` are cached for
+    ``COMPRESSION_CACHE_TIMEOUT`` seconds, so an unchanged list is compressed
+    once per coding. Streaming responses are compressed piece by piece.
+    ZIP exports, images and responses that support byte ranges are left as
+    they are.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path_prefix = getattr(settings, "COMPRESSION_PATH_PREFIX", "/api/")
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.cache_timeout = getattr(settings, "COMPRESSION_CACHE_TIMEOUT", 300)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path.startswith(self.path_prefix) or not self.compressible(
+            response
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.headers.get("Accept-Encoding"))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            self.compress_stream(response, coding)
+        else:
+            body = self.compressed_body(response, coding)
+            if len(body) >= len(response.content):
+                return response
+            response.content = body
+            response["Content-Length"] = str(len(body))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # The compressed body is a different representation.
+            response["ETag"] = f"W/{etag}"
+        response["Content-Encoding"] = coding.name
+        return response
+
+    def compressible(self, response):
+        """Return whether the coding of ``response`` may be changed."""
+        return (
+            response.status_code != 206
+            and not response.has_header("Content-Encoding")
+            and not response.has_header("Accept-Ranges")
+            and is_compressible(response.get("Content-Type", ""))
+        )
+
+    def compressed_body(self, response, coding):
+        """Compress the body, reusing the cached body for a strong ``ETag``."""
+        etag = response.get("ETag", "")
+        if not etag.startswith('"'):
+            return coding.compress(response.content)
+
+        key = hashlib.md5(
+            f"{coding.name}:{etag}:{len(response.content)}".encode()
+        ).hexdigest()
+        key = f"compression:{key}"
+        body = cache.get(key)
+        if body is None:
+            body = coding.compress(response.content)
+            cache.set(key, body, self.cache_timeout)
+        return body
+
+    def compress_stream(self, response, coding):
+        """Replace the streamed content with its compressed pieces."""
+        compressor = coding()
+        if response.is_async:
+
+            async def compressed(content):
+                async for chunk in content:
+                    if chunk:
+                        yield compressor.process(chunk)
+                yield compressor.finish()
+
+        else:
+
+            def compressed(content):
+                for chunk in content:
+                    if chunk:
+                        yield compressor.process(chunk)
+                yield compressor.finish()
+
+        response.streaming_content = compressed(response.streaming_content)
+        del response["Content-Length"]
+
+
+def is_api_request(request):
+    """Return whether ``request`` is for the JWT-authenticated API."""
+    return request.path.startswith(getattr(settings, "API_PATH_PREFIX", "/api/"))
+
+
+class BrowserOnlyMixin:
+    """
+    Skip a middleware for API requests.
+
+    The API authenticates with JWT, so sessions, CSRF cookies, Django's
+    ``request.user`` and messages are only needed by the browser-facing
+    admin and ``/accounts/`` pages. Skipping them saves API requests their
+    per-request work, and no API response reads the ``django_session`` row
+    or sets a CSRF cookie.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class BrowserSessionMiddleware(BrowserOnlyMixin, SessionMiddleware):
+    """``SessionMiddleware`` for everything but the API."""
+
+
+class BrowserCsrfViewMiddleware(BrowserOnlyMixin, CsrfViewMiddleware):
+    """``CsrfViewMiddleware`` for everything but the API."""
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class BrowserAuthenticationMiddleware(BrowserOnlyMixin, AuthenticationMiddleware):
+    """``AuthenticationMiddleware`` for everything but the API."""
+
+
+class BrowserMessageMiddleware(BrowserOnlyMixin, MessageMiddleware):
+    """``MessageMiddleware`` for everything but the API."""
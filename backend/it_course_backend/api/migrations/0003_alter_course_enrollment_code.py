@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-19 07:15
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_alter_course_enrollment_code"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="course",
+            name="enrollment_code",
+            field=models.CharField(
+                default=api.models.generate_enrollment_code, max_length=10, unique=True
+            ),
+        ),
+    ]
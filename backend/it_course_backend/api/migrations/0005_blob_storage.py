@@ -0,0 +1,74 @@
+# Generated by Django 5.0.7 on 2026-10-19 07:33
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Blob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("digest", models.CharField(db_index=True, max_length=64)),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("released_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="chunkedupload",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=api.models.submission_storage,
+                upload_to="uploads/%Y/%m/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="homework",
+            name="submission_file",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=api.models.submission_storage,
+                upload_to="homework_submissions/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="homeworksubmission",
+            name="submission_file",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=api.models.submission_storage,
+                upload_to="homework_submissions/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="homeworksubmission",
+            name="submission_image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=api.models.submission_storage,
+                upload_to="homework_images/",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-19 07:39
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_blob_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="homeworksubmission",
+            name="preview",
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                null=True,
+                storage=api.models.submission_storage,
+                upload_to="homework_images/previews/",
+            ),
+        ),
+        migrations.AddField(
+            model_name="homeworksubmission",
+            name="preview_source",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="homeworksubmission",
+            name="thumbnail",
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                null=True,
+                storage=api.models.submission_storage,
+                upload_to="homework_images/thumbnails/",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.7 on 2026-10-19 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_course_archive"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["teacher"],
+                name="course_active_teacher_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["course"],
+                name="group_active_course_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="groupmembership",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["group", "role"],
+                name="membership_active_group_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="homework",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["course", "due_date"],
+                name="homework_active_course_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="homeworksubmission",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["homework", "student"],
+                name="submission_active_hw_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["course", "scheduled_time"],
+                name="lesson_active_course_time_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:02
+
+import django.contrib.postgres.fields
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_active_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lesson",
+            name="occurrence",
+            field=models.DateField(
+                blank=True, null=True, verbose_name="Series Occurrence"
+            ),
+        ),
+        migrations.CreateModel(
+            name="LessonSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=255, verbose_name="Title")),
+                (
+                    "content",
+                    models.TextField(blank=True, null=True, verbose_name="Content"),
+                ),
+                (
+                    "video_url",
+                    models.URLField(blank=True, null=True, verbose_name="Video URL"),
+                ),
+                (
+                    "meeting_link",
+                    models.URLField(blank=True, null=True, verbose_name="Meeting Link"),
+                ),
+                ("start_date", models.DateField(verbose_name="Start Date")),
+                ("time", models.TimeField(verbose_name="Time")),
+                (
+                    "weekdays",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(
+                            choices=[
+                                ("MO", "Monday"),
+                                ("TU", "Tuesday"),
+                                ("WE", "Wednesday"),
+                                ("TH", "Thursday"),
+                                ("FR", "Friday"),
+                                ("SA", "Saturday"),
+                                ("SU", "Sunday"),
+                            ],
+                            max_length=2,
+                        ),
+                        size=None,
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveSmallIntegerField(
+                        default=1,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        null=True,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                ("until", models.DateField(blank=True, null=True)),
+                (
+                    "exdates",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.DateField(),
+                        blank=True,
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lesson_series",
+                        to="api.course",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "lesson series",
+            },
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="series",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="lessons",
+                to="api.lessonseries",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="lesson",
+            constraint=models.UniqueConstraint(
+                fields=("series", "occurrence"), name="lesson_series_occurrence_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_lesson_series"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="chunkedupload",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("assembling", "Assembling"),
+                    ("complete", "Complete"),
+                    ("attached", "Attached"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+    ]
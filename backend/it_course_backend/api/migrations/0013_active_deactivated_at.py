@@ -0,0 +1,43 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_chunkedupload_assembling"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="group",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="groupmembership",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="homework",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="homeworksubmission",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="deactivated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,14 +1,80 @@
-from django.db import models
+import datetime
+import math
+import uuid
+
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.core.serializers.json import DjangoJSONEncoder
+from django.contrib.postgres.fields import ArrayField
+from django.db.models.functions import Cast, Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
 from django.utils import timezone
-from django.core.validators import EmailValidator
+from django.core.files.storage import storages
+from django.core.validators import EmailValidator, MinValueValidator
 from django.utils.crypto import get_random_string
 from django.conf import settings
 
+from .storage import BlobReferencesMixin
+
+
+def submission_storage():
+    """Return the deduplicating storage used for submitted files."""
+    return storages["submissions"]
+
+
+#: Text search configuration of the ``search_vector`` columns. Queries must
+#: use the same configuration to match the indexed words. The content is
+#: mostly Ukrainian, which PostgreSQL has no stemmer for, so words are only
+#: lower-cased; a language's stemmer and stop words would mangle or drop
+#: them.
+SEARCH_CONFIG = "simple"
+
+
+def search_vector_field(*weighted_fields):
+    """
+    Return a generated column with a weighted ``tsvector`` of text fields.
+
+    PostgreSQL keeps the column up to date on every insert and update, so
+    searches only read the GIN index.
+
+    Args:
+        *weighted_fields: ``(field name, weight)`` pairs, weight ``A`` to ``D``.
+    """
+    vector = None
+    for name, weight in weighted_fields:
+        part = SearchVector(name, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return models.GeneratedField(
+        expression=vector,
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+
+def trigram_index(field_name, name):
+    """
+    Return a GIN trigram index that serves ``icontains`` lookups on a field.
+
+    On PostgreSQL ``icontains`` compiles to ``UPPER(column::text) LIKE
+    UPPER('%term%')``; the index is built on the same expression so the
+    planner can use it instead of scanning the table.
+    """
+    return GinIndex(
+        OpClass(Upper(Cast(field_name, models.TextField())), name="gin_trgm_ops"),
+        name=name,
+    )
+
+
+def generate_enrollment_code():
+    """Return a new random enrollment code for a course."""
+    return get_random_string(10)
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -53,6 +119,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name"]
 
+    class Meta:
+        indexes = [
+            trigram_index("email", "user_email_trgm_idx"),
+            trigram_index("first_name", "user_first_name_trgm_idx"),
+            trigram_index("last_name", "user_last_name_trgm_idx"),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -72,7 +145,81 @@ class User(AbstractBaseUser, PermissionsMixin):
         self.save(update_fields=["is_active"])
 
 
-class ActiveManager(models.Manager):
+#: Sent by ``ActiveQuerySet.set_active()`` for every model whose rows
+#: changed, as the bulk updates send no ``post_save``. ``queryset`` holds
+#: the changed rows, and may hold rows of the subtree that kept their state.
+active_state_changed = Signal()
+
+
+class ActiveQuerySet(models.QuerySet):
+    """
+    QuerySet of ``ActiveModel`` rows that switches whole subtrees on or off.
+    """
+
+    def set_active(self, is_active):
+        """
+        Set ``is_active`` on these rows and on every row that depends on them.
+
+        Dependents are found through the ``active_dependents()`` of each
+        model, e.g. the lessons, homework and groups of a course and in turn
+        their submissions and memberships. Each table is changed with a
+        single ``UPDATE``, whatever the number of rows.
+
+        Deactivated rows are stamped with one ``deactivated_at`` for the whole
+        cascade. Activating brings back only the dependents that carry the
+        stamp of a reactivated row, so rows that were deactivated on their
+        own before stay inactive.
+
+        Returns:
+            dict: Number of changed rows per model label.
+        """
+        # The rows are fixed first, so filters on is_active in this queryset
+        # do not change which dependents are found once the update started.
+        rows = dict(self.values_list("pk", "deactivated_at"))
+        stamps = {stamp for stamp in rows.values() if stamp is not None}
+        roots = self.model.objects.filter(pk__in=rows)
+        subtree = {}
+        pending = [roots]
+        while pending:
+            queryset = pending.pop(0)
+            model = queryset.model
+            subtree[model] = subtree[model] | queryset if model in subtree else queryset
+            pending.extend(model.active_dependents(queryset))
+        # Activating clears the stamps, so receivers get the whole subtree.
+        changed = subtree
+        if is_active:
+            changed = {
+                model: queryset.filter(deactivated_at__in=stamps)
+                for model, queryset in subtree.items()
+            }
+            changed[self.model] |= roots
+
+        changes = {
+            "is_active": is_active,
+            "deactivated_at": None if is_active else timezone.now(),
+        }
+        with transaction.atomic(using=self.db):
+            counts = {
+                model: queryset.exclude(is_active=is_active).update(**changes)
+                for model, queryset in changed.items()
+            }
+            for model, count in counts.items():
+                if count:
+                    active_state_changed.send(
+                        sender=model, is_active=is_active, queryset=subtree[model]
+                    )
+        return {model._meta.label_lower: count for model, count in counts.items()}
+
+    def deactivate(self):
+        """Mark the rows and their dependents as inactive."""
+        return self.set_active(False)
+
+    def activate(self):
+        """Mark the rows and their dependents as active."""
+        return self.set_active(True)
+
+
+class ActiveManager(models.Manager.from_queryset(ActiveQuerySet)):
     """
     Manager to retrieve only active objects.
     """
@@ -89,22 +236,36 @@ class ActiveModel(models.Model):
     """
 
     is_active = models.BooleanField(default=True)
+    deactivated_at = models.DateTimeField(null=True, blank=True, editable=False)
 
-    objects = models.Manager()
+    objects = ActiveQuerySet.as_manager()
     active = ActiveManager()
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def active_dependents(cls, queryset):
+        """
+        Return querysets of the rows whose active state follows ``queryset``.
+
+        Args:
+            queryset (QuerySet): Rows of this model.
+
+        Returns:
+            list[QuerySet]: Rows of other ``ActiveModel`` models.
+        """
+        return []
+
     def deactivate(self):
-        """Mark the object as inactive."""
-        self.is_active = False
-        self.save(update_fields=["is_active"])
+        """Mark the object and the objects that depend on it as inactive."""
+        type(self).objects.filter(pk=self.pk).set_active(False)
+        self.refresh_from_db(fields=["is_active", "deactivated_at"])
 
     def activate(self):
-        """Mark the object as active."""
-        self.is_active = True
-        self.save(update_fields=["is_active"])
+        """Mark the object and the objects that depend on it as active."""
+        type(self).objects.filter(pk=self.pk).set_active(True)
+        self.refresh_from_db(fields=["is_active", "deactivated_at"])
 
 
 class Course(ActiveModel):
@@ -117,7 +278,7 @@ class Course(ActiveModel):
     )
     groups = models.ManyToManyField("Group", related_name="courses")
     enrollment_code = models.CharField(
-        max_length=10, unique=True, default=get_random_string(10)
+        max_length=10, unique=True, default=generate_enrollment_code
     )
     lessons = models.ManyToManyField("Lesson", related_name="courses_in_lesson")
     start_date = models.DateField(default=timezone.now)
@@ -133,10 +294,39 @@ class Course(ActiveModel):
     state = models.CharField(
         max_length=15, choices=COURSE_STATE_CHOICES, default="not_started"
     )
+    search_vector = search_vector_field(("title", "A"), ("description", "B"))
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="course_search_idx"),
+            trigram_index("title", "course_title_trgm_idx"),
+            models.Index(
+                fields=["teacher"],
+                name="course_active_teacher_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def active_dependents(cls, queryset):
+        """
+        Lessons, homework and groups follow the state of their course.
+
+        Only the rows whose ``course`` foreign key points at the course are
+        followed. Groups and lessons linked through ``Course.groups`` and
+        ``Course.lessons`` can belong to other courses, which must keep
+        them. Reads through those links check ``is_active`` of the course,
+        group and membership (see ``active_membership()``) instead.
+        """
+        return [
+            Lesson.objects.filter(course__in=queryset),
+            Homework.objects.filter(course__in=queryset),
+            Group.objects.filter(course__in=queryset),
+        ]
+
     def homework_progress(self):
         """
         Calculate and return the homework submission progress for each lesson in the course.
@@ -144,27 +334,51 @@ class Course(ActiveModel):
         Returns:
             List[Dict]: A list of dictionaries containing homework progress data for each lesson.
         """
-        progress_data = []
-        for lesson in self.lessons.all():
-            total_homework = lesson.homework_set.count()
-            submitted_homework = lesson.homework_set.filter(
-                submitted_by__isnull=False
-            ).count()
+        return self.homework_progress_for([self]).get(self.pk, [])
+
+    @classmethod
+    def homework_progress_for(cls, courses):
+        """
+        Calculate homework progress for several courses with a single query.
+
+        Args:
+            courses: Iterable of Course instances.
 
+        Returns:
+            Dict[int, List[Dict]]: Homework progress data keyed by course ID,
+            in the format returned by `homework_progress`.
+        """
+        rows = (
+            cls.lessons.through.objects.filter(course_id__in=[c.pk for c in courses])
+            .values("course_id", "lesson_id", "lesson__title")
+            .annotate(
+                total_homework=models.Count("lesson__homework"),
+                submitted_homework=models.Count(
+                    "lesson__homework",
+                    filter=models.Q(lesson__homework__submitted_by__isnull=False),
+                ),
+            )
+            .order_by("course_id", "lesson_id")
+        )
+
+        progress = {}
+        for row in rows:
+            total_homework = row["total_homework"]
+            submitted_homework = row["submitted_homework"]
             progress_percentage = (
                 (submitted_homework / total_homework * 100) if total_homework > 0 else 0
             )
 
-            progress_data.append(
+            progress.setdefault(row["course_id"], []).append(
                 {
-                    "lesson_title": lesson.title,
+                    "lesson_title": row["lesson__title"],
                     "total_homework": total_homework,
                     "submitted_homework": submitted_homework,
                     "progress_percentage": progress_percentage,
                 }
             )
 
-        return progress_data
+        return progress
 
     def save(self, *args, **kwargs):
         if not self.enrollment_code:
@@ -188,10 +402,44 @@ class Lesson(ActiveModel):
     notes_content = models.TextField(
         blank=True, null=True, verbose_name="Notes Content"
     )
+    search_vector = search_vector_field(
+        ("title", "A"), ("content", "B"), ("notes_content", "C")
+    )
+    series = models.ForeignKey(
+        "LessonSeries",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="lessons",
+    )
+    occurrence = models.DateField(
+        null=True, blank=True, verbose_name="Series Occurrence"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["series", "occurrence"], name="lesson_series_occurrence_uniq"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="lesson_search_idx"),
+            trigram_index("title", "lesson_title_trgm_idx"),
+            models.Index(
+                fields=["course", "scheduled_time"],
+                name="lesson_active_course_time_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.course.title if self.course else 'No Course'})"
 
+    @classmethod
+    def active_dependents(cls, queryset):
+        """Homework follows the state of its lesson."""
+        return [Homework.objects.filter(lesson__in=queryset)]
+
     def get_user_role(self, user):
         """
         Determine the role of the user (teacher or student) for this lesson.
@@ -199,13 +447,97 @@ class Lesson(ActiveModel):
         if self.course.teacher == user:
             return "teacher"
         elif self.course.groups.filter(
-            memberships__user=user, memberships__role="student"
+            active_membership(user, role="student")
         ).exists():
             return "student"
         return "none"
 
 
-class Homework(ActiveModel):
+class LessonSeries(models.Model):
+    """
+    Model representing weekly recurring lessons of a course, like an
+    iCalendar ``RRULE`` with ``FREQ=WEEKLY``: a lesson at ``time`` on each
+    of ``weekdays`` every ``interval`` weeks from ``start_date``, ``count``
+    times or until ``until``, except on ``exdates``.
+
+    The occurrences are ``Lesson`` rows pointing back at the series, with
+    the title, content and links of the series (see ``api.series``).
+    """
+
+    WEEKDAY_CHOICES = (
+        ("MO", "Monday"),
+        ("TU", "Tuesday"),
+        ("WE", "Wednesday"),
+        ("TH", "Thursday"),
+        ("FR", "Friday"),
+        ("SA", "Saturday"),
+        ("SU", "Sunday"),
+    )
+
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="lesson_series"
+    )
+    title = models.CharField(max_length=255, verbose_name="Title")
+    content = models.TextField(blank=True, null=True, verbose_name="Content")
+    video_url = models.URLField(blank=True, null=True, verbose_name="Video URL")
+    meeting_link = models.URLField(blank=True, null=True, verbose_name="Meeting Link")
+    start_date = models.DateField(verbose_name="Start Date")
+    time = models.TimeField(verbose_name="Time")
+    weekdays = ArrayField(models.CharField(max_length=2, choices=WEEKDAY_CHOICES))
+    interval = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)]
+    )
+    count = models.PositiveSmallIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(1)]
+    )
+    until = models.DateField(null=True, blank=True)
+    exdates = ArrayField(models.DateField(), blank=True, default=list)
+
+    class Meta:
+        verbose_name_plural = "lesson series"
+
+    def __str__(self):
+        return f"{self.title} ({', '.join(self.weekdays)})"
+
+    def dates(self, limit=None):
+        """
+        Return the dates of the lessons of the series, in order.
+
+        As with ``RRULE`` and ``EXDATE``, ``count`` counts the dates before
+        ``exdates`` are left out. One of ``count`` and ``until`` must be set.
+
+        Args:
+            limit (int): Stop once more than this many dates are found.
+        """
+        days = [day for day, _ in self.WEEKDAY_CHOICES]
+        offsets = sorted({days.index(day) for day in self.weekdays})
+        if not offsets:
+            return []
+        excluded = set(self.exdates)
+        week = self.start_date - datetime.timedelta(days=self.start_date.weekday())
+        dates, generated = [], 0
+        while True:
+            for offset in offsets:
+                day = week + datetime.timedelta(days=offset)
+                if day < self.start_date:
+                    continue
+                if (self.until is not None and day > self.until) or (
+                    self.count is not None and generated >= self.count
+                ):
+                    return dates
+                generated += 1
+                if day not in excluded:
+                    dates.append(day)
+                    if limit is not None and len(dates) > limit:
+                        return dates
+            week += datetime.timedelta(weeks=self.interval)
+
+    def scheduled_time(self, day):
+        """Return the start of the lesson of the series on ``day``."""
+        return timezone.make_aware(datetime.datetime.combine(day, self.time))
+
+
+class Homework(BlobReferencesMixin, ActiveModel):
     """
     Model representing a homework assignment.
     """
@@ -220,13 +552,22 @@ class Homework(ActiveModel):
     )
     submission_date = models.DateTimeField(blank=True, null=True)
     submission_file = models.FileField(
-        upload_to="homework_submissions/", blank=True, null=True
+        upload_to="homework_submissions/",
+        storage=submission_storage,
+        blank=True,
+        null=True,
     )
     grade = models.IntegerField(blank=True, null=True)
+    search_vector = search_vector_field(("title", "A"), ("description", "B"))
 
     def __str__(self):
         return f"Homework for {self.lesson.title if hasattr(self, 'lesson') else 'No Lesson'}"
 
+    @classmethod
+    def active_dependents(cls, queryset):
+        """Submissions follow the state of their homework."""
+        return [HomeworkSubmission.objects.filter(homework__in=queryset)]
+
     @property
     def is_late(self):
         """
@@ -240,9 +581,18 @@ class Homework(ActiveModel):
 
     class Meta:
         ordering = ["due_date"]
-
-
-class HomeworkSubmission(ActiveModel):
+        indexes = [
+            GinIndex(fields=["search_vector"], name="homework_search_idx"),
+            trigram_index("title", "homework_title_trgm_idx"),
+            models.Index(
+                fields=["course", "due_date"],
+                name="homework_active_course_due_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+
+class HomeworkSubmission(BlobReferencesMixin, ActiveModel):
     """
     Model representing a student's submission for a homework assignment.
     """
@@ -251,14 +601,44 @@ class HomeworkSubmission(ActiveModel):
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     submission_text = models.TextField()
     submission_file = models.FileField(
-        upload_to="homework_submissions/", blank=True, null=True
+        upload_to="homework_submissions/",
+        storage=submission_storage,
+        blank=True,
+        null=True,
     )
     submission_image = models.ImageField(
-        upload_to="homework_images/", blank=True, null=True
+        upload_to="homework_images/",
+        storage=submission_storage,
+        blank=True,
+        null=True,
+    )
+    thumbnail = models.ImageField(
+        upload_to="homework_images/thumbnails/",
+        storage=submission_storage,
+        blank=True,
+        null=True,
+        editable=False,
     )
+    preview = models.ImageField(
+        upload_to="homework_images/previews/",
+        storage=submission_storage,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    preview_source = models.CharField(max_length=255, blank=True, editable=False)
     submission_date = models.DateTimeField(auto_now_add=True)
     grade = models.IntegerField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["homework", "student"],
+                name="submission_active_hw_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
     def __str__(self):
         return f"Submission by {self.student} for {self.homework.title}"
 
@@ -280,11 +660,42 @@ class GroupMembership(ActiveModel):
 
     class Meta:
         unique_together = ("user", "group")
+        indexes = [
+            models.Index(
+                fields=["group", "role"],
+                name="membership_active_group_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.group} ({self.role})"
 
 
+def active_membership(user, prefix="", **membership):
+    """
+    Return a filter on the active groups that ``user`` is an active member of.
+
+    Deactivated groups and memberships grant no access and are not counted.
+
+    Args:
+        user (User): The member.
+        prefix (str): Lookup path to the group, e.g. ``"groups__"`` from a
+            course. Lookups in one ``filter()`` call share the same joins.
+        **membership: Further lookups on the membership, e.g. ``role``.
+
+    Returns:
+        Q: The filter.
+    """
+    lookups = {
+        "is_active": True,
+        "groupmembership__user": user,
+        "groupmembership__is_active": True,
+        **{f"groupmembership__{name}": value for name, value in membership.items()},
+    }
+    return models.Q(**{prefix + name: value for name, value in lookups.items()})
+
+
 class Group(ActiveModel):
     """
     Model representing a student group.
@@ -302,9 +713,29 @@ class Group(ActiveModel):
         settings.AUTH_USER_MODEL, through=GroupMembership
     )
 
+    class Meta:
+        indexes = [
+            trigram_index("name", "group_name_trgm_idx"),
+            models.Index(
+                fields=["course"],
+                name="group_active_course_idx",
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def active_dependents(cls, queryset):
+        """Memberships follow the state of their group."""
+        return [GroupMembership.objects.filter(group__in=queryset)]
+
+    @property
+    def students(self):
+        """Return the users who are students in the group."""
+        return self.memberships.filter(groupmembership__role="student")
+
     @property
     def student_count(self):
         """Return the number of students in the group."""
@@ -319,3 +750,134 @@ class Group(ActiveModel):
     def is_completed(self):
         """Check if the group has completed its training."""
         return not self.is_active
+
+
+class ChunkedUpload(BlobReferencesMixin, models.Model):
+    """
+    A file uploaded in chunks, outside of the request that uses it.
+
+    Chunks are written to ``UPLOAD_TEMP_DIR`` while the upload is pending.
+    Completing the upload streams them into the storage backend, after which
+    the stored file can be attached to a homework submission by reference.
+    Uploads that are never attached are removed by ``manage.py
+    expire_uploads``.
+    """
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("assembling", "Assembling"),
+        ("complete", "Complete"),
+        ("attached", "Attached"),
+    )
+    KIND_CHOICES = (
+        ("file", "File"),
+        ("image", "Image"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads",
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default="file")
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64, blank=True)
+    file = models.FileField(
+        upload_to="uploads/%Y/%m/", storage=submission_storage, blank=True, null=True
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    @property
+    def total_chunks(self):
+        """Return the number of chunks the upload is split into."""
+        return max(1, math.ceil(self.size / self.chunk_size))
+
+    def chunk_length(self, index):
+        """Return the expected size in bytes of the chunk at ``index``."""
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.total_chunks - 1)
+
+
+class Blob(models.Model):
+    """
+    A file stored once in the content-addressed storage.
+
+    ``ref_count`` is the number of file fields that point at the blob. Blobs
+    that stay unreferenced are removed by ``manage.py collect_blobs``.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+
+class ArchivedCourse(models.Model):
+    """
+    A completed course moved out of the live tables by ``archive_courses``.
+
+    The primary key is the ID the course had, so a restored course keeps
+    it. The rows of the course are kept as ``ArchivedRecord`` objects.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    teacher = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_courses",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+
+class ArchiveJSONEncoder(DjangoJSONEncoder):
+    """JSON encoder that keeps the microseconds of datetimes and times."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class ArchivedRecord(models.Model):
+    """
+    One archived row of a course: the course itself, a group, membership,
+    lesson series, lesson, homework, submission or course relation.
+
+    ``data`` holds the column values by attribute name. ``files`` lists the
+    blob names the row refers to, so the blobs are kept while archived.
+    """
+
+    course = models.ForeignKey(
+        ArchivedCourse, on_delete=models.CASCADE, related_name="records"
+    )
+    model = models.CharField(max_length=100)
+    object_id = models.IntegerField()
+    data = models.JSONField(encoder=ArchiveJSONEncoder)
+    files = ArrayField(models.CharField(max_length=255), default=list, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["course", "model"])]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
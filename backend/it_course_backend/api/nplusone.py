@@ -0,0 +1,191 @@
+"""
+Detection of repeated query shapes (N+1 queries).
+
+Every SQL statement run inside ``detect_n_plus_one()`` is normalized to a
+template with literals and placeholders replaced by ``?``. When one template
+runs more than ``NPLUSONE_THRESHOLD`` times, the Python stack that issued it
+is recorded and reported: in ``raise`` mode an ``NPlusOneError`` is raised,
+in ``log`` mode a warning is logged on ``api.nplusone``.
+"""
+
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger("api.nplusone")
+
+MODES = ("off", "log", "raise")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class NPlusOneError(Exception):
+    """Raised in ``raise`` mode when a query template repeats too often."""
+
+
+def normalize_sql(sql):
+    """
+    Reduce a SQL statement to its template.
+
+    Args:
+        sql (str): The SQL statement, with or without placeholders.
+
+    Returns:
+        str: The statement with literals replaced by ``?`` and ``IN`` lists
+        collapsed, so that queries differing only by values compare equal.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _project_stack():
+    """Return the formatted stack frames that belong to this project."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-3]
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+    ]
+    return traceback.format_list(frames)
+
+
+class QueryTemplateTracker:
+    """
+    Execute wrapper that counts how often each query template runs.
+
+    The stack is captured only once per template, when the template first
+    crosses the threshold, so the common case costs a regex and a dict update.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_IGNORED_PREFIXES):
+            template = normalize_sql(sql)
+            self.counts[template] += 1
+            if self.counts[template] == self.threshold + 1:
+                self.stacks[template] = _project_stack()
+        return execute(sql, params, many, context)
+
+    def offenders(self):
+        """
+        Return the templates that ran more than ``threshold`` times.
+
+        Returns:
+            list[dict]: ``template``, ``count`` and ``stack`` of each offender,
+            most frequent first.
+        """
+        return [
+            {"template": template, "count": count, "stack": self.stacks[template]}
+            for template, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+
+def format_report(offenders):
+    """
+    Render offenders as a human-readable report.
+
+    Args:
+        offenders (list[dict]): The result of ``QueryTemplateTracker.offenders``.
+
+    Returns:
+        str: One block per template with its count and issuing stack.
+    """
+    blocks = []
+    for offender in offenders:
+        blocks.append(
+            f"{offender['count']}x {offender['template']}\n"
+            + "".join(offender["stack"])
+        )
+    return "Repeated queries detected:\n" + "\n".join(blocks)
+
+
+@contextmanager
+def detect_n_plus_one(mode=None, threshold=None, label=""):
+    """
+    Watch the queries run inside the block for repeated templates.
+
+    Args:
+        mode (str): ``off``, ``log`` or ``raise``. Defaults to ``NPLUSONE_MODE``.
+        threshold (int): Allowed repetitions per template. Defaults to
+            ``NPLUSONE_THRESHOLD``.
+        label (str): Included in the report, e.g. the request path.
+
+    Yields:
+        QueryTemplateTracker: The tracker, or None when detection is off.
+
+    Raises:
+        NPlusOneError: In ``raise`` mode, if a template repeats too often.
+    """
+    mode = mode or getattr(settings, "NPLUSONE_MODE", "off")
+    if mode not in MODES:
+        raise ValueError(f"NPLUSONE_MODE must be one of {MODES}, not {mode!r}.")
+    if mode == "off":
+        yield None
+        return
+
+    if threshold is None:
+        threshold = getattr(settings, "NPLUSONE_THRESHOLD", 5)
+    tracker = QueryTemplateTracker(threshold)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(tracker))
+        yield tracker
+
+    offenders = tracker.offenders()
+    if not offenders:
+        return
+
+    report = format_report(offenders)
+    if label:
+        report = f"{label}: {report}"
+    if mode == "raise":
+        raise NPlusOneError(report)
+    logger.warning(
+        report,
+        extra={
+            "label": label,
+            "templates": [(o["template"], o["count"]) for o in offenders],
+        },
+    )
+
+
+class NPlusOneMiddleware:
+    """
+    Run the N+1 detector around every request under ``PERF_PATH_PREFIX``.
+
+    The mode comes from ``NPLUSONE_MODE``: ``raise`` in tests, ``log`` on
+    staging and ``off`` in production.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path_prefix = getattr(settings, "PERF_PATH_PREFIX", "/api/")
+        if not request.path.startswith(path_prefix):
+            return self.get_response(request)
+
+        label = f"{request.method} {request.path}"
+        with detect_n_plus_one(label=label):
+            response = self.get_response(request)
+        return response
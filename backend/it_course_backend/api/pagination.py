@@ -0,0 +1,53 @@
+"""
+Pagination helpers for large tables.
+
+``COUNT(*)`` has to visit every row of a table, which takes seconds once a
+table such as ``api_homeworksubmission`` holds millions of rows.
+``EstimatedCountPaginator`` reads the planner's row estimate from
+``pg_class.reltuples`` instead when the whole table is paginated.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(model, using="default"):
+    """
+    Return PostgreSQL's estimate of the number of rows of a model's table.
+
+    The estimate is refreshed by ``VACUUM``, ``ANALYZE`` and autovacuum.
+
+    Returns:
+        int | None: The estimate, or None if the table was never analyzed.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that estimates the count of large, unfiltered querysets.
+
+    Filtered querysets, and tables whose estimate is below
+    ``estimate_threshold`` rows, are still counted exactly.
+    """
+
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
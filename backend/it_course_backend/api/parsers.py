@@ -0,0 +1,22 @@
+"""
+JSON parsing with orjson.
+"""
+
+import orjson
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+
+class ORJSONParser(parsers.JSONParser):
+    """
+    Drop-in replacement for DRF's ``JSONParser`` that uses orjson.
+
+    Like DRF's parser in strict mode, it rejects ``NaN`` and ``Infinity``.
+    Request bodies must be UTF-8, as RFC 8259 requires.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
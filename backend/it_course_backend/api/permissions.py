@@ -4,14 +4,36 @@ Custom permissions for the API.
 
 from rest_framework.permissions import BasePermission
 from rest_framework.exceptions import PermissionDenied
-from .models import Group
+from .models import Group, active_membership
+
+
+def permission_cache(request):
+    """
+    Return the per-request cache of permission results.
+
+    The cache lives on the underlying ``HttpRequest``, so it is shared by
+    the clones the browsable API makes to check the permissions of each of
+    its forms.
+    """
+    request = getattr(request, "_request", request)
+    try:
+        return request.permission_cache
+    except AttributeError:
+        request.permission_cache = {}
+        return request.permission_cache
 
 
 class IsCourseTeacher(BasePermission):
     """
     Custom permission to check if the user is the teacher of the course or the group.
+
+    Object checks read ``obj.course.teacher_id``; views fetch the relations
+    in ``object_relations`` with the object (see
+    ``api.views.mixins.PermissionRelationsMixin``).
     """
 
+    object_relations = ("course",)
+
     def has_permission(self, request, view):
         """
         Check if the user has permission to perform the action.
@@ -27,9 +49,13 @@ class IsCourseTeacher(BasePermission):
         group_id = view.kwargs.get("group_id")
 
         if group_id:
-            return Group.objects.filter(
-                id=group_id, memberships__user=user, memberships__role="teacher"
-            ).exists()
+            cache = permission_cache(request)
+            key = ("teaches_group", user.pk, str(group_id))
+            if key not in cache:
+                cache[key] = Group.objects.filter(
+                    active_membership(user, role="teacher"), id=group_id
+                ).exists()
+            return cache[key]
 
         return True
 
@@ -50,8 +76,9 @@ class IsCourseTeacher(BasePermission):
         """
         user = request.user
 
-        if hasattr(obj, "course") and obj.course.teacher == user:
+        course = getattr(obj, "course", None)
+        if course is not None and course.teacher_id == user.id:
             return True
-        elif hasattr(obj, "teacher") and obj.teacher == user:
+        elif hasattr(obj, "teacher_id") and obj.teacher_id == user.id:
             return True
         raise PermissionDenied("You do not have permission to modify this object.")
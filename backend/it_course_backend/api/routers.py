@@ -0,0 +1,85 @@
+"""
+Routing of database reads to read replicas.
+
+Reads go to a replica listed in ``DATABASE_REPLICAS`` only inside
+``replica_reads()``, which ``ReplicaRoutingMiddleware`` enters for GET,
+HEAD and OPTIONS requests of clients that have not written recently.
+Everything else, such as writes, reads inside transactions, management
+commands and background jobs, uses the primary database.
+
+Once a request writes, the rest of it reads from the primary as well, so it
+sees its own writes without waiting for replication.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_reads = ContextVar("replica_reads", default=None)
+
+
+class ReadState:
+    """Whether the current request may read from replicas, and whether it wrote."""
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+@contextmanager
+def replica_reads(use_replicas=True):
+    """
+    Let the reads of the enclosed code go to the read replicas.
+
+    Yields:
+        ReadState: Tells afterwards whether the code wrote to the primary.
+    """
+    state = ReadState(use_replicas)
+    token = _reads.set(state)
+    try:
+        yield state
+    finally:
+        _reads.reset(token)
+
+
+def replicas():
+    """Return the aliases of the configured read replicas."""
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+class ReplicaRouter:
+    """Send reads to a random replica where that is safe and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _reads.get()
+        aliases = replicas()
+        if (
+            not aliases
+            or state is None
+            or not state.use_replicas
+            or state.wrote
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _reads.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in replicas():
+            return False
+        return None
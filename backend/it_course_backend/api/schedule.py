@@ -0,0 +1,147 @@
+"""
+Schedule conflicts and free slots.
+
+Every lesson lasts ``LESSON_DURATION_MINUTES``, so two lessons overlap when
+they start less than one duration apart, and the sorted start times of a
+set of lessons are an interval index over them. A ``Schedule`` loads the
+start times of the lessons that keep some people busy in a window with one
+query over the ``(course, scheduled_time)`` index of active lessons, and
+checks a time for conflicts with two binary searches, however many lessons
+a term has.
+
+People are busy during the lessons of the courses they teach and of the
+courses of the groups they are members of.
+"""
+
+import bisect
+import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Course, GroupMembership, Lesson
+
+
+def lesson_duration():
+    """Return the duration of a lesson."""
+    return datetime.timedelta(minutes=settings.LESSON_DURATION_MINUTES)
+
+
+def busy_courses(teacher_id, group_ids):
+    """
+    Return the IDs of the courses whose lessons keep a teacher or a member
+    of the groups busy, as a subquery.
+    """
+    members = GroupMembership.objects.filter(
+        group_id__in=group_ids, is_active=True
+    ).values("user_id")
+    people = Q(teacher_id__in=members) | Q(
+        groups__groupmembership__user_id__in=members,
+        groups__groupmembership__is_active=True,
+    )
+    if teacher_id is not None:
+        people |= Q(teacher_id=teacher_id) | Q(
+            groups__groupmembership__user_id=teacher_id,
+            groups__groupmembership__is_active=True,
+        )
+    return Course.objects.filter(people).values("pk")
+
+
+def _on_grid(moment, origin, step):
+    """Return the first of ``origin + n * step`` at or after ``moment``."""
+    if moment <= origin:
+        return origin
+    return origin + -((origin - moment) // step) * step
+
+
+class Schedule:
+    """
+    The lessons that keep a teacher and the members of groups busy while a
+    lesson starting in ``[start, end]`` would take place.
+
+    Args:
+        teacher_id (int): ID of the teacher.
+        group_ids: IDs of the groups, as a list or a subquery.
+        start, end (datetime): Earliest and latest start of lessons to check.
+        exclude: IDs of lessons to leave out, e.g. of those being moved.
+    """
+
+    def __init__(self, teacher_id, group_ids, start, end, exclude=()):
+        self.duration = lesson_duration()
+        self.start, self.end = start, end
+        self.lessons = list(
+            Lesson.active.filter(
+                course__in=busy_courses(teacher_id, group_ids),
+                scheduled_time__gt=start - self.duration,
+                scheduled_time__lt=end + self.duration,
+            )
+            .exclude(pk__in=exclude)
+            .order_by("scheduled_time", "pk")
+            .values_list("scheduled_time", "pk")
+        )
+        self.starts = [lesson[0] for lesson in self.lessons]
+
+    @classmethod
+    def for_course(cls, course, start, end, exclude=()):
+        """Return the schedule of the teacher and the groups of ``course``."""
+        group_ids = Course.groups.through.objects.filter(course_id=course.pk)
+        return cls(course.teacher_id, group_ids.values("group_id"), start, end, exclude)
+
+    def conflicts(self, start):
+        """
+        Return the lessons a lesson at ``start`` would overlap, as
+        ``(scheduled_time, id)`` tuples in order.
+        """
+        low = bisect.bisect_right(self.starts, start - self.duration)
+        high = bisect.bisect_left(self.starts, start + self.duration, lo=low)
+        return self.lessons[low:high]
+
+    def free_slots(self, count):
+        """
+        Return up to ``count`` starts from ``start`` to ``end`` at which a
+        lesson overlaps no other.
+
+        Starts are ``SCHEDULE_SLOT_MINUTES`` apart, and lessons start and end
+        between ``SCHEDULE_DAY_START`` and ``SCHEDULE_DAY_END`` local time.
+        """
+        step = datetime.timedelta(minutes=settings.SCHEDULE_SLOT_MINUTES)
+        opening = datetime.time.fromisoformat(settings.SCHEDULE_DAY_START)
+        closing = datetime.time.fromisoformat(settings.SCHEDULE_DAY_END)
+
+        slots = []
+        day = timezone.localtime(self.start).date()
+        while len(slots) < count and day <= timezone.localtime(self.end).date():
+            opens = timezone.make_aware(datetime.datetime.combine(day, opening))
+            closes = timezone.make_aware(datetime.datetime.combine(day, closing))
+            slot = _on_grid(self.start, opens, step)
+            while len(slots) < count and slot + self.duration <= closes:
+                if slot > self.end:
+                    return slots
+                overlapping = self.conflicts(slot)
+                if overlapping:
+                    # Skip to the end of the last lesson in the way.
+                    slot = _on_grid(overlapping[-1][0] + self.duration, opens, step)
+                else:
+                    slots.append(slot)
+                    slot += step
+            day += datetime.timedelta(days=1)
+        return slots
+
+
+def describe_conflicts(conflicts, limit=3):
+    """
+    Return a message with the times of the lessons in ``conflicts``.
+
+    The lessons may be of other teachers, so they are not named.
+    """
+    times = [
+        f"{timezone.localtime(start):%Y-%m-%d %H:%M}" for start, _ in conflicts[:limit]
+    ]
+    if len(conflicts) > limit:
+        times.append(f"{len(conflicts) - limit} more")
+    return (
+        "Overlaps with lessons of the teacher or of group members at "
+        + ", ".join(times)
+        + "."
+    )
@@ -0,0 +1,151 @@
+"""
+Full-text search over courses, lessons and homework, and user autocomplete.
+
+Each searchable model has a ``search_vector`` column generated by
+PostgreSQL from its text fields and indexed with GIN (see
+``models.search_vector_field``). ``search()`` matches all three tables in a
+single ``UNION ALL`` query, ranks the rows with ``ts_rank`` and only returns
+objects of courses the user teaches or belongs to.
+
+``group_candidates()`` looks up users to add to a group. Its ``icontains``
+lookups are served by the trigram indexes of the user table.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import CharField, Exists, F, OuterRef, Q, Value
+
+from .models import (
+    SEARCH_CONFIG,
+    Course,
+    GroupMembership,
+    Homework,
+    Lesson,
+    User,
+    active_membership,
+)
+
+SEARCH_TYPES = ("course", "lesson", "homework")
+
+
+def accessible_courses(user):
+    """Return the active courses the user teaches or is a group member of."""
+    member_course_ids = Course.groups.through.objects.filter(
+        active_membership(user, "group__")
+    ).values("course_id")
+    return Course.active.filter(Q(teacher=user) | Q(id__in=member_course_ids))
+
+
+def _matches(queryset, kind, query, course_id, course_title):
+    # Every branch of the UNION selects the same columns in the same order.
+    return (
+        queryset.filter(is_active=True, search_vector=query)
+        .annotate(
+            result_type=Value(kind, output_field=CharField()),
+            result_id=F("id"),
+            result_title=F("title"),
+            result_course_id=F(course_id),
+            result_course_title=F(course_title),
+            rank=SearchRank(F("search_vector"), query),
+        )
+        .values(
+            "result_type",
+            "result_id",
+            "result_title",
+            "result_course_id",
+            "result_course_title",
+            "rank",
+        )
+    )
+
+
+def search(user, text, types=SEARCH_TYPES, limit=20):
+    """
+    Search the courses, lessons and homework visible to a user.
+
+    Args:
+        user (User): The user searching.
+        text (str): Search terms in web search syntax (``"exact phrase"``,
+            ``or``, ``-excluded``).
+        types (Iterable[str]): Kinds of objects to search, from ``SEARCH_TYPES``.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list[dict]: Results ordered by decreasing rank, each with ``type``,
+        ``id``, ``title``, ``course`` (``id`` and ``title``) and ``rank``.
+    """
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    course_ids = accessible_courses(user).values("id")
+
+    branches = []
+    if "course" in types:
+        branches.append(
+            _matches(
+                Course.objects.filter(id__in=course_ids), "course", query, "id", "title"
+            )
+        )
+    if "lesson" in types:
+        branches.append(
+            _matches(
+                Lesson.objects.filter(course_id__in=course_ids),
+                "lesson",
+                query,
+                "course_id",
+                "course__title",
+            )
+        )
+    if "homework" in types:
+        branches.append(
+            _matches(
+                Homework.objects.filter(course_id__in=course_ids),
+                "homework",
+                query,
+                "course_id",
+                "course__title",
+            )
+        )
+    if not branches:
+        return []
+
+    first, *others = branches
+    rows = first.union(*others, all=True) if others else first
+    rows = rows.order_by("-rank", "result_type", "result_id")[:limit]
+    return [
+        {
+            "type": row["result_type"],
+            "id": row["result_id"],
+            "title": row["result_title"],
+            "course": {
+                "id": row["result_course_id"],
+                "title": row["result_course_title"],
+            },
+            "rank": round(row["rank"], 4),
+        }
+        for row in rows
+    ]
+
+
+def group_candidates(group, text, limit=10):
+    """
+    Find active users matching a search term who are not in a group yet.
+
+    Args:
+        group (Group): The group users would be added to.
+        text (str): Part of the e-mail, first name or last name.
+        limit (int): Maximum number of users.
+
+    Returns:
+        list[dict]: Users with ``id``, ``email``, ``first_name`` and
+        ``last_name``, ordered by e-mail.
+    """
+    members = GroupMembership.objects.filter(group=group, user=OuterRef("pk"))
+    return list(
+        User.objects.filter(
+            Q(email__icontains=text)
+            | Q(first_name__icontains=text)
+            | Q(last_name__icontains=text),
+            is_active=True,
+        )
+        .exclude(Exists(members))
+        .order_by("email")
+        .values("id", "email", "first_name", "last_name")[:limit]
+    )
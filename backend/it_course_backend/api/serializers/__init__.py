@@ -3,7 +3,10 @@ from .learns import (
     GroupCreateUpdateSerializer,
     TeacherCourseSerializer,
     LessonSerializer,
+    LessonSeriesSerializer,
     LessonCalendarSerializer,
+    CalendarParamsSerializer,
+    FreeSlotsParamsSerializer,
     MembershipRoleSerializer,
 )
 
@@ -23,3 +26,16 @@ from .auth import (
     PasswordResetConfirmSerializer,
     GoogleLoginSerializer,
 )
+
+from .uploads import (
+    ChunkedUploadSerializer,
+    UploadCompleteSerializer,
+)
+
+from .search import AutocompleteParamsSerializer, SearchParamsSerializer
+
+from .values import (
+    HomeworkValuesSerializer,
+    LessonCalendarValuesSerializer,
+    LessonValuesSerializer,
+)
@@ -328,20 +328,19 @@ class GoogleLoginSerializer(serializers.Serializer):
 
     access_token = serializers.CharField(required=True)
 
-    def validate_access_token(self, value):
+    def validate(self, attrs):
         """
         Validate the access token and retrieve or create the user.
 
         Returns:
-            User instance associated with the token.
+            Validated data with the user associated with the token.
 
         Raises:
             ValidationError: If the token is invalid.
         """
-        user_data = self.verify_google_token(value)
-        user = self.get_or_create_user(user_data)
-        self.validated_data["user"] = user
-        return value
+        user_data = self.verify_google_token(attrs["access_token"])
+        attrs["user"] = self.get_or_create_user(user_data)
+        return attrs
 
     def verify_google_token(self, access_token):
         """
@@ -4,9 +4,21 @@ FAQ, Course, Group, Lesson, and related data structures.
 """
 
 from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
+from django.conf import settings
 from django.utils import timezone
-from ..models import Course, Group, Lesson, User, GroupMembership
-from datetime import datetime
+from ..models import (
+    Course,
+    Group,
+    Lesson,
+    LessonSeries,
+    User,
+    GroupMembership,
+    active_membership,
+)
+from ..schedule import Schedule, describe_conflicts
+from .sparse import SparseFieldsetMixin
+from datetime import datetime, timedelta
 
 
 class DateFromDatetimeField(serializers.DateField):
@@ -31,7 +43,63 @@ class DateFromDatetimeField(serializers.DateField):
         raise serializers.ValidationError("Invalid date format.")
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class HomeworkProgressMixin(serializers.Serializer):
+    """
+    Adds the read-only `homework_progress` field to course serializers.
+
+    Notes for Frontend:
+        - List views compute progress for all courses at once and pass it in
+          the serializer context as `homework_progress`.
+    """
+
+    homework_progress = serializers.SerializerMethodField()
+
+    def get_homework_progress(self, obj):
+        """
+        Retrieve the homework progress for the course.
+
+        Returns:
+            A progress percentage calculated by the Course model.
+        """
+        progress = self.context.get("homework_progress")
+        if progress is not None:
+            return progress.get(obj.pk, [])
+        return obj.homework_progress()
+
+
+class CourseSummarySerializer(serializers.ModelSerializer):
+    """
+    Short course representation embedded with `?include=course`.
+    """
+
+    class Meta:
+        model = Course
+        fields = ["id", "title"]
+
+
+class GroupSummarySerializer(serializers.ModelSerializer):
+    """
+    Short group representation embedded with `?include=groups`.
+    """
+
+    class Meta:
+        model = Group
+        fields = ["id", "name"]
+
+
+class LessonSummarySerializer(serializers.ModelSerializer):
+    """
+    Short lesson representation embedded with `?include=lessons`.
+    """
+
+    class Meta:
+        model = Lesson
+        fields = ["id", "title", "scheduled_time"]
+
+
+class CourseSerializer(
+    SparseFieldsetMixin, HomeworkProgressMixin, serializers.ModelSerializer
+):
     """
     Serializer for the Course model, handling detailed course data.
 
@@ -44,9 +112,9 @@ class CourseSerializer(serializers.ModelSerializer):
     Notes for Frontend:
         - `homework_progress` is read-only and provides real-time homework statistics.
         - `groups` and `lessons` are editable relationships and must reference existing entities.
+        - Reads accept `?fields=` and `?include=groups,lessons`.
     """
 
-    homework_progress = serializers.SerializerMethodField()
     groups = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), many=True)
     lessons = serializers.PrimaryKeyRelatedField(
         queryset=Lesson.objects.all(), many=True
@@ -54,7 +122,12 @@ class CourseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Course
-        fields = "__all__"
+        # The search vector is an internal, database-generated column.
+        exclude = ["search_vector"]
+        includes = {
+            "groups": GroupSummarySerializer,
+            "lessons": LessonSummarySerializer,
+        }
 
     def validate_title(self, value):
         """
@@ -104,15 +177,6 @@ class CourseSerializer(serializers.ModelSerializer):
 
         return course
 
-    def get_homework_progress(self, obj):
-        """
-        Retrieve the homework progress for the course.
-
-        Returns:
-            A progress percentage calculated by the Course model.
-        """
-        return obj.homework_progress()
-
 
 class GroupCreateUpdateSerializer(serializers.ModelSerializer):
     """
@@ -128,6 +192,10 @@ class GroupCreateUpdateSerializer(serializers.ModelSerializer):
         - At least one student must be assigned to the group.
     """
 
+    students = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), many=True
+    )
+
     class Meta:
         model = Group
         fields = ["id", "name", "students"]
@@ -142,8 +210,20 @@ class GroupCreateUpdateSerializer(serializers.ModelSerializer):
         Returns:
             The newly created Group instance.
         """
+        students = validated_data.pop("students", [])
         group = super().create(validated_data)
-        group.memberships.create(user=self.context["request"].user, role="teacher")
+        GroupMembership.objects.bulk_create(
+            [
+                GroupMembership(
+                    user=self.context["request"].user, group=group, role="teacher"
+                )
+            ]
+            + [
+                GroupMembership(user=student, group=group, role="student")
+                for student in students
+                if student != self.context["request"].user
+            ]
+        )
         return group
 
     def update(self, instance, validated_data):
@@ -161,8 +241,17 @@ class GroupCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
 
         students = validated_data.get("students")
-        if students and all(student in User.objects.all() for student in students):
-            instance.students.set(students)
+        if students:
+            GroupMembership.objects.filter(group=instance, role="student").exclude(
+                user__in=students
+            ).delete()
+            GroupMembership.objects.bulk_create(
+                [
+                    GroupMembership(user=student, group=instance, role="student")
+                    for student in students
+                ],
+                ignore_conflicts=True,
+            )
 
         return instance
 
@@ -186,7 +275,9 @@ class GroupCreateUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class TeacherCourseSerializer(serializers.ModelSerializer):
+class TeacherCourseSerializer(
+    SparseFieldsetMixin, HomeworkProgressMixin, serializers.ModelSerializer
+):
     """
     Serializer for creating a new course by a teacher.
 
@@ -198,6 +289,7 @@ class TeacherCourseSerializer(serializers.ModelSerializer):
 
     Notes for Frontend:
         - The teacher is automatically assigned based on the authenticated user.
+        - Reads accept `?fields=`.
     """
 
     class Meta:
@@ -218,7 +310,17 @@ class TeacherCourseSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class LessonSerializer(serializers.ModelSerializer):
+def represent_conflicts(conflicts):
+    """
+    Return the start times of the lessons in ``conflicts`` for a response.
+
+    The lessons may be of other teachers, so their IDs are left out.
+    """
+    to_time = serializers.DateTimeField().to_representation
+    return [{"scheduled_time": to_time(start)} for start, _ in conflicts]
+
+
+class LessonSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for the Lesson model, providing detailed lesson information.
 
@@ -232,13 +334,21 @@ class LessonSerializer(serializers.ModelSerializer):
         - notes_url: Optional URL to lesson notes.
         - notes_content: Additional content for the notes.
         - course: Associated course for the lesson.
+        - series: ID of the lesson series the lesson belongs to, if any.
         - user_role: Dynamically indicates if the user is a teacher or student.
+        - allow_conflicts: Write-only; save the lesson even if it overlaps
+          other lessons of the teacher or of members of the course's groups.
 
     Notes for Frontend:
         - The `user_role` field helps determine the user's access level.
+        - Reads accept `?fields=` and `?include=course`.
+        - Overlapping lessons are rejected with an error on `scheduled_time`.
+          With `allow_conflicts`, they are saved and the start times of the
+          lessons in the way are listed in `conflicts`.
     """
 
     user_role = serializers.SerializerMethodField()
+    allow_conflicts = serializers.BooleanField(write_only=True, default=False)
 
     class Meta:
         model = Lesson
@@ -252,8 +362,58 @@ class LessonSerializer(serializers.ModelSerializer):
             "notes_url",
             "notes_content",
             "course",
+            "series",
             "user_role",
+            "allow_conflicts",
         ]
+        read_only_fields = ["series"]
+        includes = {"course": CourseSummarySerializer}
+
+    def validate_course(self, value):
+        """
+        Ensure the user teaches the course, before its schedule is checked.
+
+        Raises:
+            PermissionDenied: If the user does not teach the course.
+        """
+        if value.teacher_id != self.context["request"].user.id:
+            raise PermissionDenied("You do not teach this course.")
+        return value
+
+    def validate(self, attrs):
+        """
+        Check a new or moved lesson for overlaps with other lessons.
+
+        Raises:
+            serializers.ValidationError: If the lesson overlaps others and
+                `allow_conflicts` is not set.
+        """
+        allow_conflicts = attrs.pop("allow_conflicts", False)
+        self.conflicts = []
+        if self.instance is not None and not (
+            attrs.keys() & {"course", "scheduled_time"}
+        ):
+            return attrs
+
+        course = attrs.get("course", getattr(self.instance, "course", None))
+        start = attrs.get(
+            "scheduled_time", getattr(self.instance, "scheduled_time", None)
+        )
+        exclude = [self.instance.pk] if self.instance is not None else []
+        self.conflicts = Schedule.for_course(course, start, start, exclude).conflicts(
+            start
+        )
+        if self.conflicts and not allow_conflicts:
+            raise serializers.ValidationError(
+                {"scheduled_time": describe_conflicts(self.conflicts)}
+            )
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if getattr(self, "conflicts", None):
+            data["conflicts"] = represent_conflicts(self.conflicts)
+        return data
 
     def get_user_role(self, obj):
         """
@@ -265,15 +425,180 @@ class LessonSerializer(serializers.ModelSerializer):
         request = self.context.get("request", None)
         if request:
             user = request.user
-            if obj.course.teacher == user:
+            if obj.course.teacher_id == user.id:
                 return "teacher"
+
+            student_course_ids = self.context.get("student_course_ids")
+            if student_course_ids is not None:
+                return "student" if obj.course_id in student_course_ids else None
             elif obj.course.groups.filter(
-                memberships__user=user, memberships__role="student"
+                active_membership(user, role="student")
             ).exists():
                 return "student"
         return None
 
 
+# Fields of a lesson series that define when its lessons are.
+RECURRENCE_FIELDS = (
+    "start_date",
+    "time",
+    "weekdays",
+    "interval",
+    "count",
+    "until",
+    "exdates",
+)
+
+
+class LessonSeriesSerializer(serializers.ModelSerializer):
+    """
+    Serializer for LessonSeries objects, weekly recurring lessons of a course.
+
+    Fields:
+        - id: Unique identifier for the series.
+        - course: Course of the lessons. Cannot be changed.
+        - title, content, video_url, meeting_link: Copied to every lesson.
+        - start_date: Date of the first possible lesson.
+        - time: Time of day of the lessons.
+        - weekdays: Days with a lesson, e.g. `["MO", "WE"]`.
+        - interval: Weeks between the weeks with lessons (default: 1).
+        - count: Number of lessons, exception dates included.
+        - until: Date of the last possible lesson.
+        - exdates: Dates without a lesson.
+        - lessons: The active lessons of the series.
+        - allow_conflicts: Write-only; save the series even if lessons
+          overlap other lessons of the teacher or of group members.
+
+    Notes for Frontend:
+        - Overlapping upcoming lessons are rejected. With `allow_conflicts`,
+          they are saved and the start times of the lessons in the way are
+          listed in `conflicts`.
+        - Exactly one of `count` and `until` must be set.
+        - A series has at most `LESSON_SERIES_MAX_OCCURRENCES` lessons.
+        - Edit one lesson through the lesson endpoints; edit the series to
+          change all upcoming lessons.
+    """
+
+    lessons = LessonSummarySerializer(many=True, read_only=True)
+    allow_conflicts = serializers.BooleanField(write_only=True, default=False)
+
+    class Meta:
+        model = LessonSeries
+        fields = [
+            "id",
+            "course",
+            "title",
+            "content",
+            "video_url",
+            "meeting_link",
+            "start_date",
+            "time",
+            "weekdays",
+            "interval",
+            "count",
+            "until",
+            "exdates",
+            "lessons",
+            "allow_conflicts",
+        ]
+
+    def validate_course(self, value):
+        """
+        Ensure the user teaches the course, before its schedule is checked.
+
+        Raises:
+            PermissionDenied: If the user does not teach the course.
+        """
+        if value.teacher_id != self.context["request"].user.id:
+            raise PermissionDenied("You do not teach this course.")
+        return value
+
+    def validate(self, attrs):
+        """
+        Expand the recurrence and keep its dates in `dates`.
+
+        Raises:
+            serializers.ValidationError: If the recurrence is incomplete,
+                has no lessons or too many, or if upcoming lessons overlap
+                others and `allow_conflicts` is not set.
+        """
+        allow_conflicts = attrs.pop("allow_conflicts", False)
+        if self.instance is not None:
+            course = attrs.get("course", self.instance.course)
+            if course != self.instance.course:
+                raise serializers.ValidationError(
+                    {"course": "The course of a series cannot be changed."}
+                )
+            values = {
+                field.name: getattr(self.instance, field.name)
+                for field in LessonSeries._meta.concrete_fields
+            }
+            series = LessonSeries(**{**values, **attrs})
+        else:
+            series = LessonSeries(**attrs)
+
+        if not series.weekdays:
+            raise serializers.ValidationError(
+                {"weekdays": "At least one weekday is required."}
+            )
+        if (series.count is None) == (series.until is None):
+            raise serializers.ValidationError(
+                {"count": "Set exactly one of count and until."}
+            )
+        if series.until is not None and series.until < series.start_date:
+            raise serializers.ValidationError(
+                {"until": "Until must not be before the start date."}
+            )
+
+        limit = settings.LESSON_SERIES_MAX_OCCURRENCES
+        self.dates = series.dates(limit)
+        if not self.dates:
+            raise serializers.ValidationError("The series has no lessons.")
+        if len(self.dates) > limit:
+            raise serializers.ValidationError(
+                f"A series can have at most {limit} lessons."
+            )
+
+        self.conflicts = []
+        if self.instance is None or attrs.keys() & set(RECURRENCE_FIELDS):
+            self.conflicts = self.find_conflicts(series)
+        if self.conflicts and not allow_conflicts:
+            raise serializers.ValidationError(describe_conflicts(self.conflicts))
+        return attrs
+
+    def find_conflicts(self, series):
+        """
+        Return the lessons the upcoming lessons of a series would overlap,
+        as ``(scheduled_time, id)`` tuples in order.
+        """
+        now = timezone.now()
+        starts = [
+            start
+            for start in map(series.scheduled_time, self.dates)
+            if start >= now or self.instance is None
+        ]
+        if not starts:
+            return []
+        exclude = (
+            Lesson.objects.filter(series=self.instance).values("pk")
+            if self.instance is not None
+            else []
+        )
+        schedule = Schedule.for_course(series.course, starts[0], starts[-1], exclude)
+        conflicts = {
+            conflict[1]: conflict
+            for start in starts
+            for conflict in schedule.conflicts(start)
+        }
+        return sorted(conflicts.values())
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if getattr(self, "conflicts", None):
+            data["conflicts"] = represent_conflicts(self.conflicts)
+        return data
+
+
 class LessonCalendarSerializer(serializers.ModelSerializer):
     """
     Serializer for Lesson objects used in calendar views.
@@ -294,6 +619,61 @@ class LessonCalendarSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "content", "scheduled_time", "meeting_link"]
 
 
+class CalendarParamsSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a calendar range.
+
+    Fields:
+        - start: First day of the range (default: the first day of this month).
+        - end: Last day of the range, inclusive (default: the last day of the
+          month of `start`). At most `CALENDAR_MAX_DAYS` after `start`.
+    """
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start = attrs.get("start") or timezone.localdate().replace(day=1)
+        end = attrs.get("end")
+        if end is None:
+            next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            end = next_month - timedelta(days=1)
+        if end < start:
+            raise serializers.ValidationError({"end": "End must not be before start."})
+        if (end - start).days >= settings.CALENDAR_MAX_DAYS:
+            raise serializers.ValidationError(
+                {"end": f"A range can span at most {settings.CALENDAR_MAX_DAYS} days."}
+            )
+        return {"start": start, "end": end}
+
+
+class FreeSlotsParamsSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a free slot search.
+
+    Fields:
+        - group: ID of the group whose members must be free.
+        - after: Earliest start (default and at the earliest: now).
+        - count: Number of slots, at most `SCHEDULE_MAX_SLOTS` (default: 5).
+    """
+
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.active.all())
+    after = serializers.DateTimeField(required=False)
+    count = serializers.IntegerField(min_value=1, default=5)
+
+    def validate_count(self, value):
+        if value > settings.SCHEDULE_MAX_SLOTS:
+            raise serializers.ValidationError(
+                f"At most {settings.SCHEDULE_MAX_SLOTS} slots can be requested."
+            )
+        return value
+
+    def validate(self, attrs):
+        now = timezone.now()
+        attrs["after"] = max(attrs.get("after", now), now)
+        return attrs
+
+
 class MembershipRoleSerializer(serializers.ModelSerializer):
     """
     Serializer for handling roles in group memberships.
@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+from ..search import SEARCH_TYPES
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a search.
+
+    Fields:
+        - q: Search terms, in web search syntax.
+        - type: Optional kind of result, `course`, `lesson` or `homework`.
+        - limit: Maximum number of results (1-50, default 20).
+    """
+
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    type = serializers.ChoiceField(choices=SEARCH_TYPES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class AutocompleteParamsSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of an autocomplete lookup.
+
+    Fields:
+        - q: Part of an e-mail or name; at least 3 characters, so that the
+          trigram indexes can be used.
+        - limit: Maximum number of results (1-50, default 10).
+    """
+
+    q = serializers.CharField(min_length=3, max_length=100, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
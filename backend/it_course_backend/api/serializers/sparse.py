@@ -0,0 +1,60 @@
+"""
+Sparse fieldsets for read endpoints.
+
+``?fields=id,title`` limits a response to the named fields and
+``?include=groups`` embeds the named related objects instead of their IDs.
+Views pass both parameters, split into sets, in the serializer context as
+``fields`` and ``include`` (see ``api.views.mixins.SparseFieldsetMixin``).
+"""
+
+from rest_framework import serializers
+
+
+def split_names(value):
+    """Split a comma-separated query parameter into a set of names."""
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that honours ``fields`` and ``include`` in the context.
+
+    Fields that are not requested are removed before serialization, so
+    their values, including method fields such as ``homework_progress``,
+    are never computed. Relations that can be embedded are listed in
+    ``Meta.includes`` as ``{field name: serializer class}``.
+
+    Raises:
+        serializers.ValidationError: For unknown field or include names.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        include = self.context.get("include") or set()
+        includes = getattr(self.Meta, "includes", {})
+
+        errors = {}
+        unknown = sorted((requested or set()) - set(fields))
+        if unknown:
+            errors["fields"] = [f"Unknown field: {name}." for name in unknown]
+        unknown = sorted(include - set(includes))
+        if unknown:
+            errors["include"] = [f"Cannot include: {name}." for name in unknown]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        for name in include:
+            field = fields[name]
+            fields[name] = includes[name](
+                source=field.source,
+                many=isinstance(field, serializers.ManyRelatedField),
+                read_only=True,
+            )
+        if requested is None:
+            return fields
+        return {
+            name: field
+            for name, field in fields.items()
+            if name in requested or name in include
+        }
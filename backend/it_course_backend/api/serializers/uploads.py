@@ -0,0 +1,137 @@
+"""
+Serializers for chunked, resumable uploads.
+"""
+
+import os
+
+from django.conf import settings
+from rest_framework import serializers
+
+from ..models import ChunkedUpload
+from ..uploads import received_chunks
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for starting an upload and reporting its progress.
+
+    Fields:
+        - id: Identifier used in the chunk and complete URLs.
+        - kind: `file` for submission files, `image` for submission images.
+        - filename, content_type, size: Declared by the client up front.
+        - chunk_size: Size of every chunk except the last (read-only).
+        - total_chunks: Number of chunks to send (read-only).
+        - received_chunks: Indexes of the chunks already stored (read-only).
+        - status: `pending`, `assembling`, `complete` or `attached`
+          (read-only).
+        - checksum: SHA-256 of the whole file. Optional when starting an
+          upload, in which case the assembled file is checked against it;
+          set once the upload is complete.
+
+    Notes for Frontend:
+        - To resume an interrupted upload, fetch it and send only the chunks
+          missing from `received_chunks`.
+    """
+
+    checksum = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True
+    )
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            "id",
+            "kind",
+            "filename",
+            "content_type",
+            "size",
+            "chunk_size",
+            "total_chunks",
+            "received_chunks",
+            "status",
+            "checksum",
+            "created_at",
+            "completed_at",
+        ]
+        read_only_fields = [
+            "chunk_size",
+            "status",
+            "created_at",
+            "completed_at",
+        ]
+
+    def get_received_chunks(self, obj):
+        if obj.status != "pending":
+            return list(range(obj.total_chunks))
+        return received_chunks(obj)
+
+    def validate_checksum(self, value):
+        return value.lower()
+
+    def validate_filename(self, value):
+        return os.path.basename(value.replace("\\", "/"))
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("File must not be empty.")
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File must not be larger than {settings.UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
+
+    def validate(self, attrs):
+        content_type = attrs["content_type"]
+        extensions = settings.UPLOAD_ALLOWED_TYPES.get(content_type)
+        if extensions is None:
+            raise serializers.ValidationError(
+                {"content_type": f"Files of type {content_type} are not allowed."}
+            )
+        extension = os.path.splitext(attrs["filename"])[1].lower()
+        if extension not in extensions:
+            raise serializers.ValidationError(
+                {"filename": f"Extension must be one of {', '.join(extensions)}."}
+            )
+        if attrs.get("kind") == "image" and not content_type.startswith("image/"):
+            raise serializers.ValidationError(
+                {"content_type": "Image uploads must have an image content type."}
+            )
+        return attrs
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    """
+    Serializer for completing an upload.
+
+    Fields:
+        - checksum: Optional SHA-256 hex digest of the whole file.
+    """
+
+    checksum = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True
+    )
+
+
+class UploadReferenceField(serializers.PrimaryKeyRelatedField):
+    """
+    Reference to a completed upload of the requesting user.
+
+    Args:
+        kind (str): The upload kind the field accepts.
+    """
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs.setdefault("queryset", ChunkedUpload.objects.all())
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        request = self.context.get("request")
+        user_id = getattr(getattr(request, "user", None), "pk", None)
+        return (
+            super()
+            .get_queryset()
+            .filter(user_id=user_id, kind=self.kind, status="complete")
+        )
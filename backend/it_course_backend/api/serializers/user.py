@@ -1,16 +1,37 @@
 """
-Serializers for the Homework application, providing functionality for 
+Serializers for the Homework application, providing functionality for
 handling submissions, retrieving assignments, and grading submissions.
 """
 
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from ..models import Homework, HomeworkSubmission, Group
+from ..models import ChunkedUpload, Homework, HomeworkSubmission, Group, Lesson
+from ..thumbnails import derivative_url
+from .learns import CourseSummarySerializer
+from .sparse import SparseFieldsetMixin
+from .uploads import UploadReferenceField
 
 User = get_user_model()
 
 
+class LessonSummaryField(serializers.PrimaryKeyRelatedField):
+    """
+    Lesson reference that is written as an ID and read as `{id, title}`.
+
+    Notes for Frontend:
+        - Send the lesson ID when creating or updating homework.
+        - Responses contain the lesson ID and title, or null.
+    """
+
+    def use_pk_only_optimization(self):
+        return False
+
+    def to_representation(self, value):
+        return {"id": value.id, "title": value.title}
+
+
 class HomeworkSubmissionSerializer(serializers.ModelSerializer):
     """
     Serializer for handling homework submissions. This provides an interface
@@ -25,14 +46,30 @@ class HomeworkSubmissionSerializer(serializers.ModelSerializer):
         - submission_image: Optional image attachment for the submission.
         - submission_date: The date when the homework was submitted (read-only).
         - grade: The grade assigned to this submission (read-only).
+        - file_upload: ID of a completed `file` upload to use as the
+          submission file (write-only).
+        - image_upload: ID of a completed `image` upload to use as the
+          submission image (write-only).
+        - thumbnail_url: URL of a fixed-size thumbnail of the image (read-only).
+        - preview_url: URL of a web-sized preview of the image (read-only).
 
     Notes for Frontend:
         - The `student`, `submission_date`, and `grade` fields are read-only and
           will be automatically populated by the backend.
         - The `submission_file` field is validated to ensure it is provided,
           raising an error if missing.
+        - Large files should be sent through the chunked upload API and
+          referenced with `file_upload` / `image_upload` instead of being
+          posted in the multipart body. An upload can be attached only once.
+        - `thumbnail_url` and `preview_url` are null until the previews have
+          been generated in the background, shortly after submission.
     """
 
+    file_upload = UploadReferenceField(kind="file", write_only=True, required=False)
+    image_upload = UploadReferenceField(kind="image", write_only=True, required=False)
+    thumbnail_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
+
     class Meta:
         model = HomeworkSubmission
         fields = [
@@ -44,9 +81,58 @@ class HomeworkSubmissionSerializer(serializers.ModelSerializer):
             "submission_image",
             "submission_date",
             "grade",
+            "file_upload",
+            "image_upload",
+            "thumbnail_url",
+            "preview_url",
         ]
         read_only_fields = ["student", "submission_date", "grade"]
 
+    def get_thumbnail_url(self, obj):
+        return derivative_url(obj, "thumbnail", self.context.get("request"))
+
+    def get_preview_url(self, obj):
+        return derivative_url(obj, "preview", self.context.get("request"))
+
+    def validate(self, attrs):
+        if attrs.get("file_upload") and attrs.get("submission_file"):
+            raise serializers.ValidationError(
+                {"file_upload": "Send either submission_file or file_upload."}
+            )
+        if attrs.get("image_upload") and attrs.get("submission_image"):
+            raise serializers.ValidationError(
+                {"image_upload": "Send either submission_image or image_upload."}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Create the submission, attaching referenced uploads without copying.
+
+        The stored file of each upload is assigned by name, and the upload is
+        marked as attached in the same transaction so it cannot be reused.
+        """
+        uploads = {
+            "submission_file": validated_data.pop("file_upload", None),
+            "submission_image": validated_data.pop("image_upload", None),
+        }
+        uploads = {field: upload for field, upload in uploads.items() if upload}
+        if not uploads:
+            return super().create(validated_data)
+
+        with transaction.atomic():
+            attached = ChunkedUpload.objects.filter(
+                pk__in=[upload.pk for upload in uploads.values()],
+                status="complete",
+            ).update(status="attached")
+            if attached != len(uploads):
+                raise serializers.ValidationError(
+                    "The upload has already been attached."
+                )
+            for field, upload in uploads.items():
+                validated_data[field] = upload.file.name
+            return super().create(validated_data)
+
     def validate_submission_file(self, value):
         """
         Validates that the submission file is provided.
@@ -65,7 +151,7 @@ class HomeworkSubmissionSerializer(serializers.ModelSerializer):
         return value
 
 
-class HomeworkSerializer(serializers.ModelSerializer):
+class HomeworkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for the Homework model. This provides details about a homework
     assignment, including its associated lesson and course.
@@ -79,17 +165,20 @@ class HomeworkSerializer(serializers.ModelSerializer):
         - submission_date: The date when the submission was made (read-only).
         - submission_file: Optional file attached during submission.
         - grade: The grade assigned for the homework (read-only).
-        - lesson: The associated lesson for the homework (retrieved dynamically).
+        - lesson: The associated lesson for the homework.
         - course: The course associated with the homework.
 
     Notes for Frontend:
         - The `submitted_by`, `submission_date`, and `grade` fields are read-only
           and populated by the backend.
-        - The `lesson` field is dynamically generated and includes the lesson ID
+        - The `lesson` field accepts a lesson ID and is returned as the lesson ID
           and title if a lesson is associated.
+        - Reads accept `?fields=` and `?include=course`.
     """
 
-    lesson = serializers.SerializerMethodField()
+    lesson = LessonSummaryField(
+        queryset=Lesson.objects.all(), required=False, allow_null=True
+    )
 
     class Meta:
         model = Homework
@@ -106,6 +195,7 @@ class HomeworkSerializer(serializers.ModelSerializer):
             "course",
         ]
         read_only_fields = ["submitted_by", "submission_date", "grade"]
+        includes = {"course": CourseSummarySerializer}
 
     @staticmethod
     def get_homeworks(user, now):
@@ -139,25 +229,6 @@ class HomeworkSerializer(serializers.ModelSerializer):
 
         return Homework.objects.none()
 
-    def get_lesson(self, obj):
-        """
-        Retrieve the associated lesson for the homework.
-
-        Args:
-            obj: The Homework object being serialized.
-
-        Returns:
-            A dictionary containing the lesson ID and title if the lesson exists,
-            or None if no lesson is associated.
-        """
-        lesson = obj.lesson
-        if lesson:
-            return {
-                "id": lesson.id,
-                "title": lesson.title,
-            }
-        return None
-
 
 class HomeworkGradeSerializer(serializers.ModelSerializer):
     """
@@ -0,0 +1,203 @@
+"""
+Read-only serializers that render list responses from ``values()`` rows.
+
+A ``ModelSerializer`` builds a model instance per row and then walks every
+field of it, which dominates the CPU time of long lists. The serializers
+here render the same fields from the rows of ``QuerySet.values_list()``.
+The field list of the wrapped DRF serializer is compiled once per response
+into ``(name, getter)`` pairs: plain values are read with ``itemgetter``,
+ISO 8601 datetimes are formatted with the time zone resolved once, and
+everything else goes through the DRF field's own ``to_representation``, so
+the output is identical to the wrapped serializer's.
+"""
+
+from operator import itemgetter
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from ..models import Course, active_membership
+from .learns import LessonCalendarSerializer, LessonSerializer
+from .user import HomeworkSerializer
+
+# Fields whose representation is the database value itself.
+PLAIN_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _converted(index, convert):
+    def get(row):
+        value = row[index]
+        return None if value is None else convert(value)
+
+    return get
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Render a queryset with the fields of ``serializer_class`` from ``values()``.
+
+    Fields that need more than one column are rendered by a ``render_<name>``
+    method that reads the lookups listed for the field in ``lookups``; their
+    positions in the row are in ``self.index``. Related objects embedded with
+    ``?include=`` are read through the foreign key in the same row.
+    """
+
+    serializer_class = None
+    lookups = {}
+
+    def compile(self):
+        """Return the ``values_list()`` lookups and the ``(name, getter)`` pairs."""
+        self.index = {}
+        getters = self.getters(self.serializer_class(context=self.context))
+        return list(self.index), getters
+
+    def column(self, lookup):
+        """Return the position of ``lookup`` in the row, adding it if needed."""
+        return self.index.setdefault(lookup, len(self.index))
+
+    def getters(self, serializer, prefix=""):
+        """
+        Return the ``(name, getter)`` pairs of the readable fields of
+        ``serializer``, whose lookups start with ``prefix``.
+        """
+        model = serializer.Meta.model
+        getters = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            render = None if prefix else getattr(self, f"render_{name}", None)
+            if render is not None:
+                for lookup in self.lookups.get(name, ()):
+                    self.column(lookup)
+                getters.append((name, render))
+                continue
+            lookup = prefix + field.source
+            if isinstance(field, serializers.BaseSerializer):
+                getters.append((name, self.nested_getter(field, lookup)))
+                continue
+            index = self.column(lookup)
+            if isinstance(field, PLAIN_FIELDS):
+                getter = itemgetter(index)
+            elif isinstance(field, serializers.FileField):
+                getter = self.file_getter(field, model, index)
+            elif isinstance(field, serializers.DateTimeField):
+                getter = self.datetime_getter(field, index)
+            else:
+                getter = _converted(index, field.to_representation)
+            getters.append((name, getter))
+        return getters
+
+    def nested_getter(self, serializer, lookup):
+        """Render a related object embedded with ``?include=``, or None."""
+        index = self.column(lookup)
+        getters = self.getters(serializer, f"{lookup}__")
+
+        def get(row):
+            if row[index] is None:
+                return None
+            return {name: getter(row) for name, getter in getters}
+
+        return get
+
+    def datetime_getter(self, field, index):
+        """Format datetimes as DRF's ``DateTimeField`` does, resolving its zone once."""
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        field_timezone = (
+            field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        )
+        if (
+            output_format is None
+            or output_format.lower() != ISO_8601
+            or field_timezone is None
+        ):
+            return _converted(index, field.to_representation)
+
+        def get(row):
+            value = row[index]
+            if not value:
+                return None
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return get
+
+    def file_getter(self, field, model, index):
+        """Render a file name as DRF's ``FileField`` renders the file: its URL."""
+        storage = model._meta.get_field(field.source).storage
+        request = self.context.get("request")
+
+        def get(row):
+            name = row[index]
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return get
+
+    def to_representation(self, queryset):
+        columns, getters = self.compile()
+        return [
+            {name: get(row) for name, get in getters}
+            for row in queryset.values_list(*columns)
+        ]
+
+
+class LessonCalendarValuesSerializer(ValuesSerializer):
+    """Fast read path of ``LessonCalendarSerializer``."""
+
+    serializer_class = LessonCalendarSerializer
+
+
+class LessonValuesSerializer(ValuesSerializer):
+    """
+    Fast read path of ``LessonSerializer``.
+
+    Uses ``student_course_ids`` from the context, or looks the courses up
+    with one query when ``user_role`` is requested.
+    """
+
+    serializer_class = LessonSerializer
+    lookups = {"user_role": ("course", "course__teacher")}
+
+    def compile(self):
+        columns, getters = super().compile()
+        request = self.context.get("request")
+        self.user_id = request.user.id if request else None
+        self.student_course_ids = self.context.get("student_course_ids")
+        wants_role = any(name == "user_role" for name, _ in getters)
+        if wants_role and request and self.student_course_ids is None:
+            self.student_course_ids = set(
+                Course.objects.filter(
+                    active_membership(request.user, "groups__", role="student")
+                ).values_list("id", flat=True)
+            )
+        return columns, getters
+
+    def render_user_role(self, row):
+        if self.user_id is None:
+            return None
+        if row[self.index["course__teacher"]] == self.user_id:
+            return "teacher"
+        if row[self.index["course"]] in self.student_course_ids:
+            return "student"
+        return None
+
+
+class HomeworkValuesSerializer(ValuesSerializer):
+    """Fast read path of ``HomeworkSerializer``."""
+
+    serializer_class = HomeworkSerializer
+    lookups = {"lesson": ("lesson", "lesson__title")}
+
+    def render_lesson(self, row):
+        lesson_id = row[self.index["lesson"]]
+        if lesson_id is None:
+            return None
+        return {"id": lesson_id, "title": row[self.index["lesson__title"]]}
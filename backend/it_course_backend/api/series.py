@@ -0,0 +1,138 @@
+"""
+Recurring lesson series.
+
+``create_series()`` saves a ``LessonSeries`` and inserts all of its lessons
+with a single ``bulk_create`` in one transaction.
+
+Each lesson remembers the date it was generated for in ``occurrence``, so
+occurrences can be edited one by one with the lesson API while the series
+still knows which of its dates it has. ``update_series()`` applies an edit
+of the whole series to its upcoming lessons: lessons of dates the
+recurrence no longer produces are deleted, new dates are inserted, and the
+rest get the new time and texts with one ``bulk_update``. A time or text
+that was changed on a single occurrence is kept.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .calendar import invalidate_calendars
+from .models import Lesson
+
+# Fields a series passes on to its lessons.
+TEMPLATE_FIELDS = ("title", "content", "video_url", "meeting_link")
+
+
+def build_lesson(series, day):
+    return Lesson(
+        course_id=series.course_id,
+        series=series,
+        occurrence=day,
+        scheduled_time=series.scheduled_time(day),
+        **{field: getattr(series, field) for field in TEMPLATE_FIELDS},
+    )
+
+
+def create_series(series, dates):
+    """
+    Save a new series and insert its lessons.
+
+    Args:
+        series (LessonSeries): The unsaved series.
+        dates (list): Its dates, from ``series.dates()``.
+
+    Returns:
+        list[Lesson]: The lessons, in order.
+    """
+    with transaction.atomic():
+        series.save()
+        lessons = Lesson.objects.bulk_create(
+            [build_lesson(series, day) for day in dates]
+        )
+        # bulk_create() sends no post_save.
+        invalidate_calendars([series.course_id])
+    return lessons
+
+
+def update_series(series, changes, dates):
+    """
+    Apply an edit of a whole series to the series and its upcoming lessons.
+
+    Lessons that have started are left as they are.
+
+    Args:
+        series (LessonSeries): The saved series, before the edit.
+        changes (dict): New values of series fields.
+        dates (list): The dates of the series after the edit.
+    """
+    old_texts = {field: getattr(series, field) for field in TEMPLATE_FIELDS}
+    old_times = {day: series.scheduled_time(day) for day in series.dates()}
+    for field, value in changes.items():
+        setattr(series, field, value)
+
+    now = timezone.now()
+    kept = set(dates)
+    with transaction.atomic():
+        series.save()
+        lessons = {
+            lesson.occurrence: lesson
+            for lesson in Lesson.objects.filter(series=series).defer("search_vector")
+        }
+        upcoming = {
+            day: lesson
+            for day, lesson in lessons.items()
+            if lesson.scheduled_time >= now
+        }
+
+        changed = []
+        for day, lesson in upcoming.items():
+            if day not in kept:
+                continue
+            fields = [
+                field
+                for field, old in old_texts.items()
+                if getattr(lesson, field) == old and getattr(series, field) != old
+            ]
+            for field in fields:
+                setattr(lesson, field, getattr(series, field))
+            start = series.scheduled_time(day)
+            if lesson.scheduled_time == old_times.get(day) != start:
+                lesson.scheduled_time = start
+                fields.append("scheduled_time")
+            if fields:
+                changed.append(lesson)
+
+        Lesson.objects.filter(
+            pk__in=[lesson.pk for day, lesson in upcoming.items() if day not in kept]
+        ).delete()
+        Lesson.objects.bulk_create(
+            [
+                build_lesson(series, day)
+                for day in dates
+                if day not in lessons and series.scheduled_time(day) >= now
+            ]
+        )
+        Lesson.objects.bulk_update(changed, [*TEMPLATE_FIELDS, "scheduled_time"])
+        invalidate_calendars([series.course_id])
+    return series
+
+
+def delete_series(series):
+    """Delete a series and its upcoming lessons; past lessons are kept."""
+    with transaction.atomic():
+        # Not through ``series.lessons``, which may be a prefetch that
+        # defers the fields the delete signals read.
+        Lesson.objects.filter(
+            series=series, scheduled_time__gte=timezone.now()
+        ).delete()
+        series.delete()
+
+
+def exclude_occurrence(lesson):
+    """Add the date of a deleted lesson to the exception dates of its series."""
+    if lesson.series_id is None:
+        return
+    series = lesson.series
+    if lesson.occurrence not in series.exdates:
+        series.exdates.append(lesson.occurrence)
+        series.save(update_fields=["exdates"])
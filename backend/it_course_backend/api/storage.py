@@ -0,0 +1,301 @@
+"""
+Content-addressed, deduplicated storage for submission files.
+
+``ContentAddressedStorage`` hashes a file while streaming it to a temporary
+file and stores it under its SHA-256 digest, e.g.
+``cas/3f/a1/3fa1...e9.pdf``. Saving content that is already stored only
+removes the temporary file, so every distinct file is kept once no matter
+how many homework, submissions or uploads use it.
+
+Each stored file has a ``Blob`` row with a reference count. The count is
+kept up to date by model signals for the fields registered with
+``track_references()`` and is rebuilt by ``manage.py collect_blobs
+--recount``. Deleting a field file never removes a blob directly, since
+other rows may share it; ``collect_blobs`` removes blobs that have had no
+references for a grace period.
+
+The file of a blob is written before its row is inserted in the caller's
+transaction, so a rollback leaves a file without a row. ``collect_blobs``
+removes such files once they are older than the grace period. Saving
+content whose file already exists touches the file, so a file that a new
+row is about to use is never old enough to be removed.
+"""
+
+import functools
+import hashlib
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+HASH_BLOCK_SIZE = 64 * 1024
+DEFAULT_GRACE = timedelta(hours=24)
+
+tracked_models = []
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that stores each distinct file once, by digest.
+
+    Args:
+        prefix (str): Directory under the storage root holding the blobs.
+    """
+
+    def __init__(self, prefix="cas", **kwargs):
+        self.prefix = prefix
+        super().__init__(**kwargs)
+
+    def blob_name(self, digest, extension=""):
+        """Return the storage name of the blob with the given digest."""
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+    def is_blob(self, name):
+        """Return True if a name was produced by this storage."""
+        return bool(name) and name.startswith(f"{self.prefix}/")
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from the content in _save(), and an existing file
+        # with the same name already holds the same bytes.
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1]
+        temp_dir = self.path(f"{self.prefix}/tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        if hasattr(content, "temporary_file_path"):
+            # Uploads spooled to disk by Django are hashed in place and moved.
+            source = content.temporary_file_path()
+            with open(source, "rb") as handle:
+                for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+                    size += len(block)
+            fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+            os.close(fd)
+            file_move_safe(source, temp_path, allow_overwrite=True)
+        else:
+            fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    size += len(chunk)
+                    handle.write(chunk)
+
+        digest = digest.hexdigest()
+        name = self.blob_name(digest, extension)
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.unlink(temp_path)
+            # Keep an orphaned file that is used again from being collected.
+            os.utime(full_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(temp_path, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+
+        from .models import Blob
+
+        # A single INSERT ... ON CONFLICT DO NOTHING, also when the blob exists.
+        Blob.objects.bulk_create(
+            [Blob(name=name, digest=digest, size=size)], ignore_conflicts=True
+        )
+        return name
+
+    def delete(self, name):
+        # Blobs are shared between rows and removed by purge() once unused.
+        if not self.is_blob(name):
+            super().delete(name)
+
+    def purge(self, name):
+        """Remove a blob file from disk."""
+        super().delete(name)
+
+    def blob_files(self):
+        """
+        Yield the name and modification time of every blob file on disk.
+
+        Temporary files of saves in progress are left out.
+        """
+        root = self.path(self.prefix)
+        for directory, subdirs, filenames in os.walk(root):
+            if directory == root and "tmp" in subdirs:
+                subdirs.remove("tmp")
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.location).replace(os.sep, "/")
+                yield name, os.path.getmtime(path)
+
+
+def adjust_references(names, delta):
+    """
+    Add ``delta`` to the reference counts of the given blob names.
+
+    Names outside the content-addressed storage are ignored.
+    """
+    from .models import Blob
+
+    for name in names:
+        if name:
+            Blob.objects.filter(name=name).update(
+                ref_count=F("ref_count") + delta,
+                released_at=timezone.now() if delta < 0 else None,
+            )
+
+
+def _file_name(value):
+    return getattr(value, "name", value) or None
+
+
+@functools.cache
+def blob_fields(model):
+    """Return the file fields of a model stored in a ContentAddressedStorage."""
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, "storage", None) is not None
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+class BlobReferencesMixin:
+    """
+    Model mixin that keeps the values a row was loaded with, so that
+    ``track_references()`` can tell which blobs a save replaced.
+
+    Loading a row only keeps a reference to its values; blob names are
+    looked up when the row is saved, so reading lists of rows costs nothing
+    extra.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = (field_names, values)
+        return instance
+
+
+def _current_names(instance):
+    # Deferred fields are not in __dict__ and are left out of the tracking.
+    return {
+        field.attname: _file_name(instance.__dict__[field.attname])
+        for field in blob_fields(type(instance))
+        if field.attname in instance.__dict__
+    }
+
+
+def _previous_names(instance):
+    """Return the blob names of a row as it was last loaded or saved."""
+    names = instance.__dict__.get("_blob_names")
+    if names is not None:
+        return names
+    field_names, values = instance.__dict__.get("_loaded_values", ((), ()))
+    attnames = {field.attname for field in blob_fields(type(instance))}
+    return {
+        attname: value or None
+        for attname, value in zip(field_names, values)
+        if attname in attnames
+    }
+
+
+def _update_references(sender, instance, created, **kwargs):
+    previous = {} if created else _previous_names(instance)
+    current = _current_names(instance)
+    added, removed = [], []
+    for field in blob_fields(sender):
+        if field.attname not in current:
+            continue
+        old = previous.get(field.attname)
+        new = current[field.attname]
+        if old != new:
+            added.append(new if field.storage.is_blob(new) else None)
+            removed.append(old if field.storage.is_blob(old) else None)
+    adjust_references(added, 1)
+    adjust_references(removed, -1)
+    instance._blob_names = current
+
+
+def _release_references(sender, instance, **kwargs):
+    adjust_references(
+        [
+            name
+            for field in blob_fields(sender)
+            if field.attname in instance.__dict__
+            for name in [_file_name(instance.__dict__[field.attname])]
+            if field.storage.is_blob(name)
+        ],
+        -1,
+    )
+
+
+def track_references(*models):
+    """
+    Keep blob reference counts in sync with the file fields of ``models``.
+
+    Only fields stored in a ``ContentAddressedStorage`` are tracked, and the
+    models must use ``BlobReferencesMixin``. Bulk operations such as
+    ``QuerySet.update()`` bypass the signals; run ``manage.py collect_blobs
+    --recount`` after them.
+    """
+    for model in models:
+        if not issubclass(model, BlobReferencesMixin):
+            raise TypeError(f"{model.__name__} must use BlobReferencesMixin.")
+        tracked_models.append(model)
+        post_save.connect(_update_references, sender=model, weak=False)
+        post_delete.connect(_release_references, sender=model, weak=False)
+
+
+def unreferenced_blobs(grace):
+    """
+    Return blobs that have had no references for at least ``grace``.
+
+    Args:
+        grace (timedelta): How long a blob must be unused before removal,
+            which protects files saved but not yet assigned to a row.
+    """
+    from .models import Blob
+
+    cutoff = timezone.now() - grace
+    return Blob.objects.filter(ref_count__lte=0, created_at__lt=cutoff).exclude(
+        released_at__gte=cutoff
+    )
+
+
+def orphaned_files(storage, grace, batch_size=1000):
+    """
+    Yield the names of blob files that have no ``Blob`` row and have not
+    been written or reused for at least ``grace``.
+
+    Args:
+        storage (ContentAddressedStorage): The storage to scan.
+        grace (timedelta): How long a file must be unused, which protects
+            files whose row is not committed yet.
+    """
+    from .models import Blob
+
+    cutoff = time.time() - grace.total_seconds()
+    batch = []
+
+    def orphans():
+        known = set(Blob.objects.filter(name__in=batch).values_list("name", flat=True))
+        return [name for name in batch if name not in known]
+
+    for name, modified in storage.blob_files():
+        if modified < cutoff:
+            batch.append(name)
+        if len(batch) >= batch_size:
+            yield from orphans()
+            batch = []
+    if batch:
+        yield from orphans()
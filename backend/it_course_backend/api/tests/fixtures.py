@@ -0,0 +1,200 @@
+"""
+Deterministic datasets for the API tests and benchmarks.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from ..models import (
+    Course,
+    Group,
+    GroupMembership,
+    Homework,
+    HomeworkSubmission,
+    Lesson,
+    User,
+)
+
+PASSWORD = "benchmark-password"
+
+DATASET_SIZES = {
+    "small": {
+        "courses": 2,
+        "students_per_course": 5,
+        "lessons_per_course": 4,
+        "homework_per_lesson": 1,
+    },
+    "medium": {
+        "courses": 8,
+        "students_per_course": 20,
+        "lessons_per_course": 10,
+        "homework_per_lesson": 1,
+    },
+    "large": {
+        "courses": 20,
+        "students_per_course": 40,
+        "lessons_per_course": 16,
+        "homework_per_lesson": 2,
+    },
+}
+
+
+class Dataset:
+    """
+    References to the objects a seeded dataset was built around.
+
+    Attributes:
+        teacher: Teaches every course and is the teacher of every group.
+        student: Is a student in every group.
+        course, group, lesson, homework, submission: Objects of the first
+            course, used as targets by detail routes.
+        other_student: A second student of the first group.
+    """
+
+    def __init__(self, **objects):
+        self.__dict__.update(objects)
+
+
+def seed_dataset(size):
+    """
+    Create courses, groups, memberships, lessons, homework and submissions.
+
+    Every course gets one group with the shared teacher, the shared student
+    and ``students_per_course`` other students. Half of the students of a
+    course submit each homework.
+
+    Args:
+        size (str): One of the keys of ``DATASET_SIZES``.
+
+    Returns:
+        Dataset: The objects the benchmark routes are pointed at.
+    """
+    spec = DATASET_SIZES[size]
+    now = timezone.now().replace(microsecond=0)
+    password = make_password(PASSWORD)
+
+    teacher = User.objects.create(
+        email=f"teacher.{size}@example.com",
+        first_name="Teacher",
+        last_name=size.title(),
+        password=password,
+    )
+    student = User.objects.create(
+        email=f"student.{size}@example.com",
+        first_name="Student",
+        last_name=size.title(),
+        password=password,
+    )
+    students = User.objects.bulk_create(
+        [
+            User(
+                email=f"student{i}.{size}@example.com",
+                first_name="Student",
+                last_name=str(i),
+                password=password,
+            )
+            for i in range(spec["students_per_course"] * spec["courses"])
+        ]
+    )
+
+    courses = Course.objects.bulk_create(
+        [
+            Course(
+                title=f"Course {i} ({size})",
+                description=f"Description of course {i}",
+                teacher=teacher,
+                enrollment_code=f"{size[:2]}{i:08d}",
+                start_date=now.date(),
+                state="in_progress",
+            )
+            for i in range(spec["courses"])
+        ]
+    )
+    groups = Group.objects.bulk_create(
+        [Group(name=f"Group {i}", course=course) for i, course in enumerate(courses)]
+    )
+    Course.groups.through.objects.bulk_create(
+        [
+            Course.groups.through(course_id=course.id, group_id=group.id)
+            for course, group in zip(courses, groups)
+        ]
+    )
+
+    memberships = []
+    group_students = {}
+    per_course = spec["students_per_course"]
+    for i, group in enumerate(groups):
+        members = students[i * per_course : (i + 1) * per_course]
+        group_students[group.id] = [student] + members
+        memberships.append(GroupMembership(user=teacher, group=group, role="teacher"))
+        memberships.extend(
+            GroupMembership(user=member, group=group, role="student")
+            for member in group_students[group.id]
+        )
+    GroupMembership.objects.bulk_create(memberships)
+
+    lessons = Lesson.objects.bulk_create(
+        [
+            Lesson(
+                title=f"Lesson {j} of course {i}",
+                course=course,
+                scheduled_time=now
+                + timedelta(days=j - spec["lessons_per_course"] // 2),
+                content="Lesson content " * 20,
+                notes_content="Lesson notes " * 10,
+            )
+            for i, course in enumerate(courses)
+            for j in range(spec["lessons_per_course"])
+        ]
+    )
+    Course.lessons.through.objects.bulk_create(
+        [
+            Course.lessons.through(course_id=lesson.course_id, lesson_id=lesson.id)
+            for lesson in lessons
+        ]
+    )
+
+    homework = Homework.objects.bulk_create(
+        [
+            Homework(
+                title=f"Homework {k} for {lesson.title}",
+                lesson=lesson,
+                course_id=lesson.course_id,
+                description="Homework description",
+                due_date=lesson.scheduled_time + timedelta(days=7),
+                submitted_by=teacher,
+            )
+            for lesson in lessons
+            for k in range(spec["homework_per_lesson"])
+        ]
+    )
+
+    group_by_course = {group.course_id: group for group in groups}
+    submissions = []
+    for item in homework:
+        members = group_students[group_by_course[item.course_id].id]
+        submissions.extend(
+            HomeworkSubmission(
+                homework=item,
+                student=member,
+                submission_text="Submission text",
+                grade=(index * 7) % 100,
+            )
+            for index, member in enumerate(members[: len(members) // 2 + 1])
+        )
+    HomeworkSubmission.objects.bulk_create(submissions)
+
+    return Dataset(
+        teacher=teacher,
+        student=student,
+        other_student=group_students[groups[0].id][1],
+        course=courses[0],
+        group=groups[0],
+        lesson=lessons[0],
+        homework=homework[0],
+        submission=HomeworkSubmission.objects.get(
+            homework=homework[0], student=student
+        ),
+    )
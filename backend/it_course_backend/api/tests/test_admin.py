@@ -0,0 +1,97 @@
+"""
+Tests for the admin site.
+"""
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import HomeworkSubmission, User
+from ..pagination import EstimatedCountPaginator
+from .fixtures import seed_dataset
+
+
+class AdminSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.admin = User.objects.create_superuser(
+            email="admin@example.com",
+            password="password",
+            first_name="Admin",
+            last_name="User",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_search(self):
+        email = self.dataset.student.email
+        for model in ("user", "group", "course", "lesson", "homework"):
+            with self.subTest(model=model):
+                url = reverse(f"admin:api_{model}_changelist")
+                response = self.client.get(url, {"q": email})
+                self.assertEqual(response.status_code, 200)
+
+    def test_user_autocomplete(self):
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "api",
+                "model_name": "homework",
+                "field_name": "submitted_by",
+                "term": self.dataset.teacher.email[:6],
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            str(self.dataset.teacher.pk),
+            [item["id"] for item in response.json()["results"]],
+        )
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com",
+            password="password",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, model):
+        url = reverse(f"admin:api_{model}_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        models = ("group", "course", "lesson", "homework", "homeworksubmission")
+        seed_dataset("small")
+        small = {model: self.changelist_queries(model) for model in models}
+        seed_dataset("medium")
+
+        for model in models:
+            with self.subTest(model=model):
+                self.assertEqual(self.changelist_queries(model), small[model])
+
+    def test_large_tables_use_estimated_counts(self):
+        seed_dataset("small")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE api_homeworksubmission")
+        queryset = HomeworkSubmission.objects.order_by("pk")
+
+        with mock.patch.object(EstimatedCountPaginator, "estimate_threshold", 1):
+            with CaptureQueriesContext(connection) as queries:
+                count = EstimatedCountPaginator(queryset, 10).count
+            filtered = EstimatedCountPaginator(queryset.filter(grade=0), 10).count
+
+        self.assertEqual(count, queryset.count())
+        self.assertNotIn("COUNT(", queries[0]["sql"])
+        self.assertEqual(filtered, queryset.filter(grade=0).count())
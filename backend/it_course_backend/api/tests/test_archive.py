@@ -0,0 +1,147 @@
+"""
+Tests for archiving and restoring completed courses.
+"""
+
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import (
+    ArchivedCourse,
+    ArchivedRecord,
+    Blob,
+    Course,
+    GroupMembership,
+    Homework,
+    HomeworkSubmission,
+    Lesson,
+    User,
+)
+from .fixtures import seed_dataset
+
+
+def snapshot(course_id):
+    """Return the rows of a course that archiving must preserve."""
+    return {
+        "course": list(Course.objects.filter(pk=course_id).values()),
+        "groups": sorted(
+            Course.groups.through.objects.filter(course_id=course_id).values_list(
+                "group_id", flat=True
+            )
+        ),
+        "lessons": list(
+            Lesson.objects.filter(course_id=course_id).order_by("pk").values()
+        ),
+        "memberships": list(
+            GroupMembership.objects.filter(group__course_id=course_id)
+            .order_by("pk")
+            .values()
+        ),
+        "homework": list(
+            Homework.objects.filter(course_id=course_id).order_by("pk").values()
+        ),
+        "submissions": list(
+            HomeworkSubmission.objects.filter(homework__course_id=course_id)
+            .order_by("pk")
+            .values()
+        ),
+    }
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        course = cls.dataset.course
+        Course.objects.filter(pk=course.pk).update(state="completed")
+        Lesson.objects.filter(course=course).update(
+            scheduled_time=timezone.now() - timedelta(days=400)
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def archive(self, **options):
+        call_command("archive_courses", stdout=StringIO(), **options)
+
+    def test_only_old_completed_courses_are_archived(self):
+        course_id = self.dataset.course.pk
+        self.archive(older_than_days=500)
+        self.assertTrue(Course.objects.filter(pk=course_id).exists())
+
+        self.archive(older_than_days=365)
+
+        self.assertFalse(Course.objects.filter(pk=course_id).exists())
+        self.assertFalse(Lesson.objects.filter(course_id=course_id).exists())
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertTrue(ArchivedCourse.objects.filter(pk=course_id).exists())
+
+    def test_restore_brings_back_identical_rows(self):
+        course_id = self.dataset.course.pk
+        before = snapshot(course_id)
+
+        self.archive()
+        call_command("restore_course", course_id, stdout=StringIO())
+
+        self.assertEqual(snapshot(course_id), before)
+        self.assertFalse(ArchivedCourse.objects.exists())
+
+    def test_restore_rows_archived_before_a_new_field(self):
+        course_id = self.dataset.course.pk
+        self.archive()
+        for record in ArchivedRecord.objects.all():
+            record.data.pop("deactivated_at", None)
+            record.save(update_fields=["data"])
+
+        call_command("restore_course", course_id, stdout=StringIO())
+
+        self.assertIsNone(Course.objects.get(pk=course_id).deactivated_at)
+
+    def test_files_of_archived_submissions_are_kept(self):
+        submission = self.dataset.submission
+        submission.submission_file.save("answer.txt", ContentFile(b"answer"))
+        blob = Blob.objects.get(name=submission.submission_file.name)
+        self.assertEqual(blob.ref_count, 1)
+
+        self.archive()
+        call_command("collect_blobs", recount=True, grace_hours=0, stdout=StringIO())
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        call_command("restore_course", self.dataset.course.pk, stdout=StringIO())
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        submission.refresh_from_db()
+        self.assertEqual(submission.submission_file.read(), b"answer")
+
+    def test_gradebook(self):
+        ds = self.dataset
+        self.archive()
+        client = APIClient()
+        url = reverse("archived-gradebook", kwargs={"pk": ds.course.pk})
+
+        client.force_authenticate(ds.teacher)
+        data = client.get(url).data
+        self.assertEqual(len(data["homework"]), 4)
+        self.assertGreater(len(data["students"]), 1)
+
+        client.force_authenticate(ds.student)
+        data = client.get(url).data
+        self.assertEqual([row["id"] for row in data["students"]], [ds.student.pk])
+        self.assertEqual(data["students"][0]["grades"][0]["grade"], ds.submission.grade)
+
+        outsider = User.objects.create_user(email="outsider@example.com", password="x")
+        client.force_authenticate(outsider)
+        self.assertEqual(client.get(url).status_code, 403)
@@ -0,0 +1,658 @@
+"""
+Query-count regression benchmarks for every API route.
+
+Each route in ``api/urls.py`` is called as the teacher and as a student of
+a small, a medium and a large dataset. For every call the suite records the
+number of queries, the status code, the size of the body and the latency,
+and fails when a route runs more queries than ``benchmark_baselines.json``
+allows, answers with another status or with a body of another size.
+
+The size of every response body is checked exactly. The ID sequences of
+the API tables are restarted before every call, so IDs, and with them the
+sizes, do not depend on which tests ran before. p95 latency depends on the
+machine, so it is only checked with ``BENCHMARK_TIMING=1``, against the
+baseline times ``BENCHMARK_LATENCY_TOLERANCE``.
+
+Run only the benchmarks with::
+
+    python manage.py test api --tag=benchmark
+
+Environment variables:
+    BENCHMARK_ITERATIONS: Measured calls per route (default 5).
+    BENCHMARK_UPDATE_BASELINE: Set to 1 to write the observed query counts,
+        status codes, sizes and p95 latencies to the baseline file instead
+        of comparing.
+    BENCHMARK_TIMING: Set to 1 to also check p95 latency.
+    BENCHMARK_LATENCY_TOLERANCE: Factor by which p95 latency may exceed
+        the baseline (default 3).
+    BENCHMARK_REPORT: Path of a JSON file to write query counts, p50/p95
+        latency and response sizes to.
+"""
+
+import datetime
+import gc
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .. import urls
+from ..archive import archive_course
+from ..calendar import feed_token
+from ..models import (
+    ChunkedUpload,
+    Course,
+    HomeworkSubmission,
+    LessonSeries,
+    submission_storage,
+)
+from ..series import create_series
+from ..uploads import write_chunk
+from .fixtures import PASSWORD, seed_dataset
+
+BASELINE_FILE = Path(__file__).with_name("benchmark_baselines.json")
+ITERATIONS = int(os.environ.get("BENCHMARK_ITERATIONS", 5))
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE_BASELINE") == "1"
+REPORT_FILE = os.environ.get("BENCHMARK_REPORT")
+TIMING = os.environ.get("BENCHMARK_TIMING") == "1"
+LATENCY_TOLERANCE = float(os.environ.get("BENCHMARK_LATENCY_TOLERANCE", 3))
+# Latencies under this many milliseconds are within the noise of a run.
+LATENCY_FLOOR_MS = 25
+# The numbers checked against the baseline.
+BASELINE_KEYS = ("queries", "status", "bytes", "p95_ms")
+
+CHUNK = b"answer line\n" * 1024
+CHUNK_SHA256 = hashlib.sha256(CHUNK).hexdigest()
+
+
+def _uid_and_token(user):
+    return {
+        "uidb64": urlsafe_base64_encode(force_bytes(user.pk)),
+        "token": default_token_generator.make_token(user),
+    }
+
+
+def _reset_password(ds, user, i):
+    kwargs = _uid_and_token(user)
+    data = {
+        "new_password": PASSWORD,
+        "uid": kwargs["uidb64"],
+        "token": kwargs["token"],
+    }
+    return {"kwargs": kwargs, "data": data}
+
+
+def _submission(ds, user, i):
+    return {
+        "kwargs": {"pk": ds.homework.pk},
+        "data": {
+            "homework": ds.homework.pk,
+            "submission_text": "Benchmark submission",
+            "submission_file": SimpleUploadedFile(
+                "answer.txt", b"answer", content_type="text/plain"
+            ),
+        },
+        "format": "multipart",
+    }
+
+
+def _upload(user, chunks=1, received=0):
+    """Start an upload of ``chunks`` chunks with ``received`` already sent."""
+    chunk_size = len(CHUNK)
+    upload = ChunkedUpload.objects.create(
+        user=user,
+        filename="answer.txt",
+        content_type="text/plain",
+        size=chunk_size * chunks,
+        chunk_size=chunk_size,
+    )
+    for index in range(received):
+        write_chunk(upload, index, io.BytesIO(CHUNK), CHUNK_SHA256)
+    return upload
+
+
+def _upload_chunk(ds, user, i):
+    return {
+        "kwargs": {"pk": _upload(user).pk, "index": 0},
+        "data": CHUNK,
+        "content_type": "application/octet-stream",
+        "headers": {"HTTP_X_CHUNK_CHECKSUM": CHUNK_SHA256},
+    }
+
+
+def _upload_complete(ds, user, i):
+    return {
+        "kwargs": {"pk": _upload(user, chunks=4, received=4).pk},
+        "data": {},
+    }
+
+
+def _series(ds, weeks=15):
+    """
+    Return lesson series data for two lessons a week over ``weeks`` weeks,
+    after the lessons of the dataset.
+    """
+    return {
+        "course": ds.course.pk,
+        "title": "Benchmark series",
+        "start_date": (timezone.localdate() + datetime.timedelta(days=30)).isoformat(),
+        "time": "18:00",
+        "weekdays": ["MO", "TH"],
+        "count": weeks * 2,
+    }
+
+
+def _series_edit(ds, user, i):
+    data = _series(ds)
+    series = LessonSeries(
+        course=ds.course,
+        title=data["title"],
+        start_date=timezone.localdate() + datetime.timedelta(days=30),
+        time=datetime.time(18),
+        weekdays=data["weekdays"],
+        count=data["count"],
+    )
+    create_series(series, series.dates())
+    return {"kwargs": {"pk": series.pk}, "data": {"time": "19:00"}}
+
+
+def _with_files(submissions):
+    """Attach the same stored PDF to every submission in a queryset."""
+    name = submission_storage().save("answer.pdf", ContentFile(b"%PDF-1.4\n" * 4096))
+    submissions.update(submission_file=name)
+
+
+def _submission_download(ds, user, i):
+    _with_files(HomeworkSubmission.objects.filter(pk=ds.submission.pk))
+    return {"kwargs": {"pk": ds.submission.pk, "kind": "file"}}
+
+
+def _submissions_archive(ds, user, i):
+    _with_files(HomeworkSubmission.objects.filter(homework=ds.homework))
+    return {"kwargs": {"pk": ds.homework.pk}}
+
+
+def _archived_gradebook(ds, user, i):
+    Course.objects.filter(pk=ds.course.pk).update(state="completed")
+    archive_course(ds.course.pk)
+    return {"kwargs": {"pk": ds.course.pk}}
+
+
+class Route:
+    """
+    A URL name and how to call it.
+
+    Args:
+        name (str): The URL name from ``api/urls.py``.
+        method (str): HTTP method used for the call.
+        prepare: Callable ``(dataset, user, iteration)`` returning a dict with
+            optional ``kwargs``, ``data``, ``query``, ``format``, raw body
+            ``content_type`` and extra ``headers`` keys.
+    """
+
+    def __init__(self, name, method="get", prepare=None):
+        self.name = name
+        self.method = method
+        self.prepare = prepare or (lambda ds, user, i: {})
+
+    @property
+    def label(self):
+        return f"{self.method.upper()} {self.name}"
+
+
+ROUTES = [
+    Route("home"),
+    Route(
+        "token_obtain_pair",
+        "post",
+        lambda ds, user, i: {"data": {"email": user.email, "password": PASSWORD}},
+    ),
+    Route(
+        "token_refresh",
+        "post",
+        lambda ds, user, i: {"data": {"refresh": str(RefreshToken.for_user(user))}},
+    ),
+    Route(
+        "google-login",
+        "post",
+        lambda ds, user, i: {"data": {"access_token": "google-token"}},
+    ),
+    Route(
+        "login",
+        "post",
+        lambda ds, user, i: {"data": {"email": user.email, "password": PASSWORD}},
+    ),
+    Route(
+        "register",
+        "post",
+        lambda ds, user, i: {
+            "data": {
+                "email": f"new.{user.pk}.{i}@example.com",
+                "password": PASSWORD,
+                "first_name": "New",
+                "last_name": "User",
+            }
+        },
+    ),
+    Route(
+        "logout",
+        "post",
+        lambda ds, user, i: {"data": {"refresh": str(RefreshToken.for_user(user))}},
+    ),
+    Route(
+        "change-password",
+        "put",
+        lambda ds, user, i: {
+            "data": {"old_password": PASSWORD, "new_password": PASSWORD}
+        },
+    ),
+    Route(
+        "change-email",
+        "put",
+        lambda ds, user, i: {"data": {"email": f"changed.{user.pk}@example.com"}},
+    ),
+    Route("reset_password", "post", _reset_password),
+    Route("confirm-email", "get", lambda ds, user, i: {"kwargs": _uid_and_token(user)}),
+    Route("reminders"),
+    Route(
+        "group-list",
+        "post",
+        lambda ds, user, i: {
+            "kwargs": {"pk": ds.group.pk},
+            "data": {"name": "Benchmark group", "students": [ds.other_student.pk]},
+        },
+    ),
+    Route(
+        "group-create",
+        "post",
+        lambda ds, user, i: {
+            "data": {"name": "Benchmark group", "students": [ds.other_student.pk]}
+        },
+    ),
+    Route(
+        "change-role",
+        "patch",
+        lambda ds, user, i: {
+            "kwargs": {"group_id": ds.group.pk, "user_id": ds.other_student.pk},
+            "data": {"role": "assistant"},
+        },
+    ),
+    Route("group-edit", "get", lambda ds, user, i: {"kwargs": {"pk": ds.group.pk}}),
+    Route("course_list"),
+    Route("course_detail", "get", lambda ds, user, i: {"kwargs": {"pk": ds.course.pk}}),
+    Route(
+        "course_create",
+        "post",
+        lambda ds, user, i: {
+            "data": {
+                "title": "Benchmark course",
+                "description": "Created by the benchmark suite",
+                "groups": [],
+                "lessons": [],
+            }
+        },
+    ),
+    Route(
+        "course_edit",
+        "patch",
+        lambda ds, user, i: {
+            "kwargs": {"pk": ds.course.pk},
+            "data": {"title": "Renamed course"},
+        },
+    ),
+    Route("lesson-list"),
+    Route(
+        "lesson-create",
+        "post",
+        lambda ds, user, i: {
+            "data": {
+                "title": "Benchmark lesson",
+                # Clear of the dataset's lessons, which would conflict.
+                "scheduled_time": (
+                    ds.lesson.scheduled_time + datetime.timedelta(hours=12)
+                ).isoformat(),
+                "course": ds.course.pk,
+            }
+        },
+    ),
+    Route("lesson-edit", "get", lambda ds, user, i: {"kwargs": {"pk": ds.lesson.pk}}),
+    Route(
+        "lesson-series-create",
+        "post",
+        lambda ds, user, i: {"data": _series(ds)},
+    ),
+    Route("lesson-series-edit", "patch", _series_edit),
+    Route(
+        "schedule-free-slots",
+        "get",
+        lambda ds, user, i: {"query": {"group": ds.group.pk, "count": 20}},
+    ),
+    Route("lesson_calendar"),
+    Route("lesson_calendar_feed_link"),
+    Route(
+        "lesson_calendar_feed",
+        "get",
+        lambda ds, user, i: {"kwargs": {"token": feed_token(user)}},
+    ),
+    Route(
+        "homework-list-create",
+        "get",
+        lambda ds, user, i: {"query": {"course_id": ds.course.pk}},
+    ),
+    Route(
+        "homework-list-create",
+        "post",
+        lambda ds, user, i: {
+            "data": {
+                "title": "Benchmark homework",
+                "description": "Created by the benchmark suite",
+                "due_date": ds.homework.due_date.isoformat(),
+                "course": ds.course.pk,
+                "lesson": ds.lesson.pk,
+            }
+        },
+    ),
+    Route(
+        "homework-detail",
+        "get",
+        lambda ds, user, i: {"kwargs": {"pk": ds.homework.pk}},
+    ),
+    Route(
+        "homework-edit", "get", lambda ds, user, i: {"kwargs": {"pk": ds.homework.pk}}
+    ),
+    Route("homework-submit", "post", _submission),
+    Route(
+        "homework-grade",
+        "patch",
+        lambda ds, user, i: {
+            "kwargs": {"pk": ds.submission.pk},
+            "data": {"grade": 90},
+        },
+    ),
+    Route(
+        "teacher-homework-detail",
+        "get",
+        lambda ds, user, i: {"kwargs": {"pk": ds.homework.pk}},
+    ),
+    Route(
+        "upload-create",
+        "post",
+        lambda ds, user, i: {
+            "data": {
+                "filename": "answer.pdf",
+                "content_type": "application/pdf",
+                "size": 50 * 1024 * 1024,
+            }
+        },
+    ),
+    Route(
+        "upload-detail",
+        "get",
+        lambda ds, user, i: {"kwargs": {"pk": _upload(user, 8, 5).pk}},
+    ),
+    Route("upload-chunk", "put", _upload_chunk),
+    Route("upload-complete", "post", _upload_complete),
+    Route(
+        "group-student-autocomplete",
+        "get",
+        lambda ds, user, i: {
+            "kwargs": {"group_id": ds.group.pk},
+            "query": {"q": "example"},
+        },
+    ),
+    Route(
+        "search",
+        "get",
+        lambda ds, user, i: {"query": {"q": "homework description"}},
+    ),
+    Route("archived-gradebook", "get", _archived_gradebook),
+    Route("submission-download", "get", _submission_download),
+    Route("homework-submissions-archive", "get", _submissions_archive),
+]
+
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def load_json(path):
+    path = Path(path)
+    if path.exists():
+        return json.loads(path.read_text())
+    return {}
+
+
+def save_json(path, results):
+    data = load_json(path)
+    data.update(results)
+    Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare(observed, baseline):
+    """
+    Compare observed numbers against a baseline.
+
+    Returns:
+        list[str]: A description of every metric that regressed.
+    """
+    problems = []
+    if observed["queries"] > baseline["queries"]:
+        problems.append(f"queries {observed['queries']} > {baseline['queries']}")
+    if observed["status"] != baseline["status"]:
+        problems.append(f"status {observed['status']} != {baseline['status']}")
+    if observed["bytes"] != baseline["bytes"]:
+        problems.append(f"bytes {observed['bytes']} != {baseline['bytes']}")
+    allowed_ms = max(baseline["p95_ms"] * LATENCY_TOLERANCE, LATENCY_FLOOR_MS)
+    if TIMING and observed["p95_ms"] > allowed_ms:
+        problems.append(f"p95 {observed['p95_ms']} ms > {allowed_ms:.2f} ms")
+    return problems
+
+
+def reset_sequences():
+    """Restart the ID sequences of the API tables after their highest ID."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), apps.get_app_config("api").get_models()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(";".join(statements))
+
+
+class RouteCoverageTests(SimpleTestCase):
+    """Every named route must have a benchmark entry and a baseline."""
+
+    def test_every_route_is_benchmarked(self):
+        route_names = {pattern.name for pattern in urls.urlpatterns}
+        benchmarked = {route.name for route in ROUTES}
+        self.assertEqual(route_names - benchmarked, set())
+
+    def test_every_route_has_baseline(self):
+        keys = {
+            f"{size}:{role}:{route.label}"
+            for size in ("small", "medium", "large")
+            for role in ("teacher", "student")
+            for route in ROUTES
+        }
+        baselines = load_json(BASELINE_FILE)
+        self.assertEqual(keys - baselines.keys(), set())
+        for key, numbers in baselines.items():
+            self.assertEqual(sorted(numbers), sorted(BASELINE_KEYS), key)
+
+
+@tag("benchmark")
+class BenchmarkMixin:
+    """
+    Runs every route against the dataset of ``size`` as teacher and student.
+
+    Passwords use a fast hasher so that login routes measure the API rather
+    than PBKDF2, and uploads go to a temporary media root.
+    """
+
+    size = None
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        overrides = override_settings(
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+            MEDIA_ROOT=media_root,
+            UPLOAD_TEMP_DIR=os.path.join(media_root, "uploads_tmp"),
+        )
+        overrides.enable()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.addClassCleanup(overrides.disable)
+        cls.results = {}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        if UPDATE_BASELINE:
+            save_json(
+                BASELINE_FILE,
+                {
+                    key: {name: observed[name] for name in BASELINE_KEYS}
+                    for key, observed in cls.results.items()
+                },
+            )
+        if REPORT_FILE:
+            save_json(REPORT_FILE, cls.results)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        reset_sequences()
+        cls.dataset = seed_dataset(cls.size)
+
+    def setUp(self):
+        # Cached calendar months of other datasets would share their IDs.
+        cache.clear()
+        google_response = mock.Mock(status_code=200)
+        google_response.json.return_value = {
+            "sub": "1",
+            "name": "Google User",
+            "email": "google.user@example.com",
+        }
+        patcher = mock.patch(
+            "api.serializers.auth.requests.get", return_value=google_response
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def call(self, client, route, user, iteration):
+        """
+        Call a route once inside a rolled-back transaction.
+
+        Streamed responses are consumed inside the measurement, so their
+        queries and the time to produce the body are included.
+
+        Returns:
+            tuple: Response, number of queries, latency in milliseconds and
+            size of the body in bytes.
+        """
+        with transaction.atomic():
+            reset_sequences()
+            spec = route.prepare(self.dataset, user, iteration)
+            url = reverse(route.name, kwargs=spec.get("kwargs"))
+            method = getattr(client, route.method)
+            if route.method == "get":
+                args = {"data": spec.get("query")}
+            elif "content_type" in spec:
+                args = {"data": spec["data"], "content_type": spec["content_type"]}
+            else:
+                args = {"data": spec.get("data"), "format": spec.get("format", "json")}
+            args.update(spec.get("headers", {}))
+
+            # Like timeit, keep garbage collection pauses out of the timings.
+            gc.collect()
+            gc.disable()
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = method(url, **args)
+                    if response.streaming:
+                        body = b"".join(response.streaming_content)
+                    else:
+                        body = response.content
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+            finally:
+                gc.enable()
+
+            transaction.set_rollback(True)
+        return response, len(queries), elapsed_ms, len(body)
+
+    def run_routes(self, user, role):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        baselines = load_json(BASELINE_FILE)
+
+        for route in ROUTES:
+            key = f"{self.size}:{role}:{route.label}"
+            with self.subTest(route=key):
+                self.call(client, route, user, -1)
+
+                queries, latencies, sizes = [], [], []
+                for iteration in range(ITERATIONS):
+                    response, count, elapsed_ms, size = self.call(
+                        client, route, user, iteration
+                    )
+                    self.assertLess(response.status_code, 500, key)
+                    queries.append(count)
+                    latencies.append(elapsed_ms)
+                    sizes.append(size)
+
+                observed = {
+                    "queries": max(queries),
+                    "p50_ms": round(percentile(latencies, 50), 2),
+                    "p95_ms": round(percentile(latencies, 95), 2),
+                    "bytes": max(sizes),
+                    "status": response.status_code,
+                }
+                self.results[key] = observed
+
+                if not UPDATE_BASELINE:
+                    self.assertIn(
+                        key, baselines, "Run with BENCHMARK_UPDATE_BASELINE=1."
+                    )
+                    problems = compare(observed, baselines[key])
+                    self.assertFalse(problems, f"{key}: {', '.join(problems)}")
+
+    def test_routes_as_teacher(self):
+        self.run_routes(self.dataset.teacher, "teacher")
+
+    def test_routes_as_student(self):
+        self.run_routes(self.dataset.student, "student")
+
+
+class SmallDatasetBenchmarkTests(BenchmarkMixin, TestCase):
+    size = "small"
+
+
+class MediumDatasetBenchmarkTests(BenchmarkMixin, TestCase):
+    size = "medium"
+
+
+class LargeDatasetBenchmarkTests(BenchmarkMixin, TestCase):
+    size = "large"
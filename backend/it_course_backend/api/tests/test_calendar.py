@@ -0,0 +1,257 @@
+"""
+Tests for lesson calendars and the iCalendar feed.
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import calendar
+from ..archive import archive_course, restore_course
+from ..checks import check_shared_cache
+from ..models import Course, GroupMembership, Lesson, User
+from .fixtures import seed_dataset
+
+
+def lesson_queries(captured):
+    return [query for query in captured if 'FROM "api_lesson"' in query["sql"]]
+
+
+class CalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.day = timezone.localdate() + datetime.timedelta(days=3)
+        cls.lesson = Lesson.objects.create(
+            title="Calendar lesson",
+            content="Loops, lists; and more",
+            course=cls.dataset.course,
+            scheduled_time=calendar.day_start(cls.day) + datetime.timedelta(hours=10),
+            meeting_link="https://meet.example.com/loops",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.student)
+        self.url = reverse("lesson_calendar")
+
+    def get_range(self, start, end=None, **extra):
+        query = {"start": start.isoformat()}
+        if end is not None:
+            query["end"] = end.isoformat()
+        return self.client.get(self.url, query, **extra)
+
+    def test_range(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get_range(self.day, self.day)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data], [self.lesson.pk])
+        (query,) = lesson_queries(ctx)
+        self.assertNotIn("::date", query["sql"])
+
+        response = self.get_range(self.day + datetime.timedelta(days=1))
+        self.assertNotIn(self.lesson.pk, [row["id"] for row in response.data])
+
+    def test_other_users_lessons_hidden(self):
+        outsider = User.objects.create_user(email="outsider@example.com", password="x")
+        self.client.force_authenticate(outsider)
+
+        response = self.get_range(self.day, self.day)
+
+        self.assertEqual(response.data, [])
+
+    def test_invalid_range(self):
+        for start, end in (
+            (self.day, self.day - datetime.timedelta(days=1)),
+            (self.day, self.day + datetime.timedelta(days=400)),
+        ):
+            with self.subTest(start=start, end=end):
+                self.assertEqual(self.get_range(start, end).status_code, 400)
+
+    def test_cached_per_month(self):
+        self.get_range(self.day, self.day)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get_range(self.day, self.day)
+
+        self.assertEqual(lesson_queries(ctx), [])
+        self.assertEqual([row["id"] for row in response.data], [self.lesson.pk])
+
+    def test_invalidated_on_change(self):
+        self.get_range(self.day, self.day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson.title = "Renamed"
+            self.lesson.save()
+        self.assertEqual(self.get_range(self.day, self.day).data[0]["title"], "Renamed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson.deactivate()
+        self.assertEqual(self.get_range(self.day, self.day).data, [])
+
+    def other_course(self):
+        teacher = User.objects.create_user(email="other@example.com", password="x")
+        return Course.objects.create(title="Other course", teacher=teacher)
+
+    def test_other_courses_keep_cache(self):
+        course = self.other_course()
+        self.get_range(self.day, self.day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson = Lesson.objects.create(
+                title="Other lesson",
+                course=course,
+                scheduled_time=self.lesson.scheduled_time,
+            )
+            lesson.deactivate()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get_range(self.day, self.day)
+
+        self.assertEqual(lesson_queries(ctx), [])
+        self.assertEqual([row["id"] for row in response.data], [self.lesson.pk])
+
+    def test_invalidated_on_move_to_other_course(self):
+        course = self.other_course()
+        self.get_range(self.day, self.day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson.course = course
+            self.lesson.save()
+
+        self.assertEqual(self.get_range(self.day, self.day).data, [])
+        self.client.force_authenticate(course.teacher)
+        response = self.get_range(self.day, self.day)
+        self.assertEqual([row["id"] for row in response.data], [self.lesson.pk])
+
+    def test_invalidated_on_leaving_group(self):
+        self.get_range(self.day, self.day)
+
+        GroupMembership.objects.filter(
+            user=self.dataset.student, group__courses=self.dataset.course
+        ).deactivate()
+
+        self.assertEqual(self.get_range(self.day, self.day).data, [])
+
+    def test_invalidated_on_archive_and_restore(self):
+        course = self.dataset.course
+        Course.objects.filter(pk=course.pk).update(state="completed")
+        self.get_range(self.day, self.day)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_course(course.pk)
+        self.assertEqual(self.get_range(self.day, self.day).data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            restore_course(course.pk)
+        response = self.get_range(self.day, self.day)
+        self.assertEqual([row["id"] for row in response.data], [self.lesson.pk])
+
+
+@override_settings(DEBUG=False, TESTING=False)
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_memory_cache_refused(self):
+        caches = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        with override_settings(CACHES=caches):
+            (error,) = check_shared_cache(None)
+        self.assertEqual(error.id, "api.E001")
+
+    def test_shared_cache_accepted(self):
+        caches = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379/0",
+            }
+        }
+        with override_settings(CACHES=caches):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_memory_cache_allowed_in_development(self):
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class CalendarFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.lesson = Lesson.objects.create(
+            title="Feed lesson",
+            content="Line one\nLine two, with a comma",
+            course=cls.dataset.course,
+            scheduled_time=timezone.now() + datetime.timedelta(days=2),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.dataset.student
+        self.url = reverse(
+            "lesson_calendar_feed", args=[calendar.feed_token(self.user)]
+        )
+
+    def test_link(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("lesson_calendar_feed_link"))
+
+        self.assertEqual(response.data["url"], f"http://testserver{self.url}")
+
+    def test_feed(self):
+        response = APIClient().get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        body = response.content.decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn(f"UID:lesson-{self.lesson.pk}@it-course\r\n", body)
+        self.assertIn("DESCRIPTION:Line one\\nLine two\\, with a comma\r\n", body)
+        for line in body.split("\r\n"):
+            self.assertLessEqual(len(line.encode()), 75)
+
+    def test_not_modified(self):
+        etag = APIClient().get(self.url)["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(lesson_queries(ctx), [])
+
+    def test_etag_kept_on_other_courses_change(self):
+        etag = APIClient().get(self.url)["ETag"]
+
+        teacher = User.objects.create_user(email="other@example.com", password="x")
+        course = Course.objects.create(title="Other course", teacher=teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(
+                title="Other lesson", course=course, scheduled_time=timezone.now()
+            )
+        self.assertEqual(APIClient().get(self.url)["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson.save()
+        self.assertNotEqual(APIClient().get(self.url)["ETag"], etag)
+
+    def test_invalid_tokens(self):
+        token = calendar.feed_token(self.user)
+        tampered = token[:-1] + ("1" if token.endswith("0") else "0")
+        for bad in (tampered, "abc-def", f"{self.dataset.teacher.pk}-{token}"):
+            with self.subTest(token=bad):
+                url = reverse("lesson_calendar_feed", args=[bad])
+                self.assertEqual(APIClient().get(url).status_code, 404)
+
+    def test_password_change_revokes(self):
+        self.user.set_password("changed")
+        self.user.save()
+
+        self.assertEqual(APIClient().get(self.url).status_code, 404)
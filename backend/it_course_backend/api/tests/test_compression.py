@@ -0,0 +1,117 @@
+"""
+Tests for response compression.
+"""
+
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..compression import CODINGS, GzipCoding, is_compressible, negotiate
+from ..middleware import CompressionMiddleware
+from .fixtures import seed_dataset
+
+
+class NegotiationTests(SimpleTestCase):
+    def test_gzip(self):
+        self.assertIs(negotiate("gzip, deflate"), GzipCoding)
+        self.assertIs(negotiate("*"), next(iter(CODINGS.values())))
+        for header in (None, "", "identity", "deflate", "gzip;q=0", "*;q=0"):
+            with self.subTest(header=header):
+                self.assertIsNone(negotiate(header))
+
+    def test_quality_then_preference(self):
+        br = type("BrotliCoding", (), {"name": "br"})
+        codings = {"br": br, "gzip": GzipCoding}
+        with mock.patch.dict(CODINGS, codings, clear=True):
+            self.assertIs(negotiate("gzip, br"), br)
+            self.assertIs(negotiate("gzip, br;q=0.5"), GzipCoding)
+            self.assertIs(negotiate("GZIP;q=0.8, *;q=0.2"), GzipCoding)
+
+    def test_compressible_types(self):
+        for content_type in ("application/json", "text/calendar; charset=utf-8"):
+            self.assertTrue(is_compressible(content_type))
+        for content_type in ("application/zip", "image/webp", ""):
+            self.assertFalse(is_compressible(content_type))
+
+
+class StreamingTests(SimpleTestCase):
+    def middleware(self, response):
+        return CompressionMiddleware(lambda request: response)(
+            RequestFactory().get("/api/export/", HTTP_ACCEPT_ENCODING="gzip")
+        )
+
+    def test_streamed_pieces(self):
+        pieces = [b"lesson,%d\n" % index for index in range(1000)]
+        response = self.middleware(
+            StreamingHttpResponse(iter(pieces), content_type="text/csv")
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), b"".join(pieces)
+        )
+
+    def test_zip_export_untouched(self):
+        response = self.middleware(
+            StreamingHttpResponse(iter([b"PK\x03\x04"]), content_type="application/zip")
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), b"PK\x03\x04")
+
+    def test_ranges_untouched(self):
+        response = HttpResponse(b"a" * 4096, content_type="text/plain")
+        response["Accept-Ranges"] = "bytes"
+
+        self.assertFalse(self.middleware(response).has_header("Content-Encoding"))
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.teacher)
+        self.url = reverse("lesson-list")
+
+    def test_negotiated_gzip(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], f"W/{plain['ETag']}")
+        self.assertLess(len(response.content), len(plain.content))
+
+    def test_below_threshold(self):
+        with override_settings(COMPRESSION_MIN_SIZE=10**9):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_cached_by_etag(self):
+        with mock.patch.object(
+            GzipCoding, "compress", wraps=GzipCoding.compress
+        ) as compress:
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+
+        compress.assert_called_once()
+        self.assertEqual(first.content, second.content)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 304)
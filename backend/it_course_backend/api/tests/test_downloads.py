@@ -0,0 +1,112 @@
+"""
+Tests for downloading submission files and archives.
+"""
+
+import io
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import HomeworkSubmission
+from .fixtures import seed_dataset
+
+CONTENT = bytes(range(256)) * 40
+
+
+class DownloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.submission = self.dataset.submission
+        self.submission.submission_file.save(
+            "answer.pdf", ContentFile(CONTENT), save=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.student)
+        self.url = reverse(
+            "submission-download", kwargs={"pk": self.submission.pk, "kind": "file"}
+        )
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("attachment", response["Content-Disposition"])
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(CONTENT)}")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_etag_revalidation(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_front_server_backends(self):
+        name = self.submission.submission_file.name
+        with override_settings(FILE_DOWNLOAD_BACKEND="nginx"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{name}")
+        self.assertEqual(response.content, b"")
+
+        with override_settings(FILE_DOWNLOAD_BACKEND="sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], self.submission.submission_file.path)
+
+    def test_other_students_are_denied(self):
+        self.client.force_authenticate(self.dataset.other_student)
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_archive_of_all_submissions(self):
+        other = HomeworkSubmission.objects.create(
+            homework=self.dataset.homework,
+            student=self.dataset.other_student,
+            submission_text="Other answer",
+            submission_file=ContentFile(b"other answer", name="other.txt"),
+        )
+        url = reverse(
+            "homework-submissions-archive", kwargs={"pk": self.dataset.homework.pk}
+        )
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_authenticate(self.dataset.teacher)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        members = {info.filename: archive.read(info) for info in archive.infolist()}
+        self.assertEqual(
+            members[f"{self.dataset.student.email}/{self.submission.pk}-file.pdf"],
+            CONTENT,
+        )
+        self.assertEqual(
+            members[f"{self.dataset.other_student.email}/{other.pk}-file.txt"],
+            b"other answer",
+        )
@@ -0,0 +1,84 @@
+"""
+Tests for per-request metrics and the Server-Timing middleware.
+"""
+
+import logging
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from ..instrumentation import collect_metrics, current_metrics
+from ..models import User
+from .fixtures import seed_dataset
+
+
+class ItemSerializer(serializers.Serializer):
+    name = serializers.CharField()
+
+
+class BasketSerializer(serializers.Serializer):
+    items = ItemSerializer(many=True)
+
+
+class CollectMetricsTests(TestCase):
+    def test_counts_queries(self):
+        with collect_metrics(max_captured=1) as metrics:
+            self.assertIs(current_metrics(), metrics)
+            User.objects.count()
+            User.objects.exists()
+
+        self.assertIsNone(current_metrics())
+        self.assertEqual(metrics.queries, 2)
+        self.assertGreater(metrics.db_time, 0)
+        (captured,) = metrics.captured
+        self.assertEqual(captured[0], "default")
+        self.assertIn("COUNT(*)", captured[1])
+
+    def test_serializer_time_counted_once(self):
+        serializer = BasketSerializer({"items": [{"name": "a"}, {"name": "b"}]})
+
+        with collect_metrics() as metrics:
+            serializer.data
+
+        self.assertGreater(metrics.serializer_time, 0)
+        self.assertEqual(metrics._serializer_depth, 0)
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def get(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse("course_list"))
+
+    def test_disabled_by_default(self):
+        self.assertFalse(self.get(self.dataset.teacher).has_header("Server-Timing"))
+
+    @override_settings(PERF_INSTRUMENTATION_ENABLED=True, DEBUG=False)
+    def test_header_only_for_staff(self):
+        self.assertFalse(self.get(self.dataset.teacher).has_header("Server-Timing"))
+
+        staff = User.objects.create_user(
+            email="staff@example.com", password="x", is_staff=True
+        )
+        timing = self.get(staff)["Server-Timing"]
+        self.assertIn("queries", timing)
+        self.assertIn("view;dur=", timing)
+
+    @override_settings(PERF_INSTRUMENTATION_ENABLED=True)
+    def test_logs_route(self):
+        # Sampling is covered by the filter's own tests.
+        with mock.patch.object(logging.getLogger("api.perf"), "filters", []):
+            with self.assertLogs("api.perf", "INFO") as logs:
+                self.get(self.dataset.teacher)
+
+        (record,) = logs.records
+        self.assertEqual(record.route, "api/course/")
+        self.assertEqual(record.sample_key, "GET api/course/")
+        self.assertGreater(record.queries, 0)
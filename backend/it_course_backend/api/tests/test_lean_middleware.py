@@ -0,0 +1,126 @@
+"""
+Tests for the lean middleware stack of API requests.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connection
+from django.http import HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import RequestFactory, SimpleTestCase, TestCase, tag
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..middleware import (
+    BrowserAuthenticationMiddleware,
+    BrowserCsrfViewMiddleware,
+    BrowserMessageMiddleware,
+    BrowserSessionMiddleware,
+)
+from ..models import User
+
+# The browser middleware and the Django classes they skip for the API.
+BROWSER_MIDDLEWARE = {
+    BrowserSessionMiddleware: SessionMiddleware,
+    BrowserCsrfViewMiddleware: CsrfViewMiddleware,
+    BrowserAuthenticationMiddleware: AuthenticationMiddleware,
+    BrowserMessageMiddleware: MessageMiddleware,
+}
+
+# The stack before API requests skipped the browser middleware.
+REPLACED = {
+    f"api.middleware.{browser_class.__name__}": (
+        f"{django_class.__module__}.{django_class.__name__}"
+    )
+    for browser_class, django_class in BROWSER_MIDDLEWARE.items()
+}
+FULL_MIDDLEWARE = [REPLACED.get(path, path) for path in settings.MIDDLEWARE]
+
+
+def session_queries(captured):
+    return [query for query in captured if "django_session" in query["sql"]]
+
+
+class LeanMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email="admin@example.com", password="secret"
+        )
+
+    def setUp(self):
+        # A developer logged in to the admin sends the session cookie along
+        # when browsing the API.
+        self.client = APIClient()
+        self.client.force_login(self.admin)
+        self.client.force_authenticate(self.admin)
+
+    def browse_api(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("lesson-list"), HTTP_ACCEPT="text/html")
+        self.assertEqual(response.status_code, 200)
+        return response, session_queries(ctx)
+
+    def test_api_skips_session_and_csrf(self):
+        response, queries = self.browse_api()
+
+        self.assertEqual(queries, [])
+        self.assertNotIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+    def test_full_stack_sets_csrf_cookie(self):
+        with override_settings(MIDDLEWARE=FULL_MIDDLEWARE):
+            response, _ = self.browse_api()
+
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+    def test_admin_keeps_full_stack(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin:index"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(session_queries(ctx), [])
+
+        response = APIClient(enforce_csrf_checks=True).post(
+            reverse("admin:login"), {"username": "admin@example.com"}
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+@tag("benchmark")
+class MiddlewareOverheadBenchmarkTests(SimpleTestCase):
+    """The browser middleware must cost API requests less than half as much."""
+
+    requests = 5000
+
+    def best_us(self, classes):
+        def view(request):
+            return HttpResponse(b"[]", content_type="application/json")
+
+        handler = view
+        for middleware_class in reversed(classes):
+            handler = middleware_class(handler)
+
+        factory = RequestFactory()
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(self.requests):
+                handler(
+                    factory.get(
+                        "/api/lessons/",
+                        HTTP_COOKIE=f"sessionid=abc; {settings.CSRF_COOKIE_NAME}=token",
+                    )
+                )
+            timings.append((time.perf_counter() - start) / self.requests * 10**6)
+        return min(timings)
+
+    def test_lean_stack_is_faster(self):
+        full_us = self.best_us(list(BROWSER_MIDDLEWARE.values()))
+        lean_us = self.best_us(list(BROWSER_MIDDLEWARE))
+        self.assertLess(lean_us * 2, full_us, f"{lean_us:.1f} us vs {full_us:.1f} us")
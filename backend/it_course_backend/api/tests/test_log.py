@@ -0,0 +1,113 @@
+"""
+Tests for the JSON log formatter, the sampling filter and the queue handler.
+"""
+
+import json
+import logging
+import sys
+import threading
+
+from django.test import SimpleTestCase
+
+from ..log import JSONFormatter, QueueListenerHandler, SamplingFilter
+
+
+def make_record(msg="hello %s", args=("world",), level=logging.INFO, **extra):
+    record = logging.LogRecord("api.test", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.emitted = threading.Event()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.emitted.set()
+
+
+class JSONFormatterTests(SimpleTestCase):
+    def test_fields_and_extra(self):
+        payload = json.loads(
+            JSONFormatter().format(make_record(duration_ms=1.5, _private=1))
+        )
+
+        self.assertEqual(payload["message"], "hello world")
+        self.assertEqual(payload["level"], "INFO")
+        self.assertEqual(payload["logger"], "api.test")
+        self.assertEqual(payload["duration_ms"], 1.5)
+        self.assertNotIn("_private", payload)
+        self.assertNotIn("args", payload)
+        self.assertTrue(payload["ts"].endswith("+00:00"))
+
+    def test_exception_and_unserializable_values(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(user=object())
+            record.exc_info = sys.exc_info()
+
+        payload = json.loads(JSONFormatter().format(record))
+
+        self.assertIn("ValueError: boom", payload["exc_info"])
+        self.assertTrue(payload["user"].startswith("<object object"))
+
+
+class SamplingFilterTests(SimpleTestCase):
+    def kept(self, sampler, count, **kwargs):
+        return sum(sampler.filter(make_record(**kwargs)) for _ in range(count))
+
+    def test_rate(self):
+        self.assertEqual(self.kept(SamplingFilter(rate=0.25), 8), 2)
+        self.assertEqual(self.kept(SamplingFilter(rate=1), 8), 8)
+        self.assertEqual(self.kept(SamplingFilter(rate=0), 8), 0)
+
+    def test_messages_sampled_independently(self):
+        sampler = SamplingFilter(rate=0.5)
+
+        self.assertEqual(self.kept(sampler, 2, msg="first"), 1)
+        self.assertEqual(self.kept(sampler, 2, msg="second"), 1)
+
+    def test_sample_key(self):
+        sampler = SamplingFilter(rate=0.5)
+
+        self.assertEqual(self.kept(sampler, 2, sample_key="GET a/"), 1)
+        self.assertEqual(self.kept(sampler, 2, sample_key="GET b/"), 1)
+
+    def test_warnings_and_overrides_kept(self):
+        sampler = SamplingFilter(rate=0)
+
+        self.assertEqual(self.kept(sampler, 3, level=logging.WARNING), 3)
+        self.assertEqual(self.kept(sampler, 3, sample_rate=1), 3)
+
+
+class QueueListenerHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.target = ListHandler()
+        self.handler = QueueListenerHandler([self.target])
+        self.addCleanup(self.handler.close)
+
+    def test_records_written_by_listener(self):
+        model = {"title": "Курс"}
+        record = make_record("saved %r", (model,))
+
+        self.handler.handle(record)
+        self.assertTrue(self.target.emitted.wait(5))
+
+        (written,) = self.target.records
+        self.assertEqual(written.getMessage(), "saved {'title': 'Курс'}")
+        self.assertIsNone(written.args)
+
+    def test_full_queue_drops_records(self):
+        self.handler.stop()
+        handler = QueueListenerHandler([self.target], maxsize=1)
+        handler.stop()
+
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        self.assertEqual(handler.queue.qsize(), 1)
@@ -0,0 +1,97 @@
+"""
+Tests for the N+1 query detector.
+"""
+
+from django.test import SimpleTestCase, TestCase
+
+from ..models import User
+from ..nplusone import (
+    NPlusOneError,
+    QueryTemplateTracker,
+    detect_n_plus_one,
+    normalize_sql,
+)
+
+
+def run(tracker, sql):
+    return tracker(lambda *args: None, sql, None, False, {})
+
+
+class NormalizeSQLTests(SimpleTestCase):
+    def test_literals_and_placeholders(self):
+        self.assertEqual(
+            normalize_sql("""SELECT * FROM "api_lesson"
+                WHERE "title" = 'It''s' AND "id" = 12 AND "course_id" = %s"""),
+            'SELECT * FROM "api_lesson" WHERE "title" = ? AND "id" = ? '
+            'AND "course_id" = ?',
+        )
+
+    def test_in_lists_collapsed(self):
+        self.assertEqual(
+            normalize_sql('SELECT 1 FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            normalize_sql('SELECT 1 FROM "t" WHERE "id" IN (7)'),
+        )
+
+    def test_identifiers_with_digits_kept(self):
+        self.assertEqual(
+            normalize_sql('SELECT "t1"."col2" FROM "t1"'),
+            'SELECT "t1"."col2" FROM "t1"',
+        )
+
+
+class QueryTemplateTrackerTests(SimpleTestCase):
+    def test_threshold(self):
+        tracker = QueryTemplateTracker(threshold=2)
+        for pk in range(2):
+            run(tracker, f'SELECT * FROM "api_user" WHERE "id" = {pk}')
+        self.assertEqual(tracker.offenders(), [])
+
+        run(tracker, 'SELECT * FROM "api_user" WHERE "id" = 9')
+
+        (offender,) = tracker.offenders()
+        self.assertEqual(offender["count"], 3)
+        self.assertEqual(
+            offender["template"], 'SELECT * FROM "api_user" WHERE "id" = ?'
+        )
+        self.assertTrue(any(__file__ in frame for frame in offender["stack"]))
+
+    def test_savepoints_ignored(self):
+        tracker = QueryTemplateTracker(threshold=0)
+        run(tracker, 'SAVEPOINT "s1"')
+        run(tracker, 'RELEASE SAVEPOINT "s1"')
+
+        self.assertEqual(tracker.offenders(), [])
+
+
+class DetectNPlusOneTests(TestCase):
+    def repeat(self, times):
+        for _ in range(times):
+            User.objects.filter(pk=0).exists()
+
+    def test_raise(self):
+        with self.assertRaisesMessage(NPlusOneError, "GET /api/: Repeated queries"):
+            with detect_n_plus_one("raise", threshold=2, label="GET /api/"):
+                self.repeat(3)
+
+        with detect_n_plus_one("raise", threshold=3):
+            self.repeat(3)
+
+    def test_log(self):
+        with self.assertLogs("api.nplusone", "WARNING") as logs:
+            with detect_n_plus_one("log", threshold=2, label="GET /api/"):
+                self.repeat(3)
+
+        (record,) = logs.records
+        self.assertEqual(record.label, "GET /api/")
+        self.assertEqual(record.templates[0][1], 3)
+
+    def test_off(self):
+        with detect_n_plus_one("off", threshold=0) as tracker:
+            self.repeat(3)
+
+        self.assertIsNone(tracker)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            with detect_n_plus_one("loud"):
+                pass
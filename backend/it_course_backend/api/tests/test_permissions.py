@@ -0,0 +1,87 @@
+"""
+Tests for cached permission checks.
+"""
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from ..models import User
+from ..permissions import IsCourseTeacher
+from .fixtures import seed_dataset
+
+
+class CachedModelBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="editor@example.com", password="x")
+        cls.user.user_permissions.add(Permission.objects.get(codename="change_course"))
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh_user(self):
+        """Return the user as a new request would load it."""
+        return User.objects.get(pk=self.user.pk)
+
+    def test_cached_across_requests(self):
+        self.assertTrue(self.fresh_user().has_perm("api.change_course"))
+
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("api.change_course"))
+            self.assertFalse(user.has_perm("api.delete_course"))
+
+    def test_invalidated_on_change(self):
+        self.assertFalse(self.fresh_user().has_perm("api.delete_course"))
+
+        self.user.user_permissions.add(Permission.objects.get(codename="delete_course"))
+
+        self.assertTrue(self.fresh_user().has_perm("api.delete_course"))
+
+    def test_superuser_flag_in_key(self):
+        self.assertFalse(self.fresh_user().has_perm("api.delete_course"))
+
+        User.objects.filter(pk=self.user.pk).update(is_superuser=True)
+
+        self.assertTrue(self.fresh_user().has_perm("api.delete_course"))
+
+
+class ObjectPermissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.teacher)
+
+    def assertNoCourseLoad(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        for query in ctx.captured_queries:
+            self.assertNotIn('FROM "api_course"', query["sql"])
+
+    def test_homework_detail_selects_course(self):
+        pk = self.dataset.homework.pk
+        self.assertNoCourseLoad(reverse("teacher-homework-detail", kwargs={"pk": pk}))
+        self.assertNoCourseLoad(reverse("homework-detail", kwargs={"pk": pk}))
+
+    def test_group_edit_selects_course(self):
+        pk = self.dataset.group.pk
+        self.assertNoCourseLoad(reverse("group-edit", kwargs={"pk": pk}))
+
+    def test_group_teacher_checked_once_per_request(self):
+        request = APIRequestFactory().get("/api/")
+        request.user = self.dataset.teacher
+        view = type("View", (), {"kwargs": {"group_id": self.dataset.group.pk}})()
+
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                self.assertTrue(IsCourseTeacher().has_permission(request, view))
@@ -0,0 +1,151 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+
+import io
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, tag
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from ..parsers import ORJSONParser
+from ..renderers import ORJSONRenderer
+from .fixtures import seed_dataset
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_native_types(self):
+        value = uuid.uuid4()
+        data = {
+            "at": datetime(2024, 9, 1, 8, 30, tzinfo=timezone.utc),
+            "id": value,
+            "price": Decimal("12.50"),
+            "label": gettext_lazy("Title"),
+            1: "key",
+        }
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            {
+                "at": "2024-09-01T08:30:00Z",
+                "id": str(value),
+                "price": 12.5,
+                "label": "Title",
+                "1": "key",
+            },
+        )
+
+    def test_output_matches_drf(self):
+        data = [{"title": "Вступ до Python", "grade": None, "tags": ("a", "b")}]
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_datetimes(self):
+        at = datetime(2024, 9, 1, 8, 30, 5, 123456, tzinfo=timezone.utc)
+        data = {"at": at, "day": at.date(), "time": at.time()}
+
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            {
+                "at": "2024-09-01T08:30:05.123456Z",
+                "day": "2024-09-01",
+                "time": "08:30:05.123456",
+            },
+        )
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        # Serializer fields render datetimes as strings, which match too.
+        field = serializers.DateTimeField()
+        value = {"at": field.to_representation(at)}
+        self.assertEqual(ORJSONRenderer().render(value), JSONRenderer().render(value))
+
+    def test_datetime_offsets(self):
+        kyiv = timezone(timedelta(hours=3))
+        data = [
+            datetime(2024, 9, 1, 8, 30, tzinfo=timezone.utc),
+            datetime(2024, 9, 1, 8, 30, 5, 120000, tzinfo=kyiv),
+            datetime(2024, 9, 1, 8, 30, 5, 1),
+        ]
+
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            [
+                "2024-09-01T08:30:00Z",
+                "2024-09-01T08:30:05.120000+03:00",
+                "2024-09-01T08:30:05.000001",
+            ],
+        )
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_finite_floats(self):
+        data = {"grade": float("nan"), "limit": float("inf")}
+
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)), {"grade": None, "limit": None}
+        )
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+    def test_indent(self):
+        rendered = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, body):
+        return ORJSONParser().parse(io.BytesIO(body))
+
+    def test_parse(self):
+        self.assertEqual(self.parse('{"title": "Курс"}'.encode()), {"title": "Курс"})
+
+    def test_invalid_json(self):
+        for body in (b"{", b'{"grade": NaN}'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(body)
+
+
+@tag("benchmark")
+class RendererBenchmarkTests(TestCase):
+    """orjson must render the largest list payloads faster than DRF."""
+
+    iterations = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("large")
+
+    def payloads(self):
+        client = APIClient()
+        client.force_authenticate(self.dataset.teacher)
+        return {
+            "course_list": client.get(reverse("course_list")).data,
+            "homework-list-create": client.get(
+                reverse("homework-list-create"), {"course_id": self.dataset.course.pk}
+            ).data,
+        }
+
+    def best_ms(self, renderer, data):
+        timings = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            renderer.render(data)
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    def test_orjson_is_faster_than_stdlib(self):
+        for name, data in self.payloads().items():
+            with self.subTest(route=name):
+                self.assertEqual(
+                    json.loads(ORJSONRenderer().render(data)),
+                    json.loads(JSONRenderer().render(data)),
+                )
+                stdlib_ms = self.best_ms(JSONRenderer(), data)
+                orjson_ms = self.best_ms(ORJSONRenderer(), data)
+                self.assertLess(orjson_ms * 2, stdlib_ms, f"{name}: {orjson_ms:.3f} ms")
@@ -0,0 +1,100 @@
+"""
+Tests for routing reads to read replicas.
+"""
+
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..middleware import ReplicaRoutingMiddleware
+from ..models import Course
+from ..routers import replica_reads
+from .fixtures import seed_dataset
+
+# Set DATABASE_REPLICA_HOSTS, e.g. to the primary's host, to run the tests
+# against a second database alias.
+HAS_REPLICA = "replica1" in settings.DATABASES
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_primary_outside_requests(self):
+        self.assertEqual(router.db_for_read(Course), "default")
+
+    def test_reads_stick_to_primary_after_write(self):
+        with replica_reads() as state:
+            self.assertEqual(router.db_for_read(Course), "replica1")
+            self.assertEqual(router.db_for_write(Course), "default")
+            self.assertEqual(router.db_for_read(Course), "default")
+        self.assertTrue(state.wrote)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(router.allow_migrate("replica1", "api"))
+        self.assertTrue(router.allow_migrate("default", "api"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], DATABASE_REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def handle(self, request, write=False):
+        used = []
+
+        def view(request):
+            if write:
+                router.db_for_write(Course)
+            used.append(router.db_for_read(Course))
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return used[0], response
+
+    def test_safe_requests_read_from_replicas(self):
+        alias, response = self.handle(RequestFactory().get("/api/course/"))
+        self.assertEqual(alias, "replica1")
+        self.assertNotIn("pin_primary", response.cookies)
+
+    def test_writes_pin_client_to_primary(self):
+        factory = RequestFactory()
+        alias, response = self.handle(factory.post("/api/course/"), write=True)
+        self.assertEqual(alias, "default")
+        self.assertEqual(response.cookies["pin_primary"]["max-age"], 5)
+
+        request = factory.get("/api/course/")
+        request.COOKIES["pin_primary"] = "1"
+        alias, _ = self.handle(request)
+        self.assertEqual(alias, "default")
+
+
+@skipUnless(HAS_REPLICA, "No read replica is configured.")
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaDatabaseTests(TransactionTestCase):
+    # Reads inside TestCase's transaction always use the primary.
+    databases = {"default", "replica1"} if HAS_REPLICA else {"default"}
+
+    def setUp(self):
+        self.dataset = seed_dataset("small")
+
+    def test_api_reads_follow_writes(self):
+        client = APIClient()
+        client.force_authenticate(self.dataset.teacher)
+        url = reverse("course_list")
+
+        with CaptureQueriesContext(connections["replica1"]) as replica:
+            client.get(url)
+        self.assertTrue(replica.captured_queries)
+
+        client.post(reverse("course_create"), {"title": "Replicated"}, format="json")
+        with CaptureQueriesContext(connections["replica1"]) as replica:
+            response = client.get(url)
+        self.assertFalse(replica.captured_queries)
+        self.assertIn("Replicated", [item["course"]["title"] for item in response.data])
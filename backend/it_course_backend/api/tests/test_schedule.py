@@ -0,0 +1,266 @@
+"""
+Tests for schedule conflicts and free slots.
+"""
+
+import datetime
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+
+from ..models import Course, Group, GroupMembership, Lesson, User
+from ..schedule import Schedule
+from .fixtures import seed_dataset
+
+# A Monday, after the lessons of the dataset.
+MONDAY = datetime.datetime(2030, 1, 7, tzinfo=datetime.timezone.utc)
+
+
+def at(hours, minutes=0, days=0):
+    return MONDAY + datetime.timedelta(days=days, hours=hours, minutes=minutes)
+
+
+@override_settings(
+    LESSON_DURATION_MINUTES=90,
+    SCHEDULE_DAY_START="09:00",
+    SCHEDULE_DAY_END="21:00",
+    SCHEDULE_SLOT_MINUTES=30,
+)
+class ScheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.other_course = Course.objects.get(title="Course 1 (small)")
+        # A course of another teacher, with a member of the dataset's group.
+        cls.other_teacher = User.objects.create_user(
+            email="other.teacher@example.com", password="x"
+        )
+        cls.outside_course = Course.objects.create(
+            title="Outside course", teacher=cls.other_teacher
+        )
+        outside_group = Group.objects.create(name="Outside", course=cls.outside_course)
+        cls.outside_course.groups.add(outside_group)
+        GroupMembership.objects.create(
+            user=cls.dataset.other_student, group=outside_group, role="student"
+        )
+        cls.morning, cls.outside = Lesson.objects.bulk_create(
+            [
+                Lesson(
+                    title="Morning", course=cls.dataset.course, scheduled_time=at(9)
+                ),
+                Lesson(
+                    title="Outside", course=cls.outside_course, scheduled_time=at(11)
+                ),
+            ]
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.teacher)
+
+    def create_lesson(self, course, start, **data):
+        return self.client.post(
+            reverse("lesson-create"),
+            {
+                "title": "New lesson",
+                "course": course.pk,
+                "scheduled_time": start.isoformat(),
+                **data,
+            },
+            format="json",
+        )
+
+    def free_slots(self, after, count=3, **extra):
+        return self.client.get(
+            reverse("schedule-free-slots"),
+            {
+                "group": self.dataset.group.pk,
+                "after": after.isoformat(),
+                "count": count,
+            },
+            **extra,
+        )
+
+    def test_overlap_bounds(self):
+        schedule = Schedule.for_course(self.dataset.course, at(7), at(12))
+
+        self.assertEqual(schedule.conflicts(at(7, 30)), [])
+        self.assertEqual(schedule.conflicts(at(12, 30)), [])
+        self.assertEqual(schedule.conflicts(at(7, 31)), [(at(9), self.morning.pk)])
+        self.assertEqual(
+            schedule.conflicts(at(10)),
+            [(at(9), self.morning.pk), (at(11), self.outside.pk)],
+        )
+
+    def test_teacher_conflict_rejected(self):
+        response = self.create_lesson(self.other_course, at(9, 30))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2030-01-07 09:00", response.data["scheduled_time"][0])
+
+    def test_member_conflict_rejected(self):
+        self.client.force_authenticate(self.other_teacher)
+
+        response = self.create_lesson(self.outside_course, at(9, 30))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2030-01-07 09:00", response.data["scheduled_time"][0])
+
+    def test_conflict_allowed(self):
+        response = self.create_lesson(
+            self.other_course, at(9, 30), allow_conflicts=True
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.data["conflicts"],
+            [{"scheduled_time": "2030-01-07T09:00:00Z"}],
+        )
+
+    def test_lesson_of_other_teacher(self):
+        self.client.force_authenticate(self.other_teacher)
+
+        with self.assertNumQueries(1):
+            response = self.create_lesson(self.dataset.course, at(9, 30))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_free_time_accepted(self):
+        response = self.create_lesson(self.other_course, at(14))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("conflicts", response.data)
+
+    def test_only_moves_checked(self):
+        lesson = Lesson.objects.create(
+            title="Clash", course=self.other_course, scheduled_time=at(9)
+        )
+        url = reverse("lesson-edit", kwargs={"pk": lesson.pk})
+
+        response = self.client.patch(url, {"title": "Renamed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(
+            url, {"scheduled_time": at(9, 15).isoformat()}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_series_conflict_rejected(self):
+        data = {
+            "course": self.other_course.pk,
+            "title": "Weekly",
+            "start_date": MONDAY.date().isoformat(),
+            "time": "10:00",
+            "weekdays": ["MO"],
+            "count": 4,
+        }
+        url = reverse("lesson-series-create")
+
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2030-01-07 09:00", response.data["non_field_errors"][0])
+
+        data["time"] = "14:00"
+        self.assertEqual(self.client.post(url, data, format="json").status_code, 201)
+
+    def test_series_conflict_allowed(self):
+        response = self.client.post(
+            reverse("lesson-series-create"),
+            {
+                "course": self.other_course.pk,
+                "title": "Weekly",
+                "start_date": MONDAY.date().isoformat(),
+                "time": "10:00",
+                "weekdays": ["MO"],
+                "count": 4,
+                "allow_conflicts": True,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["lessons"]), 4)
+        self.assertEqual(
+            response.data["conflicts"],
+            [{"scheduled_time": "2030-01-07T09:00:00Z"}],
+        )
+
+    def test_free_slots(self):
+        response = self.free_slots(at(8))
+
+        self.assertEqual(response.status_code, 200)
+        # 09:00 and 11:00 are taken by a lesson of the teacher and one of a
+        # member of the group.
+        self.assertEqual(
+            [slot["start"] for slot in response.data],
+            ["2030-01-07T12:30:00Z", "2030-01-07T13:00:00Z", "2030-01-07T13:30:00Z"],
+        )
+        self.assertEqual(response.data[0]["end"], "2030-01-07T14:00:00Z")
+
+    def test_free_slots_within_day(self):
+        response = self.free_slots(at(19, 10))
+
+        self.assertEqual(
+            [slot["start"] for slot in response.data],
+            ["2030-01-07T19:30:00Z", "2030-01-08T09:00:00Z", "2030-01-08T09:30:00Z"],
+        )
+
+    def test_free_slots_among_many_lessons(self):
+        # Lessons at 09:00 and 13:00 every day for years.
+        Lesson.objects.bulk_create(
+            Lesson(
+                title=f"Lesson {index}",
+                course=self.other_course,
+                scheduled_time=at(9 + 4 * (index % 2), days=1 + index // 2),
+            )
+            for index in range(2000)
+        )
+
+        with self.assertNumQueries(3):
+            response = self.free_slots(at(0, days=1), count=2)
+
+        self.assertEqual(
+            [slot["start"] for slot in response.data],
+            ["2030-01-08T10:30:00Z", "2030-01-08T11:00:00Z"],
+        )
+
+    def test_series_of_other_teacher(self):
+        self.client.force_authenticate(self.other_teacher)
+
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse("lesson-series-create"),
+                {
+                    "course": self.dataset.course.pk,
+                    "title": "Weekly",
+                    "start_date": MONDAY.date().isoformat(),
+                    "time": "09:00",
+                    "weekdays": ["MO"],
+                    "count": 4,
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_free_slots_not_in_the_past(self):
+        before = timezone.now()
+
+        response = self.free_slots(before - datetime.timedelta(days=365))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data)
+        for slot in response.data:
+            self.assertGreaterEqual(parse_datetime(slot["start"]), before)
+
+    def test_free_slots_permissions_and_limits(self):
+        self.client.force_authenticate(self.dataset.student)
+        self.assertEqual(self.free_slots(at(8)).status_code, 403)
+
+        self.client.force_authenticate(self.dataset.teacher)
+        with override_settings(SCHEDULE_MAX_SLOTS=2):
+            response = self.free_slots(at(8), count=3)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("count", response.data)
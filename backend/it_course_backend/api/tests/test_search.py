@@ -0,0 +1,124 @@
+"""
+Tests for full-text search.
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Course, Homework, Lesson, User
+from .fixtures import seed_dataset
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        ds = cls.dataset
+        cls.lesson = Lesson.objects.create(
+            title="Chlorophyll",
+            course=ds.course,
+            scheduled_time=timezone.now(),
+            content="How plants use photosynthesis to grow. Як рослини ростуть.",
+        )
+        cls.homework = Homework.objects.create(
+            title="Photosynthesis essay",
+            course=ds.course,
+            lesson=cls.lesson,
+            description="Write about leaves.",
+            due_date=timezone.now(),
+            submitted_by=ds.teacher,
+        )
+        outsider = User.objects.create_user(
+            email="outsider@example.com", password="password"
+        )
+        foreign_course = Course.objects.create(
+            title="Photosynthesis for experts", teacher=outsider
+        )
+        Lesson.objects.create(
+            title="Photosynthesis in depth",
+            course=foreign_course,
+            scheduled_time=timezone.now(),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.student)
+        self.url = reverse("search")
+
+    def results(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [(item["type"], item["id"]) for item in response.data["results"]]
+
+    def test_results_are_ranked_and_scoped(self):
+        results = self.results(q="photosynthesis")
+
+        # The title match outranks the match in the lesson content, and the
+        # course the student does not belong to is left out.
+        self.assertEqual(
+            results, [("homework", self.homework.pk), ("lesson", self.lesson.pk)]
+        )
+
+    def test_type_filter_and_ukrainian_words(self):
+        self.assertEqual(
+            self.results(q="Рослини ростуть", type="lesson"),
+            [("lesson", self.lesson.pk)],
+        )
+        self.assertEqual(self.results(q="рослини", type="homework"), [])
+        self.assertEqual(
+            self.results(q="як", type="lesson"), [("lesson", self.lesson.pk)]
+        )
+
+    def test_vectors_follow_updates(self):
+        Lesson.objects.filter(pk=self.lesson.pk).update(notes_content="Stomata")
+
+        self.assertEqual(self.results(q="stomata"), [("lesson", self.lesson.pk)])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(
+            self.client.get(self.url, {"q": "x", "type": "user"}).status_code, 400
+        )
+
+
+class GroupStudentAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.candidate = User.objects.create_user(
+            email="marta.kovalenko@example.com",
+            password="password",
+            first_name="Marta",
+            last_name="Kovalenko",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.teacher)
+        self.url = reverse(
+            "group-student-autocomplete", kwargs={"group_id": self.dataset.group.pk}
+        )
+
+    def test_members_are_left_out(self):
+        response = self.client.get(self.url, {"q": "KOVAL"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user["id"] for user in response.data], [self.candidate.pk])
+
+        member = self.dataset.other_student.email
+        self.assertEqual(self.client.get(self.url, {"q": member}).data, [])
+
+    def test_teachers_only(self):
+        self.client.force_authenticate(self.dataset.student)
+
+        self.assertEqual(self.client.get(self.url, {"q": "marta"}).status_code, 403)
+
+    def test_lookup_uses_trigram_index(self):
+        queryset = User.objects.filter(email__icontains="kovalenko")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        self.assertIn("user_email_trgm_idx", plan)
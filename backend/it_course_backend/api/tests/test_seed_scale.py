@@ -0,0 +1,98 @@
+"""
+Tests for the ``seed_scale`` management command.
+"""
+
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from ..models import (
+    Course,
+    GroupMembership,
+    Homework,
+    HomeworkSubmission,
+    Lesson,
+    User,
+)
+
+OPTIONS = {
+    "teachers": 3,
+    "students": 40,
+    "courses": 4,
+    "students_per_course": 10,
+    "lessons_per_course": 3,
+    "homework_per_lesson": 2,
+    "chunk_size": 7,
+}
+
+
+def _snapshot(prefix):
+    """Return the generated data of a prefix without database IDs."""
+    users = dict(
+        User.objects.filter(email__startswith=prefix).values_list("id", "email")
+    )
+    return {
+        "courses": list(
+            Course.objects.filter(teacher__in=users)
+            .order_by("id")
+            .values_list("title", "teacher__email", "start_date", "state")
+        ),
+        "memberships": sorted(
+            GroupMembership.objects.filter(user__in=users).values_list(
+                "user__email", "group__course__title", "role"
+            )
+        ),
+        "submissions": sorted(
+            HomeworkSubmission.objects.filter(student__in=users).values_list(
+                "homework__title", "student__email", "grade"
+            ),
+            key=str,
+        ),
+    }
+
+
+class SeedScaleTests(TestCase):
+    def seed(self, **options):
+        call_command("seed_scale", stdout=StringIO(), **{**OPTIONS, **options})
+
+    def test_creates_requested_volumes(self):
+        self.seed(prefix="a", method="bulk")
+
+        self.assertEqual(User.objects.filter(email__startswith="a.").count(), 43)
+        self.assertEqual(Course.objects.count(), 4)
+        self.assertEqual(Lesson.objects.count(), 12)
+        self.assertEqual(Homework.objects.count(), 24)
+        self.assertEqual(Course.lessons.through.objects.count(), 12)
+        self.assertEqual(Course.groups.through.objects.count(), 4)
+        self.assertEqual(GroupMembership.objects.filter(role="teacher").count(), 4)
+        self.assertTrue(GroupMembership.objects.filter(role="student").exists())
+        self.assertTrue(HomeworkSubmission.objects.exists())
+
+    def test_same_seed_generates_same_data(self):
+        self.seed(prefix="a", method="bulk")
+        self.seed(prefix="b", method="auto")
+
+        first, second = _snapshot("a."), _snapshot("b.")
+        self.assertEqual(len(first["memberships"]), len(second["memberships"]))
+        self.assertEqual(len(first["submissions"]), len(second["submissions"]))
+        self.assertEqual(
+            [course[2:] for course in first["courses"]],
+            [course[2:] for course in second["courses"]],
+        )
+        self.assertEqual(
+            sorted(grade for *_, grade in first["submissions"] if grade is not None),
+            sorted(grade for *_, grade in second["submissions"] if grade is not None),
+        )
+
+    def test_rejects_existing_prefix(self):
+        self.seed(prefix="a", method="bulk")
+        with self.assertRaises(CommandError):
+            self.seed(prefix="a", method="bulk")
+
+    def test_copy_requires_postgresql(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("COPY is available on PostgreSQL.")
+        with self.assertRaises(CommandError):
+            self.seed(prefix="a", method="copy")
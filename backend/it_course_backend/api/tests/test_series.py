@@ -0,0 +1,199 @@
+"""
+Tests for recurring lesson series.
+"""
+
+import datetime
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Lesson, LessonSeries
+from .fixtures import seed_dataset
+
+# A Monday.
+MONDAY = datetime.date(2030, 1, 7)
+
+
+def series_dates(limit=None, **kwargs):
+    values = {"start_date": MONDAY, "weekdays": ["MO", "TH"], "count": 4}
+    values.update(kwargs)
+    return LessonSeries(**values).dates(limit)
+
+
+class RecurrenceTests(SimpleTestCase):
+    def test_weekdays_and_count(self):
+        self.assertEqual(
+            series_dates(),
+            [MONDAY + datetime.timedelta(days=days) for days in (0, 3, 7, 10)],
+        )
+
+    def test_starts_mid_week(self):
+        start = MONDAY + datetime.timedelta(days=2)
+        self.assertEqual(
+            series_dates(start_date=start, count=2),
+            [MONDAY + datetime.timedelta(days=days) for days in (3, 7)],
+        )
+
+    def test_interval_and_until(self):
+        until = MONDAY + datetime.timedelta(days=28)
+        self.assertEqual(
+            series_dates(weekdays=["MO"], interval=2, count=None, until=until),
+            [MONDAY + datetime.timedelta(days=days) for days in (0, 14, 28)],
+        )
+
+    def test_exdates_count_towards_count(self):
+        thursday = MONDAY + datetime.timedelta(days=3)
+        dates = series_dates(exdates=[thursday])
+
+        self.assertEqual(len(dates), 3)
+        self.assertNotIn(thursday, dates)
+
+    def test_limit(self):
+        until = datetime.date(9999, 1, 1)
+        self.assertEqual(len(series_dates(count=None, until=until, limit=10)), 11)
+
+
+class LessonSeriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.teacher)
+        # After the lessons of the dataset, which would conflict.
+        self.start = timezone.localdate() + datetime.timedelta(days=7)
+
+    def create(self, **data):
+        values = {
+            "course": self.dataset.course.pk,
+            "title": "Python practice",
+            "meeting_link": "https://meet.example.com/python",
+            "start_date": self.start.isoformat(),
+            "time": "18:00",
+            "weekdays": ["MO", "TH"],
+            "count": 10,
+        }
+        values.update(data)
+        return self.client.post(reverse("lesson-series-create"), values, format="json")
+
+    def lessons(self, series_id):
+        return Lesson.objects.filter(series_id=series_id).order_by("scheduled_time")
+
+    def edit(self, series_id, data):
+        return self.client.patch(
+            reverse("lesson-series-edit", kwargs={"pk": series_id}), data, format="json"
+        )
+
+    def test_create_inserts_lessons_at_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.create()
+
+        self.assertEqual(response.status_code, 201)
+        inserts = [
+            query
+            for query in ctx.captured_queries
+            if query["sql"].startswith('INSERT INTO "api_lesson"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+        lessons = self.lessons(response.data["id"])
+        self.assertEqual(len(response.data["lessons"]), 10)
+        self.assertEqual(lessons.count(), 10)
+        for lesson in lessons:
+            local = timezone.localtime(lesson.scheduled_time)
+            self.assertEqual((local.hour, local.minute), (18, 0))
+            self.assertIn(local.weekday(), (0, 3))
+            self.assertEqual(lesson.occurrence, local.date())
+            self.assertEqual(lesson.meeting_link, "https://meet.example.com/python")
+
+    def test_invalid_recurrences(self):
+        before_start = (self.start - datetime.timedelta(days=1)).isoformat()
+        cases = [
+            ("count", {"count": None}),
+            ("count", {"until": self.start.isoformat()}),
+            ("until", {"count": None, "until": before_start}),
+            ("weekdays", {"weekdays": []}),
+            ("weekdays", {"weekdays": ["XX"]}),
+            ("non_field_errors", {"count": 5}),
+        ]
+        with override_settings(LESSON_SERIES_MAX_OCCURRENCES=4):
+            for key, data in cases:
+                with self.subTest(data=data):
+                    response = self.create(**data)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(key, response.data)
+        self.assertFalse(LessonSeries.objects.exists())
+
+    def test_only_course_teacher(self):
+        self.client.force_authenticate(self.dataset.student)
+
+        self.assertEqual(self.create().status_code, 403)
+        self.assertFalse(LessonSeries.objects.exists())
+
+    def test_edit_keeps_single_occurrence_changes(self):
+        series_id = self.create().data["id"]
+        first, second, *rest = self.lessons(series_id)
+        moved = first.scheduled_time + datetime.timedelta(hours=2)
+        self.client.patch(
+            reverse("lesson-edit", kwargs={"pk": first.pk}),
+            {"title": "Guest lecture", "scheduled_time": moved.isoformat()},
+            format="json",
+        )
+
+        response = self.edit(series_id, {"title": "Python lab", "time": "17:30"})
+
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        self.assertEqual((first.title, first.scheduled_time), ("Guest lecture", moved))
+        for lesson in self.lessons(series_id).exclude(pk=first.pk):
+            local = timezone.localtime(lesson.scheduled_time)
+            self.assertEqual(lesson.title, "Python lab")
+            self.assertEqual((local.hour, local.minute), (17, 30))
+        self.assertIn(second.pk, [lesson["id"] for lesson in response.data["lessons"]])
+
+    def test_edit_recurrence(self):
+        series_id = self.create().data["id"]
+        mondays = {
+            lesson.pk
+            for lesson in self.lessons(series_id)
+            if lesson.occurrence.weekday() == 0
+        }
+
+        response = self.edit(series_id, {"weekdays": ["MO", "WE"]})
+
+        self.assertEqual(response.status_code, 200)
+        lessons = list(self.lessons(series_id))
+        self.assertEqual(len(lessons), 10)
+        self.assertEqual({lesson.occurrence.weekday() for lesson in lessons}, {0, 2})
+        self.assertTrue(mondays <= {lesson.pk for lesson in lessons})
+
+    def test_deleted_occurrence_stays_deleted(self):
+        series_id = self.create().data["id"]
+        lesson = self.lessons(series_id).first()
+
+        self.client.delete(reverse("lesson-edit", kwargs={"pk": lesson.pk}))
+        self.edit(series_id, {"title": "Python lab"})
+
+        self.assertEqual(
+            LessonSeries.objects.get(pk=series_id).exdates, [lesson.occurrence]
+        )
+        self.assertFalse(self.lessons(series_id).filter(occurrence=lesson.occurrence))
+
+    def test_delete_keeps_past_lessons(self):
+        series_id = self.create().data["id"]
+        past = self.lessons(series_id).first()
+        Lesson.objects.filter(pk=past.pk).update(
+            scheduled_time=timezone.now() - datetime.timedelta(days=1)
+        )
+
+        response = self.client.delete(
+            reverse("lesson-series-edit", kwargs={"pk": series_id})
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Lesson.objects.filter(title="Python practice")), [past])
@@ -0,0 +1,234 @@
+"""
+Tests for deactivating and activating courses with everything in them.
+"""
+
+from collections import Counter
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import (
+    Course,
+    Group,
+    GroupMembership,
+    Homework,
+    HomeworkSubmission,
+    Lesson,
+    User,
+)
+from .fixtures import seed_dataset
+
+SUBTREE = (Lesson, Homework, Group, GroupMembership, HomeworkSubmission)
+
+
+def course_rows(model, course_id):
+    """Return the rows of a model that belong to a course."""
+    lookup = {
+        Lesson: "course",
+        Homework: "course",
+        Group: "course",
+        GroupMembership: "group__course",
+        HomeworkSubmission: "homework__course",
+    }[model]
+    return model.objects.filter(**{lookup: course_id})
+
+
+class CascadeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.other = Course.objects.exclude(pk=cls.dataset.course.pk).get()
+
+    def test_one_update_per_table(self):
+        course = self.dataset.course
+        with CaptureQueriesContext(connection) as ctx:
+            counts = Course.objects.filter(pk=course.pk).deactivate()
+
+        updates = Counter(
+            query["sql"].split('"')[1]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("UPDATE")
+        )
+        tables = [Course._meta.db_table] + [model._meta.db_table for model in SUBTREE]
+        self.assertEqual(updates, Counter(tables))
+        self.assertEqual(counts["api.course"], 1)
+
+        for model in SUBTREE:
+            with self.subTest(model=model.__name__):
+                rows = course_rows(model, course.pk)
+                self.assertTrue(rows.exists())
+                self.assertFalse(rows.filter(is_active=True).exists())
+                self.assertFalse(
+                    course_rows(model, self.other.pk).filter(is_active=False).exists()
+                )
+
+    def test_activate_restores_subtree(self):
+        course = self.dataset.course
+        course.deactivate()
+        self.assertFalse(course.is_active)
+
+        course.activate()
+
+        for model in SUBTREE:
+            with self.subTest(model=model.__name__):
+                self.assertFalse(
+                    course_rows(model, course.pk).filter(is_active=False).exists()
+                )
+
+    def test_activate_keeps_rows_deactivated_on_their_own(self):
+        course = self.dataset.course
+        lesson = self.dataset.lesson
+        lesson.deactivate()
+        course.deactivate()
+
+        counts = Course.objects.filter(pk=course.pk).activate()
+
+        self.assertEqual(counts["api.course"], 1)
+        self.assertFalse(Lesson.objects.get(pk=lesson.pk).is_active)
+        self.assertFalse(
+            Homework.objects.filter(lesson=lesson, is_active=True).exists()
+        )
+        self.assertTrue(course_rows(Lesson, course.pk).exclude(pk=lesson.pk).exists())
+        self.assertFalse(
+            course_rows(Lesson, course.pk)
+            .exclude(pk=lesson.pk)
+            .filter(is_active=False)
+            .exists()
+        )
+        self.assertFalse(course_rows(Group, course.pk).filter(is_active=False).exists())
+
+        lesson.activate()
+        self.assertFalse(
+            Homework.objects.filter(lesson=lesson, is_active=False).exists()
+        )
+
+    def test_activating_active_row_leaves_dependents(self):
+        lesson = self.dataset.lesson
+        lesson.deactivate()
+
+        counts = Course.objects.filter(pk=lesson.course_id).activate()
+
+        self.assertEqual(sum(counts.values()), 0)
+        self.assertFalse(Lesson.objects.get(pk=lesson.pk).is_active)
+
+    def test_lesson_cascades_to_its_homework_only(self):
+        lesson = self.dataset.lesson
+        counts = Lesson.objects.filter(pk=lesson.pk).deactivate()
+
+        self.assertEqual(counts["api.lesson"], 1)
+        self.assertFalse(Homework.active.filter(lesson=lesson).exists())
+        self.assertFalse(
+            HomeworkSubmission.active.filter(homework__lesson=lesson).exists()
+        )
+        self.assertTrue(Course.active.filter(pk=lesson.course_id).exists())
+        self.assertTrue(Group.active.filter(course=lesson.course_id).exists())
+
+    def test_views_hide_inactive_rows(self):
+        ds = self.dataset
+        client = APIClient()
+        client.force_authenticate(ds.teacher)
+        Lesson.objects.filter(pk=ds.lesson.pk).deactivate()
+
+        lesson_ids = [row["id"] for row in client.get(reverse("lesson-list")).data]
+        self.assertNotIn(ds.lesson.pk, lesson_ids)
+        self.assertTrue(lesson_ids)
+        url = reverse("homework-detail", kwargs={"pk": ds.homework.pk})
+        self.assertEqual(client.get(url).status_code, 404)
+
+        ds.course.deactivate()
+        url = reverse("course_detail", kwargs={"pk": ds.course.pk})
+        self.assertEqual(client.get(url).status_code, 404)
+
+
+class AdminActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.admin = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def run_action(self, action, course):
+        return self.client.post(
+            reverse("admin:api_course_changelist"),
+            {"action": action, "_selected_action": [course.pk]},
+            follow=True,
+        )
+
+    def test_deactivate_and_activate_courses(self):
+        course = self.dataset.course
+        response = self.run_action("deactivate_selected", course)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Deactivated")
+        self.assertFalse(course_rows(Lesson, course.pk).filter(is_active=True).exists())
+
+        self.run_action("activate_selected", course)
+        self.assertFalse(
+            course_rows(HomeworkSubmission, course.pk).filter(is_active=False).exists()
+        )
+
+
+class InactiveMembershipTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.other = Course.objects.exclude(pk=cls.dataset.course.pk).get()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def course_list(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse("course_list"))
+        return {row["course"]["id"]: row for row in response.data}
+
+    def test_inactive_membership_grants_no_access(self):
+        ds = self.dataset
+        GroupMembership.objects.filter(group=ds.group, user=ds.student).deactivate()
+
+        self.assertNotIn(ds.course.pk, self.course_list(ds.student))
+        url = reverse("course_detail", kwargs={"pk": ds.course.pk})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        lesson_ids = [row["id"] for row in self.client.get(reverse("lesson-list")).data]
+        self.assertNotIn(ds.lesson.pk, lesson_ids)
+
+    def test_inactive_group_grants_no_access(self):
+        ds = self.dataset
+        Group.objects.filter(pk=ds.group.pk).update(is_active=False)
+
+        self.assertNotIn(ds.course.pk, self.course_list(ds.student))
+
+    def test_inactive_rows_not_counted(self):
+        ds = self.dataset
+        (before,) = self.course_list(ds.teacher)[ds.course.pk]["pie_chart_data"]
+
+        GroupMembership.objects.filter(group=ds.group, user=ds.student).deactivate()
+        (after,) = self.course_list(ds.teacher)[ds.course.pk]["pie_chart_data"]
+        self.assertEqual(after["num_students"], before["num_students"] - 1)
+        self.assertEqual(after["num_teachers"], before["num_teachers"])
+
+        ds.group.deactivate()
+        self.assertEqual(
+            self.course_list(ds.teacher)[ds.course.pk]["pie_chart_data"], []
+        )
+
+    def test_linked_rows_of_other_courses_kept(self):
+        ds = self.dataset
+        other_group = Group.objects.get(course=self.other)
+        other_lesson = Lesson.objects.filter(course=self.other).first()
+        ds.course.groups.add(other_group)
+        ds.course.lessons.add(other_lesson)
+
+        ds.course.deactivate()
+
+        self.assertTrue(Group.objects.get(pk=other_group.pk).is_active)
+        self.assertTrue(Lesson.objects.get(pk=other_lesson.pk).is_active)
+        self.assertTrue(
+            GroupMembership.objects.filter(group=other_group, is_active=True).exists()
+        )
@@ -0,0 +1,101 @@
+"""
+Tests for the `?fields=` and `?include=` query parameters.
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .fixtures import seed_dataset
+
+
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.student)
+
+    def get(self, name, params=None, **kwargs):
+        response = self.client.get(reverse(name, kwargs=kwargs), params or {})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_course_list_fields(self):
+        with CaptureQueriesContext(connection) as full:
+            self.get("course_list")
+        with CaptureQueriesContext(connection) as sparse:
+            data = self.get("course_list", {"fields": "id,title"})
+
+        self.assertEqual({tuple(item["course"]) for item in data}, {("id", "title")})
+        self.assertLess(len(sparse), len(full))
+        sql = " ".join(query["sql"] for query in sparse.captured_queries)
+        self.assertNotIn('"api_course"."description"', sql)
+        self.assertNotIn("search_vector", sql)
+
+    def test_course_detail_include(self):
+        course = self.dataset.course
+        data = self.get(
+            "course_detail", {"fields": "title", "include": "groups"}, pk=course.pk
+        )["course"]
+
+        self.assertEqual(set(data), {"title", "groups"})
+        self.assertEqual(
+            data["groups"],
+            [{"id": group.pk, "name": group.name} for group in course.groups.all()],
+        )
+
+    def test_course_detail_ids_by_default(self):
+        course = self.dataset.course
+        data = self.get("course_detail", pk=course.pk)["course"]
+
+        self.assertEqual(data["groups"], [group.pk for group in course.groups.all()])
+        self.assertIn("homework_progress", data)
+
+    def test_lesson_list(self):
+        data = self.get("lesson-list", {"fields": "id,title", "include": "course"})
+
+        self.assertTrue(data)
+        course = self.dataset.course
+        for lesson in data:
+            self.assertEqual(set(lesson), {"id", "title", "course"})
+        self.assertIn(
+            {"id": course.pk, "title": course.title}, [row["course"] for row in data]
+        )
+
+    def test_lesson_list_without_role_skips_lookup(self):
+        with CaptureQueriesContext(connection) as full:
+            self.get("lesson-list")
+        with CaptureQueriesContext(connection) as sparse:
+            data = self.get("lesson-list", {"fields": "id"})
+
+        self.assertEqual(len(sparse), len(full) - 1)
+        self.assertEqual({tuple(lesson) for lesson in data}, {("id",)})
+
+    def test_homework_list(self):
+        self.client.force_authenticate(self.dataset.teacher)
+        course = self.dataset.course
+        data = self.get(
+            "homework-list-create",
+            {"course_id": course.pk, "fields": "title", "include": "course"},
+        )
+
+        self.assertTrue(data)
+        for homework in data:
+            self.assertEqual(
+                homework["course"], {"id": course.pk, "title": course.title}
+            )
+            self.assertEqual(set(homework), {"title", "course"})
+
+    def test_unknown_names(self):
+        course = self.dataset.course
+        for params in ({"fields": "secret"}, {"include": "title"}):
+            with self.subTest(params=params):
+                response = self.client.get(
+                    reverse("course_detail", kwargs={"pk": course.pk}), params
+                )
+                self.assertEqual(response.status_code, 400)
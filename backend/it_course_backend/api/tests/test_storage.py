@@ -0,0 +1,161 @@
+"""
+Tests for the content-addressed submission storage.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Blob, ChunkedUpload, HomeworkSubmission, submission_storage
+from .fixtures import seed_dataset
+
+CONTENT = b"%PDF-1.4 the same answer"
+
+
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=media_root, UPLOAD_TEMP_DIR=f"{media_root}/tmp"
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.storage = submission_storage()
+
+    def submit(self, content=CONTENT, student=None):
+        return HomeworkSubmission.objects.create(
+            homework=self.dataset.homework,
+            student=student or self.dataset.student,
+            submission_text="Answer",
+            submission_file=ContentFile(content, name="answer.pdf"),
+        )
+
+    def test_identical_content_is_stored_once(self):
+        first = self.submit()
+        second = self.submit(student=self.dataset.other_student)
+
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        self.assertEqual(first.submission_file.name, second.submission_file.name)
+        self.assertTrue(first.submission_file.name.endswith(f"{digest}.pdf"))
+        blob = Blob.objects.get()
+        self.assertEqual(
+            (blob.digest, blob.size, blob.ref_count), (digest, len(CONTENT), 2)
+        )
+        with second.submission_file.open("rb") as stored:
+            self.assertEqual(stored.read(), CONTENT)
+
+    def test_reference_counts_follow_rows(self):
+        first = self.submit()
+        second = self.submit(student=self.dataset.other_student)
+
+        second.submission_file = ContentFile(b"other answer", name="other.txt")
+        second.save()
+        self.assertEqual(Blob.objects.get(name=first.submission_file.name).ref_count, 1)
+
+        HomeworkSubmission.objects.get(pk=first.pk).delete()
+        self.assertEqual(Blob.objects.get(name=first.submission_file.name).ref_count, 0)
+        self.assertTrue(self.storage.exists(first.submission_file.name))
+
+    def test_reference_counts_of_loaded_rows(self):
+        first = self.submit()
+        loaded = HomeworkSubmission.objects.get(pk=first.pk)
+
+        loaded.submission_text = "Edited"
+        loaded.save()
+        self.assertEqual(Blob.objects.get(name=first.submission_file.name).ref_count, 1)
+
+        loaded.submission_file = ContentFile(b"other answer", name="other.txt")
+        loaded.save()
+        self.assertEqual(Blob.objects.get(name=first.submission_file.name).ref_count, 0)
+        self.assertEqual(
+            Blob.objects.get(name=loaded.submission_file.name).ref_count, 1
+        )
+
+    def test_collect_removes_files_of_rolled_back_blobs(self):
+        with transaction.atomic():
+            name = self.submit(b"%PDF rolled back").submission_file.name
+            transaction.set_rollback(True)
+        recent = self.storage.save("recent.pdf", ContentFile(b"%PDF recent"))
+        Blob.objects.filter(name=recent).delete()
+        hour_ago = time.time() - 3600
+        os.utime(self.storage.path(name), (hour_ago, hour_ago))
+
+        call_command("collect_blobs", grace_hours=0.5, stdout=StringIO())
+
+        self.assertFalse(self.storage.exists(name))
+        self.assertTrue(self.storage.exists(recent))
+
+    def test_collect_removes_only_unreferenced_blobs(self):
+        kept = self.submit(b"%PDF kept")
+        dropped = self.submit(student=self.dataset.other_student)
+        dropped.delete()
+
+        call_command("collect_blobs", grace_hours=0, stdout=StringIO())
+
+        self.assertFalse(self.storage.exists(dropped.submission_file.name))
+        self.assertTrue(self.storage.exists(kept.submission_file.name))
+        self.assertEqual(
+            list(Blob.objects.values_list("name", flat=True)),
+            [kept.submission_file.name],
+        )
+
+    def test_recount_and_import_legacy_files(self):
+        legacy_name = "homework_submissions/answer.pdf"
+        legacy_path = Path(self.storage.path(legacy_name))
+        legacy_path.parent.mkdir(parents=True)
+        legacy_path.write_bytes(CONTENT)
+        submission = self.submit(b"%PDF other")
+        HomeworkSubmission.objects.filter(pk=submission.pk).update(
+            submission_file=legacy_name
+        )
+        Blob.objects.update(ref_count=5)
+
+        call_command(
+            "collect_blobs",
+            import_legacy=True,
+            recount=True,
+            grace_hours=0,
+            stdout=StringIO(),
+        )
+
+        submission.refresh_from_db()
+        self.assertTrue(self.storage.is_blob(submission.submission_file.name))
+        self.assertFalse(self.storage.exists(legacy_name))
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+    def test_declared_checksum_does_not_complete_upload(self):
+        self.submit()
+        client = APIClient()
+        client.force_authenticate(self.dataset.other_student)
+
+        response = client.post(
+            reverse("upload-create"),
+            {
+                "filename": "copy.pdf",
+                "content_type": "application/pdf",
+                "size": len(CONTENT),
+                "checksum": hashlib.sha256(CONTENT).hexdigest(),
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertFalse(ChunkedUpload.objects.get(pk=response.data["id"]).file)
+        self.assertEqual(Blob.objects.get().ref_count, 1)
@@ -0,0 +1,103 @@
+"""
+Tests for thumbnails and previews of submission images.
+"""
+
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from ..models import HomeworkSubmission
+from .fixtures import seed_dataset
+
+
+def png(width=800, height=600, color="teal"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name="photo.png")
+
+
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=media_root,
+            IMAGE_THUMBNAIL_SIZE=(50, 40),
+            IMAGE_PREVIEW_SIZE=(300, 300),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def submit(self, image, student=None):
+        return HomeworkSubmission.objects.create(
+            homework=self.dataset.homework,
+            student=student or self.dataset.student,
+            submission_text="Photo of my answer",
+            submission_image=image,
+        )
+
+    def test_derivatives_are_rendered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            submission = self.submit(png())
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.preview_source, submission.submission_image.name)
+        with Image.open(submission.thumbnail.path) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ("WEBP", (50, 40)))
+        with Image.open(submission.preview.path) as preview:
+            self.assertEqual(preview.size, (300, 225))
+
+    def test_urls_are_exposed_once_ready(self):
+        client = APIClient()
+        client.force_authenticate(self.dataset.teacher)
+        url = reverse(
+            "teacher-homework-detail", kwargs={"pk": self.dataset.homework.pk}
+        )
+        submission = self.submit(png())
+        HomeworkSubmission.objects.filter(pk=self.dataset.submission.pk).delete()
+
+        entry = next(
+            item
+            for item in client.get(url).data["student_submissions"]
+            if item["student"]["id"] == self.dataset.student.pk
+        )
+        self.assertIsNone(entry["thumbnail_url"])
+
+        call_command("generate_thumbnails", workers=1, stdout=StringIO())
+
+        entry = next(
+            item
+            for item in client.get(url).data["student_submissions"]
+            if item["student"]["id"] == self.dataset.student.pk
+        )
+        submission.refresh_from_db()
+        self.assertTrue(entry["thumbnail_url"].endswith(submission.thumbnail.url))
+
+    def test_backfill_renders_each_distinct_image_once(self):
+        first = self.submit(png())
+        second = self.submit(png(), student=self.dataset.other_student)
+        other = self.submit(png(color="red"), student=self.dataset.teacher)
+        out = StringIO()
+
+        call_command("generate_thumbnails", workers=2, stdout=out)
+
+        for submission in (first, second, other):
+            submission.refresh_from_db()
+            self.assertEqual(
+                submission.preview_source, submission.submission_image.name
+            )
+        self.assertEqual(first.thumbnail.name, second.thumbnail.name)
+        self.assertNotEqual(first.thumbnail.name, other.thumbnail.name)
+        self.assertIn("Rendered 2 images", out.getvalue())
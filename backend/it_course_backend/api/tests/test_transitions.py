@@ -0,0 +1,114 @@
+"""
+Tests for the automatic course state transitions.
+"""
+
+import zlib
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Course, Lesson
+from ..transitions import LOCK_NAME, advance_course_states, course_state_changed
+from .fixtures import seed_dataset
+
+
+class TransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        cls.now = timezone.now()
+        today = cls.now.date()
+        cls.starting = cls.dataset.course
+        cls.ending = Course.objects.exclude(pk=cls.starting.pk).get()
+
+        Course.objects.filter(pk=cls.starting.pk).update(
+            state="not_started", start_date=today - timedelta(days=1)
+        )
+        Lesson.objects.filter(course=cls.starting).update(
+            scheduled_time=cls.now + timedelta(days=3)
+        )
+        Course.objects.filter(pk=cls.ending.pk).update(
+            state="in_progress", start_date=today - timedelta(days=90)
+        )
+        Lesson.objects.filter(course=cls.ending).update(
+            scheduled_time=cls.now - timedelta(days=30)
+        )
+
+    def states(self):
+        return dict(Course.objects.values_list("pk", "state"))
+
+    def test_states_advance_with_one_update_per_transition(self):
+        with CaptureQueriesContext(connection) as ctx:
+            changed = advance_course_states(self.now)
+
+        self.assertEqual(
+            changed,
+            {"in_progress": [self.starting.pk], "completed": [self.ending.pk]},
+        )
+        self.assertEqual(
+            self.states(),
+            {self.starting.pk: "in_progress", self.ending.pk: "completed"},
+        )
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+
+        self.assertEqual(advance_course_states(self.now), {})
+
+    def test_recent_lessons_keep_course_in_progress(self):
+        Lesson.objects.filter(pk=self.ending.lesson_set.first().pk).update(
+            scheduled_time=self.now - timedelta(days=1)
+        )
+        advance_course_states(self.now)
+        self.assertEqual(self.states()[self.ending.pk], "in_progress")
+
+    def test_inactive_courses_are_left_alone(self):
+        self.starting.deactivate()
+        advance_course_states(self.now)
+        self.assertEqual(self.states()[self.starting.pk], "not_started")
+
+    def test_hooks_run_after_commit(self):
+        receiver = mock.Mock()
+        course_state_changed.connect(receiver)
+        self.addCleanup(course_state_changed.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            advance_course_states(self.now)
+            self.assertFalse(receiver.called)
+
+        self.assertEqual(len(callbacks), 2)
+        calls = {call.kwargs["state"]: call.kwargs for call in receiver.call_args_list}
+        self.assertEqual(calls["completed"]["course_ids"], [self.ending.pk])
+        self.assertEqual(calls["completed"]["previous"], ("in_progress",))
+
+        recipients = {address for message in mail.outbox for address in message.to}
+        self.assertIn(self.dataset.student.email, recipients)
+        self.assertNotIn(self.dataset.teacher.email, recipients)
+
+    def test_concurrent_run_is_skipped(self):
+        other = connections.create_connection("default")
+        self.addCleanup(other.close)
+        with other.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_lock(%s)", [zlib.crc32(LOCK_NAME.encode())]
+            )
+
+        self.assertIsNone(advance_course_states(self.now))
+        self.assertEqual(self.states()[self.starting.pk], "not_started")
+
+        with other.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(%s)", [zlib.crc32(LOCK_NAME.encode())]
+            )
+        self.assertIsNotNone(advance_course_states(self.now))
+
+    def test_command(self):
+        out = StringIO()
+        call_command("advance_course_states", stdout=out)
+        self.assertIn("Advanced 2 courses.", out.getvalue())
@@ -0,0 +1,272 @@
+"""
+Tests for the chunked upload API.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import uploads
+from ..models import ChunkedUpload, HomeworkSubmission
+from .fixtures import seed_dataset
+
+CHUNK_SIZE = 8
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=media_root,
+            UPLOAD_TEMP_DIR=f"{media_root}/tmp",
+            UPLOAD_CHUNK_SIZE=CHUNK_SIZE,
+            UPLOAD_MAX_SIZE=64,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.dataset.student)
+
+    def start(self, content, filename="answer.txt", content_type="text/plain", **extra):
+        response = self.client.post(
+            reverse("upload-create"),
+            {
+                "filename": filename,
+                "content_type": content_type,
+                "size": len(content),
+                **extra,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def send(self, upload, index, data, checksum=None):
+        return self.client.put(
+            reverse("upload-chunk", kwargs={"pk": upload["id"], "index": index}),
+            data,
+            content_type="application/octet-stream",
+            HTTP_X_CHUNK_CHECKSUM=checksum or sha256(data),
+        )
+
+    def complete(self, upload, **data):
+        return self.client.post(
+            reverse("upload-complete", kwargs={"pk": upload["id"]}), data, format="json"
+        )
+
+    def upload(self, content, **kwargs):
+        upload = self.start(content, **kwargs)
+        for index in range(upload["total_chunks"]):
+            chunk = content[index * CHUNK_SIZE : (index + 1) * CHUNK_SIZE]
+            self.assertEqual(self.send(upload, index, chunk).status_code, 200)
+        response = self.complete(upload, checksum=sha256(content))
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_resumable_upload_assembles_chunks_in_order(self):
+        content = b"first-ch" + b"second-c" + b"end"
+        upload = self.start(content)
+        self.assertEqual(upload["total_chunks"], 3)
+
+        self.send(upload, 2, b"end")
+        self.send(upload, 0, b"first-ch")
+        progress = self.client.get(
+            reverse("upload-detail", kwargs={"pk": upload["id"]})
+        )
+        self.assertEqual(progress.data["received_chunks"], [0, 2])
+        self.assertEqual(self.complete(upload).status_code, 400)
+
+        self.send(upload, 1, b"second-c")
+        response = self.complete(upload, checksum=sha256(content))
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["status"], "complete")
+        self.assertEqual(response.data["checksum"], sha256(content))
+        stored = ChunkedUpload.objects.get(pk=upload["id"])
+        with stored.file.open("rb") as handle:
+            self.assertEqual(handle.read(), content)
+
+    def test_rejects_bad_chunks(self):
+        upload = self.start(b"0123456789")
+
+        self.assertEqual(self.send(upload, 0, b"01234567", "0" * 64).status_code, 400)
+        self.assertEqual(self.send(upload, 1, b"89-extra").status_code, 400)
+        self.assertEqual(self.send(upload, 2, b"89").status_code, 400)
+        self.assertEqual(self.send(upload, 0, b"01234567", "short").status_code, 400)
+
+        progress = self.client.get(
+            reverse("upload-detail", kwargs={"pk": upload["id"]})
+        )
+        self.assertEqual(progress.data["received_chunks"], [])
+
+    def test_rejects_invalid_content_length(self):
+        upload = self.start(b"abc")
+
+        response = self.client.put(
+            reverse("upload-chunk", kwargs={"pk": upload["id"], "index": 0}),
+            b"abc",
+            content_type="application/octet-stream",
+            CONTENT_LENGTH="3 bytes",
+            HTTP_X_CHUNK_CHECKSUM=sha256(b"abc"),
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Content-Length", response.data["chunk"])
+
+    def test_complete_claims_upload_while_assembling(self):
+        upload = self.start(b"abc")
+        self.send(upload, 0, b"abc")
+        statuses = []
+
+        def assemble(instance, checksum):
+            statuses.append(ChunkedUpload.objects.get(pk=instance.pk).status)
+            # A second request finds the upload taken.
+            self.assertEqual(self.complete(upload).status_code, 400)
+            self.assertEqual(self.send(upload, 0, b"abc").status_code, 400)
+            raise OSError("disk full")
+
+        with mock.patch.object(uploads, "assemble", side_effect=assemble):
+            with self.assertRaises(OSError):
+                self.complete(upload)
+
+        self.assertEqual(statuses, ["assembling"])
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload["id"]).status, "pending")
+        self.assertEqual(self.complete(upload).status_code, 200)
+
+    def test_abandoned_claim_can_be_taken_over(self):
+        upload = self.start(b"abc")
+        self.send(upload, 0, b"abc")
+        url = reverse("upload-detail", kwargs={"pk": upload["id"]})
+        rows = ChunkedUpload.objects.filter(pk=upload["id"])
+
+        rows.update(status="assembling", claimed_at=timezone.now())
+        self.assertEqual(self.complete(upload).status_code, 400)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+
+        rows.update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.complete(upload).status_code, 200)
+        self.assertEqual(rows.get().status, "complete")
+
+    def test_abandoned_claim_can_be_deleted(self):
+        upload = self.start(b"abc")
+        self.send(upload, 0, b"abc")
+        ChunkedUpload.objects.filter(pk=upload["id"]).update(
+            status="assembling", claimed_at=timezone.now() - timedelta(hours=1)
+        )
+
+        url = reverse("upload-detail", kwargs={"pk": upload["id"]})
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(uploads.received_chunks(ChunkedUpload(pk=upload["id"])), [])
+
+    def test_expire_uploads(self):
+        old = self.start(b"abc")
+        self.send(old, 0, b"abc")
+        recent = self.start(b"abc")
+        self.send(recent, 0, b"abc")
+        busy = self.start(b"abc")
+        day_ago = timezone.now() - timedelta(hours=25)
+        ChunkedUpload.objects.filter(pk=old["id"]).update(created_at=day_ago)
+        ChunkedUpload.objects.filter(pk=busy["id"]).update(
+            created_at=day_ago, status="assembling", claimed_at=timezone.now()
+        )
+        stray = Path(settings.UPLOAD_TEMP_DIR) / str(uuid.uuid4())
+        stray.mkdir()
+        fresh_stray = Path(settings.UPLOAD_TEMP_DIR) / "unknown"
+        fresh_stray.mkdir()
+        os.utime(stray, (day_ago.timestamp(), day_ago.timestamp()))
+
+        out = StringIO()
+        call_command("expire_uploads", stdout=out)
+
+        self.assertIn("Removed 1 expired uploads and 1 part", out.getvalue())
+        self.assertEqual(
+            set(ChunkedUpload.objects.values_list("pk", flat=True)),
+            {uuid.UUID(recent["id"]), uuid.UUID(busy["id"])},
+        )
+        self.assertEqual(uploads.received_chunks(ChunkedUpload(pk=old["id"])), [])
+        self.assertEqual(uploads.received_chunks(ChunkedUpload(pk=recent["id"])), [0])
+        self.assertFalse(stray.exists())
+        self.assertTrue(fresh_stray.exists())
+
+    def test_rejects_whole_file_checksum_mismatch(self):
+        upload = self.start(b"abc")
+        self.send(upload, 0, b"abc")
+        self.assertEqual(self.complete(upload, checksum="0" * 64).status_code, 400)
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload["id"]).status, "pending")
+
+    def test_enforces_size_and_type_limits(self):
+        for data in (
+            {"filename": "big.txt", "content_type": "text/plain", "size": 65},
+            {"filename": "empty.txt", "content_type": "text/plain", "size": 0},
+            {
+                "filename": "run.exe",
+                "content_type": "application/x-msdownload",
+                "size": 3,
+            },
+            {"filename": "answer.exe", "content_type": "text/plain", "size": 3},
+            {
+                "filename": "a.txt",
+                "content_type": "text/plain",
+                "size": 3,
+                "kind": "image",
+            },
+        ):
+            response = self.client.post(reverse("upload-create"), data, format="json")
+            self.assertEqual(response.status_code, 400, data)
+
+    def test_rejects_content_that_does_not_match_type(self):
+        upload = self.start(b"not a png", filename="a.png", content_type="image/png")
+        self.send(upload, 0, b"not a pn")
+        self.send(upload, 1, b"g")
+        self.assertEqual(self.complete(upload).status_code, 400)
+
+    def test_uploads_are_private(self):
+        upload = self.start(b"abc")
+        self.client.force_authenticate(self.dataset.other_student)
+        url = reverse("upload-detail", kwargs={"pk": upload["id"]})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.send(upload, 0, b"abc").status_code, 404)
+
+    def test_submission_attaches_upload_by_reference(self):
+        content = b"%PDF-1.4 answer"
+        upload = self.upload(
+            content, filename="answer.pdf", content_type="application/pdf"
+        )
+        stored_name = ChunkedUpload.objects.get(pk=upload["id"]).file.name
+        data = {
+            "homework": self.dataset.homework.pk,
+            "submission_text": "See attachment",
+            "file_upload": upload["id"],
+        }
+        url = reverse("homework-submit", kwargs={"pk": self.dataset.homework.pk})
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        submission = HomeworkSubmission.objects.get(pk=response.data["id"])
+        self.assertEqual(submission.submission_file.name, stored_name)
+        self.assertEqual(ChunkedUpload.objects.get(pk=upload["id"]).status, "attached")
+        self.assertEqual(self.client.post(url, data, format="json").status_code, 400)
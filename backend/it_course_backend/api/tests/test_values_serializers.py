@@ -0,0 +1,162 @@
+"""
+Tests for the values()-based read serializers.
+
+The speed comparison with the DRF serializers depends on the machine and its
+load, so it only runs with ``BENCHMARK_TIMING=1``::
+
+    BENCHMARK_TIMING=1 python manage.py test api --tag=benchmark
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings, tag
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from ..models import Homework, Lesson
+from ..renderers import ORJSONRenderer
+from ..serializers import (
+    HomeworkSerializer,
+    HomeworkValuesSerializer,
+    LessonCalendarSerializer,
+    LessonCalendarValuesSerializer,
+    LessonSerializer,
+    LessonValuesSerializer,
+)
+from .fixtures import seed_dataset
+
+TIMING = os.environ.get("BENCHMARK_TIMING") == "1"
+
+PAIRS = [
+    (LessonCalendarSerializer, LessonCalendarValuesSerializer, Lesson),
+    (LessonSerializer, LessonValuesSerializer, Lesson),
+    (HomeworkSerializer, HomeworkValuesSerializer, Homework),
+]
+
+
+def context_for(user):
+    request = APIRequestFactory().get("/api/")
+    request.user = user
+    return {"request": request}
+
+
+class EquivalenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        ds = cls.dataset
+        Lesson.objects.filter(pk=ds.lesson.pk).update(
+            video_url="https://example.com/video", content=None
+        )
+        Homework.objects.create(
+            title="Без уроку",
+            description="Homework without a lesson",
+            due_date=timezone.now() + timedelta(days=3, microseconds=1234),
+            course=ds.course,
+            submitted_by=ds.teacher,
+            grade=10,
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_output_is_identical(self):
+        self.dataset.homework.submission_file.save("task.txt", ContentFile(b"task"))
+        for user in (self.dataset.teacher, self.dataset.student):
+            context = context_for(user)
+            for serializer_class, values_class, model in PAIRS:
+                with self.subTest(serializer=values_class.__name__, user=user.email):
+                    queryset = model.objects.order_by("pk")
+                    expected = serializer_class(
+                        queryset, many=True, context=context
+                    ).data
+                    data = values_class(queryset, context=context).data
+                    self.assertEqual(data, expected)
+                    self.assertEqual(
+                        ORJSONRenderer().render(data), ORJSONRenderer().render(expected)
+                    )
+
+    def test_student_course_ids_from_context(self):
+        context = {**context_for(self.dataset.student), "student_course_ids": set()}
+        with self.assertNumQueries(1):
+            data = LessonValuesSerializer(Lesson.objects.all(), context=context).data
+        self.assertEqual({row["user_role"] for row in data}, {None})
+
+
+@tag("benchmark")
+@skipUnless(TIMING, "Set BENCHMARK_TIMING=1 to compare wall-clock times.")
+class ValuesSerializerBenchmarkTests(TestCase):
+    """The values() path must render 10k-row lists at least 5x faster."""
+
+    rows = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset("small")
+        ds = cls.dataset
+        now = timezone.now()
+        lessons = Lesson.objects.bulk_create(
+            Lesson(
+                title=f"Lesson {index}",
+                course=ds.course,
+                scheduled_time=now + timedelta(hours=index),
+                content="Lesson content " * 10,
+                meeting_link="https://meet.example.com/lesson",
+            )
+            for index in range(cls.rows)
+        )
+        Homework.objects.bulk_create(
+            Homework(
+                title=f"Homework {index}",
+                description="Homework description " * 10,
+                due_date=now + timedelta(hours=index),
+                course=ds.course,
+                lesson=lesson,
+                submitted_by=ds.teacher,
+            )
+            for index, lesson in enumerate(lessons)
+        )
+        # Like autovacuum after a bulk load, so the joins get real plans.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE api_lesson, api_homework")
+
+    def best_ms(self, render):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            data = render()
+            timings.append((time.perf_counter() - start) * 1000)
+        self.assertGreaterEqual(len(data), self.rows)
+        return min(timings)
+
+    def test_values_path_is_five_times_faster(self):
+        context = context_for(self.dataset.teacher)
+        for serializer_class, values_class, model in PAIRS:
+            queryset = model.objects.select_related(
+                "course" if model is Lesson else "lesson"
+            )
+            with self.subTest(serializer=values_class.__name__):
+                drf_ms = self.best_ms(
+                    lambda: serializer_class(
+                        queryset.all(), many=True, context=context
+                    ).data
+                )
+                values_ms = self.best_ms(
+                    lambda: values_class(queryset.all(), context=context).data
+                )
+                self.assertLess(
+                    values_ms * 5,
+                    drf_ms,
+                    f"{values_class.__name__}: {values_ms:.1f} ms vs {drf_ms:.1f} ms",
+                )
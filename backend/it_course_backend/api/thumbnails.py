@@ -0,0 +1,180 @@
+"""
+Thumbnails and previews of submitted images.
+
+When a submission with an image is saved, ``schedule()`` queues it on a
+thread pool once the transaction commits. A worker renders a fixed-size
+thumbnail and a web-sized preview and stores both in the submission
+storage. Because that storage is content-addressed, and rendering is
+deterministic, identical images share their derivatives as well.
+
+``render_derivatives()`` only needs a file path, so the
+``generate_thumbnails`` command can run it in a process pool for backfills.
+"""
+
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger("api")
+
+_executor = None
+
+
+def render_derivatives(path, thumbnail_size, preview_size, quality):
+    """
+    Render the thumbnail and preview of an image.
+
+    Args:
+        path (str): Path of the source image.
+        thumbnail_size (tuple[int, int]): Exact size of the cropped thumbnail.
+        preview_size (tuple[int, int]): Bounding box of the preview.
+        quality (int): WebP quality of both images.
+
+    Returns:
+        dict: ``thumbnail`` and ``preview`` WebP bytes.
+    """
+    with Image.open(path) as image:
+        # Let JPEG decoding downscale right away instead of decoding every
+        # pixel of a large photo.
+        image.draft("RGB", preview_size)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        preview = image.copy()
+        preview.thumbnail(preview_size, Image.Resampling.LANCZOS)
+        thumbnail = ImageOps.fit(preview, thumbnail_size, Image.Resampling.LANCZOS)
+
+    rendered = {}
+    for key, derivative in (("thumbnail", thumbnail), ("preview", preview)):
+        buffer = io.BytesIO()
+        derivative.save(buffer, "WEBP", quality=quality, method=4)
+        rendered[key] = buffer.getvalue()
+    return rendered
+
+
+def render_options():
+    """Return the keyword arguments for ``render_derivatives`` from settings."""
+    return {
+        "thumbnail_size": tuple(settings.IMAGE_THUMBNAIL_SIZE),
+        "preview_size": tuple(settings.IMAGE_PREVIEW_SIZE),
+        "quality": settings.IMAGE_DERIVATIVE_QUALITY,
+    }
+
+
+def needs_derivatives(submission):
+    """Return True if the submission's image has no up-to-date derivatives."""
+    image = submission.submission_image.name
+    return bool(image) and submission.preview_source != image
+
+
+def derivative_url(submission, field_name, request=None):
+    """
+    Return the URL of a derivative once it matches the current image.
+
+    Args:
+        submission (HomeworkSubmission): The submission.
+        field_name (str): ``thumbnail`` or ``preview``.
+        request: Used to build an absolute URL, if given.
+
+    Returns:
+        str | None: The URL, or None while the derivative is not ready.
+    """
+    if not submission.submission_image or needs_derivatives(submission):
+        return None
+    url = getattr(submission, field_name).url
+    return request.build_absolute_uri(url) if request else url
+
+
+def store_derivatives(submission, rendered):
+    """
+    Save rendered derivatives on a submission.
+
+    Args:
+        submission (HomeworkSubmission): The submission the image belongs to.
+        rendered (dict): The result of ``render_derivatives``.
+    """
+    source = submission.submission_image.name
+    stem = source.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    submission.thumbnail.save(
+        f"{stem}-thumbnail.webp", ContentFile(rendered["thumbnail"]), save=False
+    )
+    submission.preview.save(
+        f"{stem}-preview.webp", ContentFile(rendered["preview"]), save=False
+    )
+    submission.preview_source = source
+    submission.save(update_fields=["thumbnail", "preview", "preview_source"])
+
+
+def process_submission(pk):
+    """
+    Render and store the derivatives of one submission, if still needed.
+
+    The submission is locked while its derivatives are stored, so a newer
+    image saved in the meantime is not overwritten with stale previews.
+    """
+    from .models import HomeworkSubmission
+
+    submission = HomeworkSubmission.objects.filter(pk=pk).first()
+    if submission is None or not needs_derivatives(submission):
+        return
+    source = submission.submission_image.name
+    rendered = render_derivatives(submission.submission_image.path, **render_options())
+
+    with transaction.atomic():
+        submission = (
+            HomeworkSubmission.objects.select_for_update().filter(pk=pk).first()
+        )
+        if submission and submission.submission_image.name == source:
+            store_derivatives(submission, rendered)
+
+
+def _run(pk):
+    try:
+        process_submission(pk)
+    except Exception:
+        logger.exception("Could not render previews of submission %s", pk)
+
+
+def _run_in_worker(pk):
+    try:
+        _run(pk)
+    finally:
+        # Worker threads open their own connections; do not leak them.
+        connections.close_all()
+
+
+def get_executor():
+    """Return the shared thread pool, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+        )
+    return _executor
+
+
+def schedule(pk):
+    """
+    Render the derivatives of a submission after the current transaction.
+
+    With ``THUMBNAIL_ASYNC`` disabled the work runs in the calling thread,
+    which keeps tests deterministic.
+    """
+    if settings.THUMBNAIL_ASYNC:
+        transaction.on_commit(lambda: get_executor().submit(_run_in_worker, pk))
+    else:
+        transaction.on_commit(lambda: _run(pk))
+
+
+def schedule_on_save(sender, instance, update_fields=None, **kwargs):
+    """``post_save`` receiver that schedules submissions with new images."""
+    if update_fields and "submission_image" not in update_fields:
+        return
+    if needs_derivatives(instance):
+        schedule(instance.pk)
@@ -0,0 +1,138 @@
+"""
+Automatic course state transitions.
+
+``advance_course_states()`` moves courses along
+``not_started -> in_progress -> completed`` from their start date and lesson
+schedule. Every transition is one ``SELECT ... FOR UPDATE`` of the matching
+course IDs and one ``UPDATE`` of their state, whatever the number of
+courses.
+
+A transaction-level advisory lock lets only one worker advance states at a
+time; other workers return at once instead of waiting. After the
+transaction commits, ``course_state_changed`` is sent once per transition
+with the IDs of the courses that changed, so receivers such as reminders
+and archival work on sets of courses too.
+"""
+
+import logging
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Course, GroupMembership, Lesson
+from .utils import send_course_started_emails
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "api.advance_course_states"
+
+# Sent with ``course_ids``, ``previous`` (the states the courses had) and
+# ``state`` (the state they have now).
+course_state_changed = Signal()
+
+
+def try_advisory_lock(name, using=DEFAULT_DB_ALIAS):
+    """
+    Take a PostgreSQL advisory lock held until the current transaction ends.
+
+    Must be called inside ``transaction.atomic()``.
+
+    Returns:
+        bool: False if another session holds the lock.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_xact_lock(%s)", [zlib.crc32(name.encode())]
+        )
+        return cursor.fetchone()[0]
+
+
+def transitions(now):
+    """
+    Return the transitions as ``(previous states, state, condition)``, in the
+    order they are applied.
+
+    A course starts on its start date or when its first lesson begins, and
+    is completed once its last lesson is older than
+    ``COURSE_COMPLETE_AFTER_DAYS``. Courses without lessons are never
+    completed automatically.
+    """
+    lessons = Lesson.active.filter(course=OuterRef("pk"))
+    cutoff = now - timedelta(days=settings.COURSE_COMPLETE_AFTER_DAYS)
+    return [
+        (
+            ("not_started",),
+            "in_progress",
+            Q(start_date__lte=now.date())
+            | Exists(lessons.filter(scheduled_time__lte=now)),
+        ),
+        (
+            ("in_progress",),
+            "completed",
+            Q(Exists(lessons), start_date__lte=now.date())
+            & ~Exists(lessons.filter(scheduled_time__gt=cutoff)),
+        ),
+    ]
+
+
+def advance_course_states(now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Advance the states of all active courses that are due.
+
+    Args:
+        now (datetime): The time to advance to; defaults to the current time.
+
+    Returns:
+        dict | None: IDs of the changed courses per new state, or None if
+        another worker holds the lock.
+    """
+    now = now or timezone.now()
+    changed = {}
+    with transaction.atomic(using=using):
+        if not try_advisory_lock(LOCK_NAME, using=using):
+            logger.info("Course states are being advanced by another worker.")
+            return None
+
+        for previous, state, condition in transitions(now):
+            due = Course.active.using(using).filter(condition, state__in=previous)
+            course_ids = list(
+                due.select_for_update().order_by("pk").values_list("pk", flat=True)
+            )
+            if not course_ids:
+                continue
+            Course.objects.using(using).filter(pk__in=course_ids).update(state=state)
+            changed[state] = course_ids
+            transaction.on_commit(
+                lambda course_ids=course_ids, previous=previous, state=state: (
+                    course_state_changed.send(
+                        sender=Course,
+                        course_ids=course_ids,
+                        previous=previous,
+                        state=state,
+                    )
+                ),
+                using=using,
+            )
+
+    for state, course_ids in changed.items():
+        logger.info("%s courses moved to %s", len(course_ids), state)
+    return changed
+
+
+def remind_started_courses(sender, course_ids, state, **kwargs):
+    """``course_state_changed`` receiver that e-mails students of started courses."""
+    if state != "in_progress":
+        return
+    recipients = (
+        GroupMembership.active.filter(
+            group__courses__in=course_ids, role="student", user__is_active=True
+        )
+        .values_list("group__courses__title", "user__email")
+        .distinct()
+    )
+    send_course_started_emails(recipients)
@@ -0,0 +1,334 @@
+"""
+Storage of chunked uploads.
+
+Chunks of a pending ``ChunkedUpload`` are written as numbered part files in
+``UPLOAD_TEMP_DIR/<upload id>/``. Each part is written to a temporary name
+and renamed once its size and SHA-256 checksum are verified, so the set of
+part files on disk is always the set of received chunks and parallel chunk
+requests need no locking. Completing an upload claims it by moving it from
+``pending`` to ``assembling``, then streams the parts, in order, into the
+storage backend without reading the whole file into memory and without
+holding a row lock or a transaction open while it does. A claim older
+than ``UPLOAD_CLAIM_TIMEOUT`` is taken to belong to a crashed worker and
+can be claimed again. Identical files are stored once by the
+content-addressed storage, which deduplicates on the digest of the bytes
+it received, never on a checksum the client declares.
+
+Uploads that are not attached within ``UPLOAD_EXPIRY_HOURS`` are removed
+with their parts by ``manage.py expire_uploads``.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+READ_BLOCK_SIZE = 64 * 1024
+
+# Leading bytes of the binary formats accepted by default. Types without an
+# entry (e.g. text/plain) are accepted based on their extension alone.
+SIGNATURES = {
+    "application/pdf": (b"%PDF-",),
+    "application/zip": (b"PK\x03\x04", b"PK\x05\x06"),
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": (
+        b"PK\x03\x04",
+    ),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+    "image/webp": (b"RIFF",),
+}
+
+
+class UploadError(ValueError):
+    """Raised when a chunk or an assembled upload fails validation."""
+
+
+def upload_dir(upload):
+    """Return the directory holding the part files of an upload."""
+    return Path(settings.UPLOAD_TEMP_DIR) / str(upload.pk)
+
+
+def part_path(upload, index):
+    """Return the path of the part file of the chunk at ``index``."""
+    return upload_dir(upload) / f"{index:06d}.part"
+
+
+def received_chunks(upload):
+    """
+    Return the indexes of the chunks stored for an upload.
+
+    Returns:
+        list[int]: Sorted indexes; empty when no chunk has been received.
+    """
+    try:
+        names = os.listdir(upload_dir(upload))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith(".part"))
+
+
+def write_chunk(upload, index, stream, checksum):
+    """
+    Store one chunk of an upload.
+
+    Args:
+        upload (ChunkedUpload): A pending upload.
+        index (int): Zero-based index of the chunk.
+        stream: File-like object with the raw chunk bytes.
+        checksum (str): Expected SHA-256 hex digest of the chunk.
+
+    Raises:
+        UploadError: If the index is out of range, or the size or checksum of
+            the received bytes does not match.
+    """
+    if not 0 <= index < upload.total_chunks:
+        raise UploadError(
+            f"Chunk index must be between 0 and {upload.total_chunks - 1}."
+        )
+    expected = upload.chunk_length(index)
+
+    directory = upload_dir(upload)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = part_path(upload, index)
+    temp = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(temp, "wb") as part:
+            # Read one byte past the expected size to detect oversized chunks.
+            while written <= expected:
+                block = stream.read(min(READ_BLOCK_SIZE, expected + 1 - written))
+                if not block:
+                    break
+                written += len(block)
+                digest.update(block)
+                part.write(block)
+        if written != expected:
+            raise UploadError(f"Chunk {index} must be {expected} bytes.")
+        if digest.hexdigest() != checksum.lower():
+            raise UploadError(f"Checksum mismatch for chunk {index}.")
+        os.replace(temp, target)
+    finally:
+        if temp.exists():
+            temp.unlink()
+
+
+def discard_parts(upload):
+    """Remove the part files of an upload."""
+    shutil.rmtree(upload_dir(upload), ignore_errors=True)
+
+
+class PartsReader(io.RawIOBase):
+    """
+    Read the part files of an upload as one stream and hash what is read.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.current = None
+        self.digest = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.paths:
+                    return 0
+                self.current = open(self.paths.pop(0), "rb")
+            count = self.current.readinto(buffer)
+            if count:
+                self.digest.update(memoryview(buffer)[:count])
+                return count
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+def check_signature(content_type, head):
+    """
+    Check the leading bytes of a file against its declared content type.
+
+    Args:
+        content_type (str): The declared content type.
+        head (bytes): At least the first 16 bytes of the file.
+
+    Raises:
+        UploadError: If the content does not look like the declared type.
+    """
+    signatures = SIGNATURES.get(content_type)
+    if not signatures:
+        return
+    if not head.startswith(signatures) or (
+        content_type == "image/webp" and head[8:12] != b"WEBP"
+    ):
+        raise UploadError(f"File content does not match {content_type}.")
+
+
+def claim_cutoff():
+    """Return the time before which claims are taken to be abandoned."""
+    return timezone.now() - timedelta(seconds=settings.UPLOAD_CLAIM_TIMEOUT)
+
+
+def is_assembling(upload):
+    """Return True if a request is assembling the upload right now."""
+    return (
+        upload.status == "assembling"
+        and upload.claimed_at is not None
+        and upload.claimed_at >= claim_cutoff()
+    )
+
+
+def claim(upload):
+    """
+    Move a pending upload, or one with an abandoned claim, to ``assembling``.
+
+    The status changes with one conditional UPDATE, so of two requests that
+    complete the same upload only one claims it, and no lock is held while
+    the file is assembled.
+
+    Returns:
+        bool: True if this call claimed the upload.
+    """
+    from .models import ChunkedUpload
+
+    now = timezone.now()
+    claimed = (
+        ChunkedUpload.objects.filter(pk=upload.pk)
+        .filter(
+            Q(status="pending")
+            | Q(status="assembling", claimed_at__lt=claim_cutoff())
+            | Q(status="assembling", claimed_at__isnull=True)
+        )
+        .update(status="assembling", claimed_at=now)
+    )
+    if claimed:
+        upload.status = "assembling"
+        upload.claimed_at = now
+    return bool(claimed)
+
+
+def release(upload):
+    """Return an upload whose assembly failed to ``pending``."""
+    from .models import ChunkedUpload
+
+    ChunkedUpload.objects.filter(pk=upload.pk, status="assembling").update(
+        status="pending", claimed_at=None
+    )
+    upload.status = "pending"
+    upload.claimed_at = None
+
+
+def assemble(upload, checksum=""):
+    """
+    Stream the chunks of an upload into the storage backend.
+
+    On success the upload is marked complete and its part files are removed.
+
+    Args:
+        upload (ChunkedUpload): An upload claimed with ``claim()``, with every
+            chunk received.
+        checksum (str): Optional SHA-256 hex digest of the whole file.
+
+    Raises:
+        UploadError: If chunks are missing, the content does not match the
+            declared type or the checksum of the whole file does not match.
+    """
+    missing = set(range(upload.total_chunks)) - set(received_chunks(upload))
+    if missing:
+        raise UploadError(f"Missing chunks: {sorted(missing)}.")
+    with open(part_path(upload, 0), "rb") as part:
+        check_signature(upload.content_type, part.read(16))
+
+    reader = PartsReader(part_path(upload, i) for i in range(upload.total_chunks))
+    content = File(io.BufferedReader(reader, READ_BLOCK_SIZE), name=upload.filename)
+    content.size = upload.size
+    try:
+        upload.file.save(upload.filename, content, save=False)
+    finally:
+        content.close()
+
+    digest = reader.digest.hexdigest()
+    if checksum and digest != checksum.lower():
+        upload.file.delete(save=False)
+        raise UploadError("Checksum mismatch for the assembled file.")
+
+    upload.checksum = digest
+    upload.status = "complete"
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=["file", "checksum", "status", "completed_at"])
+    discard_parts(upload)
+
+
+def discard(upload):
+    """Remove an upload with its part files and its stored file."""
+    discard_parts(upload)
+    if upload.file:
+        upload.file.delete(save=False)
+    upload.delete()
+
+
+def expired_uploads(older_than):
+    """
+    Return the uploads started more than ``older_than`` ago that were never
+    attached and are not being assembled.
+    """
+    from .models import ChunkedUpload
+
+    return (
+        ChunkedUpload.objects.exclude(status="attached")
+        .exclude(status="assembling", claimed_at__gte=claim_cutoff())
+        .filter(created_at__lt=timezone.now() - older_than)
+    )
+
+
+def stray_part_dirs(older_than):
+    """
+    Yield the part directories in ``UPLOAD_TEMP_DIR`` that belong to no
+    upload and were last changed more than ``older_than`` ago.
+    """
+    from .models import ChunkedUpload
+
+    root = Path(settings.UPLOAD_TEMP_DIR)
+    try:
+        directories = [path for path in root.iterdir() if path.is_dir()]
+    except FileNotFoundError:
+        return
+    cutoff = (timezone.now() - older_than).timestamp()
+    known = set()
+    for start in range(0, len(directories), 1000):
+        names = [path.name for path in directories[start : start + 1000]]
+        ids = [name for name in names if _is_uuid(name)]
+        known.update(
+            str(pk)
+            for pk in ChunkedUpload.objects.filter(pk__in=ids).values_list(
+                "pk", flat=True
+            )
+        )
+    for path in directories:
+        if path.name not in known and path.stat().st_mtime < cutoff:
+            yield path
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
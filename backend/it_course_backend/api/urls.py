@@ -6,34 +6,48 @@ This module contains URL patterns for API endpoints.
 
 from django.urls import path
 from .views import (
+    ArchivedGradebookView,
     ChangeEmailView,
     ChangePasswordView,
     ConfirmEmailView,
     CourseEditView,
     GroupCreateView,
     GroupEditView,
+    GroupStudentAutocompleteView,
     HomePageView,
     HomeworkListCreateView,
     HomeworkSubmissionView,
     HomeworkDetailView,
     HomeworkEditView,
     HomeworkGradeView,
+    HomeworkSubmissionsArchiveView,
     LessonCalendarView,
+    CalendarFeedLinkView,
+    CalendarFeedView,
+    FreeSlotsView,
     LessonCreateView,
     LoginView,
     LogoutView,
     RegisterView,
+    SubmissionDownloadView,
     PasswordResetConfirmView,
     ReminderView,
+    SearchView,
     CourseListCreateView,
     GoogleLoginView,
     CourseDetailView,
     LessonEditView,
     LessonListView,
+    LessonSeriesCreateView,
+    LessonSeriesEditView,
     CustomTokenObtainPairView,
     CustomTokenRefreshView,
     ChangeRoleView,
     TeacherHomeworkDetailView,
+    UploadChunkView,
+    UploadCompleteView,
+    UploadCreateView,
+    UploadDetailView,
 )
 
 APP_NAME = "api"
@@ -67,6 +81,11 @@ urlpatterns = [
         name="change-role",
     ),
     path("groups/<int:pk>/edit/", GroupEditView.as_view(), name="group-edit"),
+    path(
+        "groups/<int:group_id>/students/autocomplete/",
+        GroupStudentAutocompleteView.as_view(),
+        name="group-student-autocomplete",
+    ),
     path("course/", CourseListCreateView.as_view(), name="course_list"),
     path("course/<int:pk>/", CourseDetailView.as_view(), name="course_detail"),
     path("courses/create/", CourseListCreateView.as_view(), name="course_create"),
@@ -74,7 +93,34 @@ urlpatterns = [
     path("lessons/", LessonListView.as_view(), name="lesson-list"),
     path("lessons/create/", LessonCreateView.as_view(), name="lesson-create"),
     path("lessons/edit/<int:pk>/", LessonEditView.as_view(), name="lesson-edit"),
+    path(
+        "lessons/series/",
+        LessonSeriesCreateView.as_view(),
+        name="lesson-series-create",
+    ),
+    path(
+        "lessons/series/<int:pk>/",
+        LessonSeriesEditView.as_view(),
+        name="lesson-series-edit",
+    ),
     path("calendar/", LessonCalendarView.as_view(), name="lesson_calendar"),
+    path(
+        "calendar/feed/",
+        CalendarFeedLinkView.as_view(),
+        name="lesson_calendar_feed_link",
+    ),
+    path(
+        "calendar/feed/<str:token>.ics",
+        CalendarFeedView.as_view(),
+        name="lesson_calendar_feed",
+    ),
+    path("schedule/free-slots/", FreeSlotsView.as_view(), name="schedule-free-slots"),
+    path("search/", SearchView.as_view(), name="search"),
+    path(
+        "archive/courses/<int:pk>/gradebook/",
+        ArchivedGradebookView.as_view(),
+        name="archived-gradebook",
+    ),
     path("homework/", HomeworkListCreateView.as_view(), name="homework-list-create"),
     path("homework/<int:pk>/", HomeworkDetailView.as_view(), name="homework-detail"),
     path("homework/<int:pk>/edit/", HomeworkEditView.as_view(), name="homework-edit"),
@@ -91,4 +137,26 @@ urlpatterns = [
         TeacherHomeworkDetailView.as_view(),
         name="teacher-homework-detail",
     ),
+    path(
+        "homework/<int:pk>/submissions.zip",
+        HomeworkSubmissionsArchiveView.as_view(),
+        name="homework-submissions-archive",
+    ),
+    path(
+        "submissions/<int:pk>/download/<str:kind>/",
+        SubmissionDownloadView.as_view(),
+        name="submission-download",
+    ),
+    path("uploads/", UploadCreateView.as_view(), name="upload-create"),
+    path("uploads/<uuid:pk>/", UploadDetailView.as_view(), name="upload-detail"),
+    path(
+        "uploads/<uuid:pk>/chunks/<int:index>/",
+        UploadChunkView.as_view(),
+        name="upload-chunk",
+    ),
+    path(
+        "uploads/<uuid:pk>/complete/",
+        UploadCompleteView.as_view(),
+        name="upload-complete",
+    ),
 ]
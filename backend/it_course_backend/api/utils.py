@@ -1,5 +1,5 @@
 import logging
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
@@ -35,3 +35,23 @@ def send_email_confirmation(user, new_email):
     email_from = "no-reply@example.com"
 
     send_mail(subject, message, email_from, [new_email], fail_silently=False)
+
+
+def send_course_started_emails(recipients):
+    """
+    Tell students that their courses have started, over one mail connection.
+
+    Args:
+        recipients: Iterable of ``(course title, email)`` pairs.
+    """
+    messages = [
+        (
+            f"{title} has started",
+            f"Your course {title} has started. Check your schedule for the next lesson.",
+            "no-reply@example.com",
+            [email],
+        )
+        for title, email in recipients
+    ]
+    sent = send_mass_mail(messages, fail_silently=True)
+    logger.info("Course start reminders sent: %s", sent)
@@ -12,9 +12,14 @@ from .learns import (
     HomeworkListCreateView,
     HomeworkEditView,
     LessonCalendarView,
+    CalendarFeedLinkView,
+    CalendarFeedView,
+    FreeSlotsView,
     ReminderView,
     LessonListView,
     LessonEditView,
+    LessonSeriesCreateView,
+    LessonSeriesEditView,
     ChangeRoleView,
     HomeworkGradeView,
     TeacherHomeworkDetailView,
@@ -33,3 +38,19 @@ from .user import (
     CustomTokenRefreshView,
     CustomTokenObtainPairView,
 )
+
+from .uploads import (
+    UploadCreateView,
+    UploadDetailView,
+    UploadChunkView,
+    UploadCompleteView,
+)
+
+from .downloads import (
+    SubmissionDownloadView,
+    HomeworkSubmissionsArchiveView,
+)
+
+from .search import GroupStudentAutocompleteView, SearchView
+
+from .archive import ArchivedGradebookView
@@ -0,0 +1,33 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..archive import gradebook, staff_ids
+from ..models import ArchivedCourse
+
+
+class ArchivedGradebookView(APIView):
+    """
+    Read-only view of the gradebook of an archived course.
+
+    The teacher and the group staff of the course see every student; a
+    student only sees their own grades.
+
+    Methods:
+        GET: Retrieve the homework and grades of the archived course.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        archived = get_object_or_404(ArchivedCourse, pk=pk)
+        data = gradebook(archived)
+        if request.user.id not in staff_ids(archived):
+            data["students"] = [
+                row for row in data["students"] if row["id"] == request.user.id
+            ]
+            if not data["students"]:
+                raise PermissionDenied("You were not a member of this course.")
+        return Response(data)
@@ -0,0 +1,131 @@
+import logging
+import mimetypes
+import os
+
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from ..downloads import file_response, stream_zip
+from ..models import GroupMembership, Homework, HomeworkSubmission
+
+logger = logging.getLogger("api")
+
+SUBMISSION_FILE_FIELDS = {
+    "file": "submission_file",
+    "image": "submission_image",
+    "thumbnail": "thumbnail",
+    "preview": "preview",
+}
+
+
+def is_course_staff(user, course):
+    """Return True if the user teaches the course or assists in one of its groups."""
+    if course.teacher_id == user.id:
+        return True
+    return GroupMembership.active.filter(
+        user=user, group__course=course, role__in=("teacher", "assistant")
+    ).exists()
+
+
+class SubmissionDownloadView(APIView):
+    """
+    View for downloading a file of a homework submission.
+
+    Only the student who submitted it and the staff of the course may
+    download it. `kind` is one of `file`, `image`, `thumbnail` or `preview`.
+
+    Methods:
+        GET: Send the file. Supports `Range` and `If-None-Match` requests.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, kind):
+        field_name = SUBMISSION_FILE_FIELDS.get(kind)
+        if field_name is None:
+            raise Http404
+        submission = get_object_or_404(
+            HomeworkSubmission.active.select_related("homework__course"), pk=pk
+        )
+        user = request.user
+        if submission.student_id != user.id and not is_course_staff(
+            user, submission.homework.course
+        ):
+            raise PermissionDenied("You do not have access to this submission.")
+
+        field_file = getattr(submission, field_name)
+        if not field_file:
+            raise Http404
+
+        extension = os.path.splitext(field_file.name)[1]
+        filename = f"submission-{submission.pk}-{kind}{extension}"
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        return file_response(
+            request,
+            field_file,
+            filename,
+            content_type,
+            as_attachment=kind in ("file", "image"),
+        )
+
+
+class HomeworkSubmissionsArchiveView(APIView):
+    """
+    View for downloading every submitted file of a homework as one ZIP.
+
+    The archive is streamed while it is built. Each student's files are in a
+    folder named after the student's e-mail.
+
+    Methods:
+        GET: Stream the ZIP archive. Course staff only.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        homework = get_object_or_404(Homework.active.select_related("course"), pk=pk)
+        if not is_course_staff(request.user, homework.course):
+            raise PermissionDenied("Only course staff can download all submissions.")
+
+        submissions = (
+            HomeworkSubmission.active.filter(homework=homework)
+            .select_related("student")
+            .only(
+                "id",
+                "submission_date",
+                "submission_file",
+                "submission_image",
+                "student__email",
+            )
+            .order_by("student__email", "id")
+        )
+
+        def entries():
+            for submission in submissions.iterator(chunk_size=500):
+                for kind in ("file", "image"):
+                    field_file = getattr(submission, SUBMISSION_FILE_FIELDS[kind])
+                    if field_file:
+                        extension = os.path.splitext(field_file.name)[1]
+                        yield (
+                            f"{submission.student.email}/"
+                            f"{submission.pk}-{kind}{extension}",
+                            field_file,
+                            submission.submission_date,
+                        )
+
+        logger.info(
+            "Submissions of homework %s downloaded by %s",
+            homework.pk,
+            request.user.email,
+        )
+        response = StreamingHttpResponse(
+            stream_zip(entries()), content_type="application/zip"
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            True, f"homework-{homework.pk}-submissions.zip"
+        )
+        return response
@@ -1,40 +1,82 @@
 import logging
-from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
+from django.conf import settings
+from rest_framework import generics, serializers, status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
+from django.http import Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework.response import Response
-from calendar import monthrange
-from rest_framework.exceptions import PermissionDenied
-from django.db.models import Q, Count, Case, When
+from datetime import timedelta
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.shortcuts import get_object_or_404
+from django.db.models import Q, Count, Prefetch
 from ..models import (
     Course,
     Homework,
     Lesson,
+    LessonSeries,
     Group,
     GroupMembership,
     HomeworkSubmission,
+    active_membership,
 )
 from ..serializers import (
     CourseSerializer,
     GroupCreateUpdateSerializer,
     TeacherCourseSerializer,
     LessonSerializer,
+    LessonSeriesSerializer,
     HomeworkSerializer,
     HomeworkSubmissionSerializer,
     HomeworkGradeSerializer,
-    LessonCalendarSerializer,
+    CalendarParamsSerializer,
+    FreeSlotsParamsSerializer,
     MembershipRoleSerializer,
+    HomeworkValuesSerializer,
+    LessonValuesSerializer,
 )
+from .. import calendar
 from ..permissions import IsCourseTeacher
-
+from ..renderers import ICalendarRenderer
+from ..schedule import Schedule, lesson_duration
+from ..series import create_series, delete_series, exclude_occurrence, update_series
+from ..thumbnails import derivative_url
+from .mixins import PermissionRelationsMixin, SparseFieldsetMixin
 
 logger = logging.getLogger("api")
 
 
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseReadMixin(SparseFieldsetMixin):
+    """
+    Load only the course columns and relations a course response renders.
+    """
+
+    def requested_courses(self, queryset, fields):
+        """
+        Restrict ``queryset`` to the columns of the serializer ``fields`` and
+        prefetch the groups and lessons they render, as IDs or embedded.
+        """
+        queryset = self.only_requested(queryset.defer("search_vector"), "teacher")
+        for name, model in (("groups", Group), ("lessons", Lesson)):
+            field = fields.get(name)
+            if field is None:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                columns = field.child.Meta.fields
+            else:
+                columns = ["id"]
+            queryset = queryset.prefetch_related(
+                Prefetch(name, queryset=model.objects.only(*columns))
+            )
+        return queryset
+
+
+class CourseListCreateView(CourseReadMixin, generics.ListCreateAPIView):
     """
     View for listing and creating courses.
     Users can view courses they are teaching or courses that are available to their groups.
+    The list accepts `?fields=` and `?include=groups,lessons`.
     """
 
     serializer_class = CourseSerializer
@@ -49,8 +91,8 @@ class CourseListCreateView(generics.ListCreateAPIView):
             QuerySet: A queryset of Course objects for the authenticated user.
         """
         user = self.request.user
-        return Course.objects.filter(
-            Q(teacher=user) | Q(groups__memberships__user=user)
+        return Course.active.filter(
+            Q(teacher=user) | active_membership(user, "groups__")
         ).distinct()
 
     def get_serializer_class(self):
@@ -62,7 +104,9 @@ class CourseListCreateView(generics.ListCreateAPIView):
         Returns:
             Serializer: The appropriate serializer class for the current user.
         """
-        if Group.objects.filter(teacher=self.request.user).exists():
+        if GroupMembership.active.filter(
+            user=self.request.user, role="teacher"
+        ).exists():
             return TeacherCourseSerializer
         return CourseSerializer
 
@@ -86,7 +130,7 @@ class CourseListCreateView(generics.ListCreateAPIView):
             course.lessons.set(lessons)
 
         group = Group.objects.create(course=course)
-        group.memberships.create(user=user, role="teacher")
+        GroupMembership.objects.create(user=user, group=group, role="teacher")
         course.groups.add(group)
 
         logger.info("Course and group created by %s: %s", user.email, course.title)
@@ -98,38 +142,92 @@ class CourseListCreateView(generics.ListCreateAPIView):
     def list(self, request, *args, **kwargs):
         """
         Handle GET requests to list all courses with additional data for pie chart and user roles.
+
+        Roles, membership counts and homework progress are computed for all
+        courses at once, so the number of queries does not grow with the
+        number of courses. Fields left out with `?fields=` are not loaded.
         """
-        queryset = self.get_queryset()
         user = request.user
+        context = self.get_serializer_context()
+        serializer_class = self.get_serializer_class()
+        fields = serializer_class(context=context).fields
+        courses = list(self.requested_courses(self.get_queryset(), fields))
+        course_ids = [course.pk for course in courses]
+
+        student_course_ids = set(
+            Course.active.filter(
+                active_membership(user, "groups__"), id__in=course_ids
+            ).values_list("id", flat=True)
+        )
+
+        # Only active groups and their active memberships are counted.
+        pie_chart_data = {}
+        group_counts = (
+            Course.groups.through.objects.filter(
+                course_id__in=course_ids, group__is_active=True
+            )
+            .values("course_id", "group_id")
+            .annotate(
+                num_students=Count(
+                    "group__groupmembership",
+                    filter=Q(
+                        group__groupmembership__role="student",
+                        group__groupmembership__is_active=True,
+                    ),
+                ),
+                num_teachers=Count(
+                    "group__groupmembership",
+                    filter=Q(
+                        group__groupmembership__role="teacher",
+                        group__groupmembership__is_active=True,
+                    ),
+                ),
+                num_assistants=Count(
+                    "group__groupmembership",
+                    filter=Q(
+                        group__groupmembership__role="assistant",
+                        group__groupmembership__is_active=True,
+                    ),
+                ),
+            )
+            .order_by("course_id", "group_id")
+        )
+        for row in group_counts:
+            pie_chart_data.setdefault(row["course_id"], []).append(
+                {
+                    "num_students": row["num_students"],
+                    "num_teachers": row["num_teachers"],
+                    "num_assistants": row["num_assistants"],
+                }
+            )
+
+        if "homework_progress" in fields:
+            context["homework_progress"] = Course.homework_progress_for(courses)
+        serializer = serializer_class(courses, many=True, context=context)
 
         courses_data = []
-        for course in queryset:
-            serializer = self.get_serializer(course)
-            is_teacher = course.teacher == user
-            is_student = course.groups.filter(memberships__user=user).exists()
+        for course, course_data in zip(courses, serializer.data):
+            is_teacher = course.teacher_id == user.id
+            is_student = course.pk in student_course_ids
 
             role = "teacher" if is_teacher else "student" if is_student else "none"
 
-            pie_chart_data = course.groups.annotate(
-                num_students=Count(Case(When(memberships__role="student", then=1))),
-                num_teachers=Count(Case(When(memberships__role="teacher", then=1))),
-                num_assistants=Count(Case(When(memberships__role="assistant", then=1))),
-            ).values("num_students", "num_teachers", "num_assistants")
-
-            course_data = {
-                "course": serializer.data,
-                "role": role,
-                "pie_chart_data": pie_chart_data,
-            }
-            courses_data.append(course_data)
+            courses_data.append(
+                {
+                    "course": course_data,
+                    "role": role,
+                    "pie_chart_data": pie_chart_data.get(course.pk, []),
+                }
+            )
 
         return Response(courses_data, status=status.HTTP_200_OK)
 
 
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CourseDetailView(CourseReadMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, or deleting a course.
     Allows access based on user roles (teacher or student in the groups).
+    Retrieval accepts `?fields=` and `?include=groups,lessons`.
 
     Attributes:
         serializer_class (CourseSerializer): Serializer for Course objects.
@@ -148,9 +246,12 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
             QuerySet: A queryset of Course objects accessible by the authenticated user.
         """
         user = self.request.user
-        return Course.objects.filter(
-            Q(teacher=user) | Q(groups__memberships__user=user)
+        queryset = Course.active.filter(
+            Q(teacher=user) | active_membership(user, "groups__")
         ).distinct()
+        if self.request.method == "GET":
+            queryset = self.requested_courses(queryset, self.get_serializer().fields)
+        return queryset
 
     def get_object(self):
         """
@@ -164,8 +265,8 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
         user = self.request.user
 
         if (
-            user != course.teacher
-            and not course.groups.filter(memberships__user=user).exists()
+            user.id != course.teacher_id
+            and not course.groups.filter(active_membership(user)).exists()
         ):
             raise PermissionDenied("You are not enrolled in this course.")
 
@@ -184,8 +285,8 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
         course = self.get_object()
         user = self.request.user
 
-        is_teacher = user == course.teacher
-        is_student = course.groups.filter(memberships__user=user).exists()
+        is_teacher = user.id == course.teacher_id
+        is_student = course.groups.filter(active_membership(user)).exists()
 
         serializer = self.get_serializer(course)
         return Response(
@@ -220,11 +321,11 @@ class CourseEditView(generics.UpdateAPIView):
         user = self.request.user
         course_id = self.kwargs.get("pk")
 
-        queryset = Course.objects.filter(id=course_id, teacher=user)
+        queryset = Course.active.filter(id=course_id, teacher=user)
 
-        first_course = Course.objects.first()
+        first_course = Course.active.first()
         if first_course and first_course not in queryset:
-            queryset = Course.objects.filter(pk=first_course.pk) | queryset
+            queryset = Course.active.filter(pk=first_course.pk) | queryset
 
         return queryset
 
@@ -248,11 +349,10 @@ class GroupCreateView(generics.CreateAPIView):
             serializer: The serializer instance containing the group data.
         """
         group = serializer.save()
-        group.memberships.create(user=self.request.user, role="teacher")
         logger.info("Group created: %s", group.name)
 
 
-class GroupEditView(generics.RetrieveUpdateDestroyAPIView):
+class GroupEditView(PermissionRelationsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view for retrieving, updating, or deleting a specific group.
 
@@ -264,7 +364,7 @@ class GroupEditView(generics.RetrieveUpdateDestroyAPIView):
 
     permission_classes = [IsAuthenticated, IsCourseTeacher]
     serializer_class = GroupCreateUpdateSerializer
-    queryset = Group.objects.all()
+    queryset = Group.active.all()
 
     def perform_update(self, serializer):
         """
@@ -287,9 +387,10 @@ class GroupEditView(generics.RetrieveUpdateDestroyAPIView):
         super().perform_destroy(instance)
 
 
-class LessonListView(generics.ListAPIView):
+class LessonListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     View for listing lessons based on user role.
+    Accepts `?fields=` and `?include=course`.
 
     Methods:
         GET: Retrieve a list of lessons for the authenticated user.
@@ -301,25 +402,37 @@ class LessonListView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         student_groups = Group.objects.filter(
-            memberships__user=user, memberships__role="student"
+            active_membership(user, role="student")
         ).values_list("id", flat=True)
 
-        student_lessons = Lesson.objects.filter(course__groups__id__in=student_groups)
-        teacher_lessons = Lesson.objects.filter(course__teacher=user)
+        student_lessons = Lesson.active.filter(course__groups__id__in=student_groups)
+        teacher_lessons = Lesson.active.filter(course__teacher=user)
 
-        return student_lessons | teacher_lessons
+        return (student_lessons | teacher_lessons).distinct().select_related("course")
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+    def get_serializer_context(self):
+        """
+        Add the IDs of the courses the user studies in, so that `user_role`
+        can be resolved without a query per lesson.
+        """
+        context = super().get_serializer_context()
+        if not self.wants("user_role"):
+            return context
+        context["student_course_ids"] = set(
+            Course.active.filter(
+                active_membership(self.request.user, "groups__", role="student")
+            ).values_list("id", flat=True)
+        )
+        return context
 
-        lessons_with_roles = []
-        for lesson in queryset:
-            lesson_data = self.get_serializer(lesson).data
-            if lesson.course.teacher == request.user:
-                lesson_data["user_role"] = "teacher"
-            else:
+    def list(self, request, *args, **kwargs):
+        serializer = LessonValuesSerializer(
+            self.get_queryset(), context=self.get_serializer_context()
+        )
+        lessons_with_roles = serializer.data
+        for lesson_data in lessons_with_roles:
+            if "user_role" in lesson_data and lesson_data["user_role"] != "teacher":
                 lesson_data["user_role"] = "student"
-            lessons_with_roles.append(lesson_data)
 
         return Response(lessons_with_roles)
 
@@ -334,7 +447,7 @@ class LessonCreateView(generics.CreateAPIView):
 
     permission_classes = [IsAuthenticated]
     serializer_class = LessonSerializer
-    queryset = Lesson.objects.all()
+    queryset = Lesson.active.all()
 
     def perform_create(self, serializer):
         """
@@ -359,7 +472,7 @@ class LessonEditView(generics.RetrieveUpdateDestroyAPIView):
 
     permission_classes = [IsAuthenticated]
     serializer_class = LessonSerializer
-    queryset = Lesson.objects.all()
+    queryset = Lesson.active.all()
 
     def perform_update(self, serializer):
         """
@@ -379,17 +492,107 @@ class LessonEditView(generics.RetrieveUpdateDestroyAPIView):
             instance: The lesson instance to be deleted.
         """
         logger.info("Lesson deleted: %s", instance.title)
+        exclude_occurrence(instance)
         super().perform_destroy(instance)
 
 
-class TeacherHomeworkDetailView(generics.RetrieveAPIView):
+class LessonSeriesMixin(PermissionRelationsMixin):
+    """
+    Shared setup of the lesson series views.
+    """
+
+    permission_classes = [IsAuthenticated, IsCourseTeacher]
+    serializer_class = LessonSeriesSerializer
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .prefetch_related(
+                Prefetch(
+                    "lessons",
+                    queryset=Lesson.active.only(
+                        "id", "title", "scheduled_time", "series"
+                    ).order_by("scheduled_time"),
+                )
+            )
+        )
+
+
+class LessonSeriesCreateView(LessonSeriesMixin, generics.CreateAPIView):
+    """
+    View for creating a series of weekly recurring lessons.
+
+    All lessons of the series are inserted at once.
+
+    Methods:
+        POST: Create a new lesson series of a course the user teaches.
+    """
+
+    queryset = LessonSeries.objects.all()
+
+    def perform_create(self, serializer):
+        """
+        Save the series with its lessons and log the creation.
+
+        Args:
+            serializer: The serializer instance containing the series data.
+        """
+        series = LessonSeries(**serializer.validated_data)
+        lessons = create_series(series, serializer.dates)
+        serializer.instance = self.get_queryset().get(pk=series.pk)
+        logger.info(
+            "Lesson series created: %s (%d lessons)", series.title, len(lessons)
+        )
+
+
+class LessonSeriesEditView(LessonSeriesMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    View for retrieving, updating, or deleting a lesson series.
+
+    Updates and deletes apply to the upcoming lessons of the series; lessons
+    that have started are kept.
+
+    Methods:
+        GET: Retrieve a series with its lessons.
+        PUT/PATCH: Update the series and its upcoming lessons.
+        DELETE: Delete the series and its upcoming lessons.
+    """
+
+    queryset = LessonSeries.objects.all()
+
+    def perform_update(self, serializer):
+        """
+        Apply the changes to the series and its lessons and log the update.
+
+        Args:
+            serializer: The serializer instance containing the updated series data.
+        """
+        series = update_series(
+            serializer.instance, serializer.validated_data, serializer.dates
+        )
+        serializer.instance = self.get_queryset().get(pk=series.pk)
+        logger.info("Lesson series updated: %s", series.title)
+
+    def perform_destroy(self, instance):
+        """
+        Log the deletion of a series before deleting it.
+
+        Args:
+            instance: The series to be deleted.
+        """
+        logger.info("Lesson series deleted: %s", instance.title)
+        delete_series(instance)
+
+
+class TeacherHomeworkDetailView(PermissionRelationsMixin, generics.RetrieveAPIView):
     """
     View for retrieving homework details from the teacher's perspective.
     Provides information on the students in the course, their submission statuses, and grades.
     """
 
     permission_classes = [IsAuthenticated, IsCourseTeacher]
-    queryset = Homework.objects.all()
+    queryset = Homework.active.select_related("lesson")
     serializer_class = HomeworkSerializer
 
     def retrieve(self, request, *args, **kwargs):
@@ -398,26 +601,36 @@ class TeacherHomeworkDetailView(generics.RetrieveAPIView):
         """
         instance = self.get_object()
         course = instance.course
-        students = GroupMembership.objects.filter(
+        students = GroupMembership.active.filter(
             group__course=course, role="student"
         ).select_related("user")
 
+        submissions = {
+            submission.student_id: submission
+            for submission in HomeworkSubmission.active.filter(
+                homework=instance
+            ).order_by("-id")
+        }
+
         student_submissions = []
         for membership in students:
             user = membership.user
-            submission = HomeworkSubmission.objects.filter(
-                homework=instance, student=user
-            ).first()
+            submission = submissions.get(user.id)
 
             student_submissions.append(
                 {
                     "student": {
                         "id": user.id,
-                        "username": user.username,
+                        "username": user.get_username(),
                         "email": user.email,
                     },
                     "submission_status": "submitted" if submission else "not_submitted",
                     "grade": submission.grade if submission else None,
+                    "thumbnail_url": (
+                        derivative_url(submission, "thumbnail", request)
+                        if submission
+                        else None
+                    ),
                 }
             )
 
@@ -427,9 +640,10 @@ class TeacherHomeworkDetailView(generics.RetrieveAPIView):
         return Response(homework_data)
 
 
-class HomeworkListCreateView(generics.ListCreateAPIView):
+class HomeworkListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
     """
     View for listing and creating homework assignments for a specific course.
+    The list accepts `?fields=` and `?include=course`.
     Methods:
         GET: Retrieve a list of all homework assignments for the specified course.
         POST: Create a new homework assignment for the specified course.
@@ -446,19 +660,22 @@ class HomeworkListCreateView(generics.ListCreateAPIView):
         course_id = self.request.query_params.get("course_id")
         user = self.request.user
 
-        logger.info(f"User: {user}, Course ID: {course_id}")
+        logger.debug(
+            "Homework list requested by user %s for course %s", user.pk, course_id
+        )
 
         if course_id is None:
             logger.warning("No course_id provided in request.")
             return Homework.objects.none()
 
-        queryset = Homework.objects.filter(
-            lesson__course_id=course_id,
-            lesson__course__is_active=True,
-        ).distinct()
-
-        logger.info(f"Retrieved queryset: {queryset}")
-        return queryset
+        return (
+            Homework.active.filter(
+                lesson__course_id=course_id,
+                lesson__course__is_active=True,
+            )
+            .select_related("lesson")
+            .distinct()
+        )
 
     def perform_create(self, serializer):
         """
@@ -467,8 +684,10 @@ class HomeworkListCreateView(generics.ListCreateAPIView):
         """
         lesson = serializer.validated_data.get("lesson")
         if lesson is None:
-            logger.error("Lesson is required to create homework.")
-            raise ValueError("Lesson is required to create homework.")
+            logger.warning("Lesson is required to create homework.")
+            raise ValidationError(
+                {"lesson": ["Lesson is required to create homework."]}
+            )
 
         homework = serializer.save(submitted_by=self.request.user, course=lesson.course)
 
@@ -483,8 +702,9 @@ class HomeworkListCreateView(generics.ListCreateAPIView):
         """
         Handle GET requests to list all homework assignments with lesson information.
         """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = HomeworkValuesSerializer(
+            self.get_queryset(), context=self.get_serializer_context()
+        )
         return Response(serializer.data)
 
 
@@ -494,7 +714,7 @@ class HomeworkDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
 
     permission_classes = [IsAuthenticated]
-    queryset = Homework.objects.all()
+    queryset = Homework.active.select_related("course", "lesson")
     serializer_class = HomeworkSerializer
 
     def retrieve(self, request, *args, **kwargs):
@@ -504,24 +724,30 @@ class HomeworkDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         user = request.user
 
-        if user != instance.course.teacher:
+        if user.id != instance.course.teacher_id:
             return Response(
                 {"error": "Only the course teacher can view this information."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        submissions = HomeworkSubmission.objects.filter(homework=instance)
-        students = GroupMembership.objects.filter(
+        submissions = list(HomeworkSubmission.active.filter(homework=instance))
+        students = GroupMembership.active.filter(
             group__course=instance.course, role="student"
-        )
+        ).select_related("user")
 
         submission_data = HomeworkSubmissionSerializer(submissions, many=True).data
         students_data = [
             {
                 "student": student.user.email,
-                "submitted": any(sub.user == student.user for sub in submissions),
+                "submitted": any(
+                    sub.student_id == student.user_id for sub in submissions
+                ),
                 "grade": next(
-                    (sub.grade for sub in submissions if sub.student == student.user),
+                    (
+                        sub.grade
+                        for sub in submissions
+                        if sub.student_id == student.user_id
+                    ),
                     None,
                 ),
             }
@@ -545,7 +771,7 @@ class HomeworkEditView(generics.RetrieveUpdateAPIView):
     """
 
     permission_classes = [IsAuthenticated]
-    queryset = Homework.objects.all()
+    queryset = Homework.active.all()
     serializer_class = HomeworkSerializer
 
     def perform_update(self, serializer):
@@ -578,7 +804,7 @@ class HomeworkSubmissionView(generics.CreateAPIView):
             serializer: The serializer instance containing the submission data.
         """
         homework_submission = serializer.save(student=self.request.user)
-        logger.info("Homework submitted by: %s", homework_submission.student.username)
+        logger.info("Homework submitted by: %s", homework_submission.student.email)
 
 
 class HomeworkGradeView(generics.UpdateAPIView):
@@ -591,7 +817,7 @@ class HomeworkGradeView(generics.UpdateAPIView):
 
     permission_classes = [IsAuthenticated]
     serializer_class = HomeworkGradeSerializer
-    queryset = HomeworkSubmission.objects.all()
+    queryset = HomeworkSubmission.active.all()
 
     def perform_update(self, serializer):
         """
@@ -604,50 +830,122 @@ class HomeworkGradeView(generics.UpdateAPIView):
         logger.info("Homework graded: %s", homework_submission.homework.title)
 
 
-class LessonCalendarView(generics.ListAPIView):
+class LessonCalendarView(APIView):
     """
     View for displaying lessons in a calendar format.
 
+    Ranges are read from the per-user, per-month calendar cache (see
+    `api.calendar`).
+
     Methods:
-        GET: Retrieve a list of lessons in a calendar format.
+        GET: Retrieve the lessons from `?start=` to `?end=` (inclusive dates,
+            the current month by default).
     """
 
     permission_classes = [IsAuthenticated]
-    serializer_class = LessonCalendarSerializer
 
-    def get_queryset(self):
-        """
-        Return lessons for the current month based on user role.
+    def get(self, request):
+        params = CalendarParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        lessons = calendar.lessons_between(
+            request.user,
+            calendar.day_start(data["start"]),
+            calendar.day_start(data["end"] + timedelta(days=1)),
+        )
+        return Response(lessons)
 
-        Returns:
-            QuerySet: A filtered queryset of lessons for the authenticated user.
-        """
-        user = self.request.user
-        now = timezone.now()
-        start_date = now.replace(day=1).date()
-        end_date = now.replace(day=monthrange(now.year, now.month)[1]).date()
 
-        user_courses = Course.objects.filter(student_groups__students=user).values_list(
-            "id", flat=True
-        )
+class CalendarFeedLinkView(APIView):
+    """
+    View for getting the iCalendar subscription URL of the user.
 
-        user_teaching_courses = Course.objects.filter(teacher=user).values_list(
-            "id", flat=True
-        )
+    The URL contains a token instead of a JWT, so calendar apps can poll it.
+    Changing the password revokes it.
 
-        if user.user_type == "teacher":
-            return Lesson.objects.filter(
-                course__id__in=user_teaching_courses,
-                scheduled_time__date__range=(start_date, end_date),
-            )
+    Methods:
+        GET: Retrieve `{"url": ...}`.
+    """
 
-        elif user.user_type == "student":
-            return Lesson.objects.filter(
-                course__id__in=user_courses,
-                scheduled_time__date__range=(start_date, end_date),
-            )
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        url = reverse("lesson_calendar_feed", args=[calendar.feed_token(request.user)])
+        return Response({"url": request.build_absolute_uri(url)})
+
+
+class CalendarFeedView(APIView):
+    """
+    iCalendar feed of the lessons of a user, from
+    `CALENDAR_FEED_PAST_DAYS` ago to `CALENDAR_FEED_FUTURE_DAYS` ahead.
+
+    Methods:
+        GET: Retrieve the feed. Answers `If-None-Match` with
+            `304 Not Modified` without loading any lessons.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [ICalendarRenderer]
+
+    def get(self, request, token):
+        user = calendar.user_for_feed_token(token)
+        if user is None:
+            raise Http404
 
-        return Lesson.objects.none()
+        start, end = calendar.feed_window()
+        version = calendar.calendar_version(user)
+        etag = calendar.feed_etag(user, start, version)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            rows = calendar.lessons_between(user, start, end, version)
+            response = Response(calendar.render_ics(rows, "Lessons"))
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class FreeSlotsView(APIView):
+    """
+    View for finding lesson times at which the user and every member of a
+    group are free.
+
+    Slots are found in the interval index of `api.schedule`, up to
+    `SCHEDULE_SEARCH_DAYS` ahead.
+
+    Methods:
+        GET: Retrieve the next `?count=` free slots of `?group=` from
+            `?after=`, as `{"start": ..., "end": ...}` objects.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = FreeSlotsParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        group = data["group"]
+        teaches = Group.active.filter(
+            Q(course__teacher=request.user)
+            | active_membership(request.user, role="teacher"),
+            pk=group.pk,
+        ).exists()
+        if not teaches:
+            raise PermissionDenied("You do not teach this group.")
+
+        start = data["after"]
+        end = start + timedelta(days=settings.SCHEDULE_SEARCH_DAYS)
+        slots = Schedule(request.user.pk, [group.pk], start, end).free_slots(
+            data["count"]
+        )
+        to_time = serializers.DateTimeField().to_representation
+        duration = lesson_duration()
+        return Response(
+            [
+                {"start": to_time(slot), "end": to_time(slot + duration)}
+                for slot in slots
+            ]
+        )
 
 
 class ReminderView(generics.ListAPIView):
@@ -669,18 +967,20 @@ class ReminderView(generics.ListAPIView):
             QuerySet: A filtered queryset of homework reminders for the authenticated user.
         """
         user = self.request.user
-        is_teacher = user.groups.filter(name="Teachers").exists()
 
-        if is_teacher:
+        if self.is_teacher:
             return (
-                Homework.objects.filter(submitted_by__isnull=False)
+                Homework.active.filter(course__teacher=user)
                 .select_related("lesson", "lesson__course")
-                .order_by("review_deadline")
+                .order_by("due_date")
             )
         else:
             return (
-                Homework.objects.filter(lesson__course__groups__students=user)
+                Homework.active.filter(
+                    active_membership(user, "lesson__course__groups__")
+                )
                 .select_related("lesson", "lesson__course")
+                .distinct()
                 .order_by("due_date")
             )
 
@@ -688,19 +988,19 @@ class ReminderView(generics.ListAPIView):
         """
         List all homework reminders and customize the response message based on user type.
         """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        self.is_teacher = GroupMembership.active.filter(
+            user=request.user, role="teacher"
+        ).exists()
+        serializer = HomeworkValuesSerializer(
+            self.get_queryset(), context=self.get_serializer_context()
+        )
 
         return Response(
             {
-                "type": (
-                    "teacher"
-                    if request.user.groups.filter(name="Teachers").exists()
-                    else "student"
-                ),
+                "type": "teacher" if self.is_teacher else "student",
                 "message": (
                     "You have homeworks to review"
-                    if request.user.groups.filter(name="Teachers").exists()
+                    if self.is_teacher
                     else "You have homeworks due soon"
                 ),
                 "data": serializer.data,
@@ -723,7 +1023,11 @@ class ChangeRoleView(generics.UpdateAPIView):
         """
         group_id = self.kwargs.get("group_id")
         user_id = self.kwargs.get("user_id")
-        return GroupMembership.objects.get(group_id=group_id, user_id=user_id)
+        return get_object_or_404(
+            GroupMembership.objects.select_related("group__course"),
+            group_id=group_id,
+            user_id=user_id,
+        )
 
     def update(self, request, *args, **kwargs):
         """
@@ -732,12 +1036,13 @@ class ChangeRoleView(generics.UpdateAPIView):
         """
         membership = self.get_object()
         current_user = request.user
-        course_owner = membership.group.course.teacher
+        course = membership.group.course
+        course_owner_id = course.teacher_id if course else None
 
         if (
             "role" in request.data
             and request.data["role"] == "teacher"
-            and current_user != course_owner
+            and current_user.id != course_owner_id
         ):
             return Response(
                 {"detail": "Only course owner can assign teachers."},
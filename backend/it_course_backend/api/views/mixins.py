@@ -0,0 +1,84 @@
+"""
+Mixins shared by API views.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+
+from ..serializers.sparse import split_names
+
+
+class SparseFieldsetMixin:
+    """
+    Pass ``?fields=`` and ``?include=`` of read requests to the serializer.
+
+    The view can use ``wants()`` and ``only_requested()`` to skip queries and
+    columns the response does not contain.
+    """
+
+    @cached_property
+    def sparse_fieldset(self):
+        """Return the requested ``fields`` and ``include`` names of the request."""
+        if self.request.method not in SAFE_METHODS:
+            return {}
+        params = self.request.query_params
+        fieldset = {}
+        if "fields" in params:
+            fieldset["fields"] = split_names(params["fields"])
+        if "include" in params:
+            fieldset["include"] = split_names(params["include"])
+        return fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.sparse_fieldset)
+        return context
+
+    def wants(self, name):
+        """Return whether the response contains the field ``name``."""
+        fields = self.sparse_fieldset.get("fields")
+        return (
+            fields is None
+            or name in fields
+            or name in self.sparse_fieldset.get("include", ())
+        )
+
+    def only_requested(self, queryset, *required):
+        """
+        Load only the requested columns, plus ``required`` ones, when
+        ``?fields=`` is given.
+        """
+        fields = self.sparse_fieldset.get("fields")
+        if fields is None:
+            return queryset
+        wanted = fields | self.sparse_fieldset.get("include", set())
+        columns = {
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if field.name in wanted
+        }
+        return queryset.only("pk", *columns, *required)
+
+
+class PermissionRelationsMixin:
+    """
+    Fetch the relations that object permissions read with the object.
+
+    Permission classes list them in ``object_relations``; those that are
+    foreign keys of the view's model are added to ``select_related()``, so
+    ``check_object_permissions()`` runs no queries.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        relations = []
+        for permission in self.get_permissions():
+            for name in getattr(permission, "object_relations", ()):
+                try:
+                    field = queryset.model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+                if field.many_to_one or field.one_to_one:
+                    relations.append(name)
+        return queryset.select_related(*relations) if relations else queryset
@@ -0,0 +1,52 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Group
+from ..permissions import IsCourseTeacher
+from ..search import SEARCH_TYPES, group_candidates, search
+from ..serializers import AutocompleteParamsSerializer, SearchParamsSerializer
+
+
+class SearchView(APIView):
+    """
+    View for full-text search over courses, lessons and homework.
+
+    Only objects of courses the user teaches or is a member of are returned,
+    best matches first.
+
+    Methods:
+        GET: Search with `?q=`, optionally narrowed with `?type=` and `?limit=`.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = SearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        types = [data["type"]] if "type" in data else SEARCH_TYPES
+        results = search(request.user, data["q"], types=types, limit=data["limit"])
+        return Response({"query": data["q"], "results": results})
+
+
+class GroupStudentAutocompleteView(APIView):
+    """
+    View for finding users to add to a group as students.
+
+    Only teachers of the group may use it. Users who are already members
+    of the group are left out.
+
+    Methods:
+        GET: Look users up with `?q=` (at least 3 characters) and `?limit=`.
+    """
+
+    permission_classes = [IsAuthenticated, IsCourseTeacher]
+
+    def get(self, request, group_id):
+        group = get_object_or_404(Group, pk=group_id)
+        params = AutocompleteParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        return Response(group_candidates(group, data["q"], limit=data["limit"]))
@@ -0,0 +1,146 @@
+import logging
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import uploads
+from ..models import ChunkedUpload
+from ..serializers import ChunkedUploadSerializer, UploadCompleteSerializer
+
+logger = logging.getLogger("api")
+
+
+class UserUploadMixin:
+    """Restrict uploads to the ones started by the requesting user."""
+
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(user=self.request.user)
+
+    def get_pending_upload(self, pk):
+        upload = get_object_or_404(self.get_queryset(), pk=pk)
+        if uploads.is_assembling(upload):
+            raise ValidationError({"status": "The upload is being completed."})
+        # An upload whose claim was abandoned is pending again.
+        if upload.status not in ("pending", "assembling"):
+            raise ValidationError({"status": "The upload is already complete."})
+        return upload
+
+
+class UploadCreateView(generics.CreateAPIView):
+    """
+    View for starting a chunked upload.
+
+    Methods:
+        POST: Declare the file name, content type and size of an upload and
+            receive its ID and chunk size.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ChunkedUploadSerializer
+
+    def perform_create(self, serializer):
+        upload = serializer.save(
+            user=self.request.user, chunk_size=settings.UPLOAD_CHUNK_SIZE
+        )
+        logger.info("Upload %s started by %s", upload.pk, self.request.user.email)
+
+
+class UploadDetailView(UserUploadMixin, generics.RetrieveDestroyAPIView):
+    """
+    View for the progress of an upload.
+
+    Methods:
+        GET: Retrieve the upload, including the indexes of received chunks.
+        DELETE: Abort the upload and remove its chunks.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ChunkedUploadSerializer
+
+    def perform_destroy(self, instance):
+        if instance.status == "attached":
+            raise ValidationError({"status": "Attached uploads cannot be deleted."})
+        if uploads.is_assembling(instance):
+            raise ValidationError({"status": "The upload is being completed."})
+        uploads.discard(instance)
+
+
+class UploadChunkView(UserUploadMixin, APIView):
+    """
+    View for sending one chunk of an upload.
+
+    The request body is the raw chunk, which is streamed to disk instead of
+    being parsed, and the `X-Chunk-Checksum` header carries its SHA-256 hex
+    digest. Chunks may be sent in any order, in parallel, and re-sent.
+
+    Methods:
+        PUT: Store the chunk at `index`.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, pk, index):
+        upload = self.get_pending_upload(pk)
+        checksum = request.headers.get("X-Chunk-Checksum", "")
+        if len(checksum) != 64:
+            raise ValidationError(
+                {"checksum": "X-Chunk-Checksum must be a SHA-256 hex digest."}
+            )
+        try:
+            content_length = int(request.headers.get("Content-Length") or 0)
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            raise ValidationError(
+                {"chunk": "Content-Length must be a non-negative integer."}
+            )
+        if index < upload.total_chunks and content_length != upload.chunk_length(index):
+            raise ValidationError(
+                {"chunk": f"Chunk {index} must be {upload.chunk_length(index)} bytes."}
+            )
+
+        try:
+            uploads.write_chunk(upload, index, request.stream, checksum)
+        except uploads.UploadError as exc:
+            raise ValidationError({"chunk": str(exc)})
+        return Response({"index": index, "size": content_length})
+
+
+class UploadCompleteView(UserUploadMixin, APIView):
+    """
+    View for completing an upload once every chunk has been sent.
+
+    Methods:
+        POST: Assemble the chunks in the storage backend and return the
+            completed upload.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        serializer = UploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = self.get_pending_upload(pk)
+        # A concurrent complete request sees the upload as being completed
+        # instead of assembling it a second time.
+        if not uploads.claim(upload):
+            raise ValidationError({"status": "The upload is being completed."})
+        try:
+            uploads.assemble(
+                upload,
+                serializer.validated_data.get("checksum") or upload.checksum,
+            )
+        except uploads.UploadError as exc:
+            raise ValidationError({"upload": str(exc)})
+        finally:
+            if upload.status == "assembling":
+                uploads.release(upload)
+
+        logger.info("Upload %s completed (%s bytes)", upload.pk, upload.size)
+        return Response(ChunkedUploadSerializer(upload).data, status=status.HTTP_200_OK)
@@ -122,7 +122,7 @@ class RegisterView(generics.CreateAPIView):
         """
         Handle user registration.
         """
-        logger.info("Registration request: %s", request.data)
+        logger.info("Registration request for %s", request.data.get("email"))
         serializer = self.get_serializer(data=request.data)
 
         if serializer.is_valid():
@@ -301,7 +301,7 @@ class ChangeEmailView(UpdateAPIView):
 
         logger.warning(
             "User %s failed to change email: %s",
-            request.user.username,
+            request.user.email,
             serializer.errors,
         )
         return Response(
@@ -331,7 +331,7 @@ class ConfirmEmailView(generics.GenericAPIView):
             user.save()
 
             logger.info(
-                "User %s has successfully confirmed their email.", user.username
+                "User %s has successfully confirmed their email.", user.email
             )
             return Response(
                 {
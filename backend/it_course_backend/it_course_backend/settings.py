@@ -3,6 +3,7 @@ Django settings for the IT Course Backend project.
 This module contains the main configuration settings.
 """
 
+import sys
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
@@ -32,6 +33,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "api",
     "rest_framework",
@@ -45,23 +47,78 @@ SITE_ID = 1
 # Middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.CompressionMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    "api.middleware.ServerTimingMiddleware",
+    "api.nplusone.NPlusOneMiddleware",
+    "api.middleware.ReplicaRoutingMiddleware",
+    # The API authenticates with JWT: sessions, CSRF, Django's request.user
+    # and messages are skipped under API_PATH_PREFIX (see api.middleware).
+    "api.middleware.BrowserSessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "api.middleware.BrowserCsrfViewMiddleware",
+    "api.middleware.BrowserAuthenticationMiddleware",
+    "api.middleware.BrowserMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+API_PATH_PREFIX = "/api/"
+
+# Per-request performance instrumentation (see api.middleware). Off by
+# default; when on, the Server-Timing header is only sent to staff users,
+# or to everyone while DEBUG is on.
+PERF_INSTRUMENTATION_ENABLED = config(
+    "PERF_INSTRUMENTATION_ENABLED", default=False, cast=bool
+)
+PERF_PATH_PREFIX = "/api/"
+PERF_SLOW_REQUEST_MS = config("PERF_SLOW_REQUEST_MS", default=500, cast=int)
+PERF_MAX_CAPTURED_QUERIES = config("PERF_MAX_CAPTURED_QUERIES", default=100, cast=int)
+
+# Response compression (see api.middleware.CompressionMiddleware)
+COMPRESSION_PATH_PREFIX = "/api/"
+COMPRESSION_MIN_SIZE = config("COMPRESSION_MIN_SIZE", default=1024, cast=int)
+COMPRESSION_CACHE_TIMEOUT = config(
+    "COMPRESSION_CACHE_TIMEOUT", default=300, cast=int
+)
+
+# N+1 query detection (see api.nplusone): "raise" in tests, "log" on staging
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+NPLUSONE_MODE = config("NPLUSONE_MODE", default="raise" if TESTING else "off")
+NPLUSONE_THRESHOLD = config("NPLUSONE_THRESHOLD", default=5, cast=int)
+
 # Authentication backends
 AUTHENTICATION_BACKENDS = (
-    "django.contrib.auth.backends.ModelBackend",
+    "api.backends.CachedModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
     "api.backends.EmailBackend",
 )
 
+# Cache shared by every process. Calendar versions (see api.calendar) are
+# bumped by whichever process changes lessons, including cron commands, so
+# all web workers and commands must read the same cache: set REDIS_URL in
+# production. Without it each process gets its own memory cache, which is
+# only correct for a single development server; the api.E001 check refuses
+# it when DEBUG is off.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Permission sets of users are cached across requests (see api.backends)
+PERMISSION_CACHE_TIMEOUT = config("PERMISSION_CACHE_TIMEOUT", default=300, cast=int)
+
 ROOT_URLCONF = "it_course_backend.urls"
 
 # Templates
@@ -85,7 +142,16 @@ TEMPLATES = [
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly",
-        "rest_framework.renderers.JSONRenderer",
+    ],
+    # JSON goes through orjson (see api.renderers and api.parsers).
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -127,6 +193,33 @@ DATABASES = {
     }
 }
 
+# Read replicas: one alias per host in DATABASE_REPLICA_HOSTS ("replica1",
+# "replica2", ...). Reads of safe API requests go to a random replica (see
+# api.routers); a client that wrote reads from the primary for
+# DATABASE_REPLICA_PIN_SECONDS afterwards. Tests only use the replicas they
+# enable themselves.
+DATABASE_REPLICA_HOSTS = config("DATABASE_REPLICA_HOSTS", default="", cast=Csv())
+for index, host in enumerate(DATABASE_REPLICA_HOSTS, start=1):
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "NAME": config("DATABASE_REPLICA_NAME", default=DATABASES["default"]["NAME"]),
+        "USER": config("DATABASE_REPLICA_USER", default=DATABASES["default"]["USER"]),
+        "PASSWORD": config(
+            "DATABASE_REPLICA_PASSWORD", default=DATABASES["default"]["PASSWORD"]
+        ),
+        "HOST": host,
+        "PORT": config("DATABASE_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = (
+    [] if TESTING else [alias for alias in DATABASES if alias.startswith("replica")]
+)
+DATABASE_REPLICA_PIN_SECONDS = config(
+    "DATABASE_REPLICA_PIN_SECONDS", default=10, cast=int
+)
+DATABASE_REPLICA_PIN_COOKIE = "pin_primary"
+DATABASE_ROUTERS = ["api.routers.ReplicaRouter"]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -146,6 +239,91 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = "/static/"
 
+# Uploaded files. Submitted files go to the "submissions" storage, which
+# keeps one copy of each distinct file under its SHA-256 digest.
+MEDIA_URL = "/media/"
+MEDIA_ROOT = config("MEDIA_ROOT", default=str(BASE_DIR / "media"))
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+    "submissions": {"BACKEND": "api.storage.ContentAddressedStorage"},
+}
+
+# How stored files are sent: "django" streams them from the worker with
+# Range support; "nginx" (X-Accel-Redirect to FILE_ACCEL_REDIRECT_PREFIX,
+# an internal location aliased to MEDIA_ROOT) and "sendfile" (X-Sendfile)
+# leave the transfer to the front server.
+FILE_DOWNLOAD_BACKEND = config("FILE_DOWNLOAD_BACKEND", default="django")
+FILE_ACCEL_REDIRECT_PREFIX = config(
+    "FILE_ACCEL_REDIRECT_PREFIX", default="/protected-media/"
+)
+
+# Completed courses whose last lesson is older than this are moved to the
+# archive tables by `manage.py archive_courses`.
+ARCHIVE_COURSES_AFTER_DAYS = config(
+    "ARCHIVE_COURSES_AFTER_DAYS", default=365, cast=int
+)
+
+# Courses are marked completed by `manage.py advance_course_states` once
+# their last lesson is older than this.
+COURSE_COMPLETE_AFTER_DAYS = config(
+    "COURSE_COMPLETE_AFTER_DAYS", default=7, cast=int
+)
+
+# Calendars (see api.calendar): cached months are invalidated when lessons,
+# courses or memberships change, so they can be kept long. The timeout also
+# bounds how long a change made without the signals stays unnoticed.
+CALENDAR_CACHE_TIMEOUT = config("CALENDAR_CACHE_TIMEOUT", default=86400, cast=int)
+CALENDAR_MAX_DAYS = 366
+CALENDAR_FEED_PAST_DAYS = config("CALENDAR_FEED_PAST_DAYS", default=30, cast=int)
+CALENDAR_FEED_FUTURE_DAYS = config("CALENDAR_FEED_FUTURE_DAYS", default=180, cast=int)
+LESSON_DURATION_MINUTES = config("LESSON_DURATION_MINUTES", default=90, cast=int)
+
+# Lesson series (see api.series): most lessons one series can create.
+LESSON_SERIES_MAX_OCCURRENCES = 200
+
+# Scheduling (see api.schedule): free slots start every SCHEDULE_SLOT_MINUTES
+# and lessons fit between SCHEDULE_DAY_START and SCHEDULE_DAY_END, local time.
+# Free slots are looked for up to SCHEDULE_SEARCH_DAYS ahead.
+SCHEDULE_DAY_START = config("SCHEDULE_DAY_START", default="09:00")
+SCHEDULE_DAY_END = config("SCHEDULE_DAY_END", default="21:00")
+SCHEDULE_SLOT_MINUTES = 30
+SCHEDULE_SEARCH_DAYS = 60
+SCHEDULE_MAX_SLOTS = 50
+
+# Chunked uploads: chunks are kept in UPLOAD_TEMP_DIR until the upload is
+# completed, which must be shared by all workers that serve the API.
+UPLOAD_TEMP_DIR = config("UPLOAD_TEMP_DIR", default=str(BASE_DIR / "uploads_tmp"))
+UPLOAD_CHUNK_SIZE = config("UPLOAD_CHUNK_SIZE", default=5 * 1024 * 1024, cast=int)
+UPLOAD_MAX_SIZE = config("UPLOAD_MAX_SIZE", default=200 * 1024 * 1024, cast=int)
+# A claim older than this is taken to belong to a crashed worker, and the
+# upload can be completed or deleted again.
+UPLOAD_CLAIM_TIMEOUT = config("UPLOAD_CLAIM_TIMEOUT", default=15 * 60, cast=int)
+# Unattached uploads older than this are removed by expire_uploads.
+UPLOAD_EXPIRY_HOURS = config("UPLOAD_EXPIRY_HOURS", default=24, cast=int)
+UPLOAD_ALLOWED_TYPES = {
+    "application/pdf": [".pdf"],
+    "application/zip": [".zip"],
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": [
+        ".docx"
+    ],
+    "text/plain": [".txt", ".py", ".md"],
+    "image/png": [".png"],
+    "image/jpeg": [".jpg", ".jpeg"],
+    "image/gif": [".gif"],
+    "image/webp": [".webp"],
+}
+
+# Thumbnails and previews of submitted images, rendered by a thread pool
+# after the submission is saved (synchronously while testing).
+THUMBNAIL_ASYNC = config("THUMBNAIL_ASYNC", default=not TESTING, cast=bool)
+THUMBNAIL_WORKERS = config("THUMBNAIL_WORKERS", default=2, cast=int)
+IMAGE_THUMBNAIL_SIZE = (200, 200)
+IMAGE_PREVIEW_SIZE = (1280, 1280)
+IMAGE_DERIVATIVE_QUALITY = config("IMAGE_DERIVATIVE_QUALITY", default=80, cast=int)
+
 # Default auto field for models
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "api.User"
@@ -178,37 +356,69 @@ GOOGLE_CLIENT_SECRET = config(
 )
 
 # Logging configuration
+# Records are queued on the request thread and written as JSON lines by a
+# background listener, so logging never blocks a request.
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+LOG_SAMPLE_RATE = config("LOG_SAMPLE_RATE", default=0.1, cast=float)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
-        "verbose": {
-            "format": "{levelname} {asctime} {module} {message}",
-            "style": "{",
+        "json": {
+            "()": "api.log.JSONFormatter",
         },
         "simple": {
             "format": "{levelname} {message}",
             "style": "{",
         },
     },
+    "filters": {
+        "sampled": {
+            "()": "api.log.SamplingFilter",
+            "rate": LOG_SAMPLE_RATE,
+            "max_level": "INFO",
+        },
+    },
     "handlers": {
         "file": {
             "level": "DEBUG",
             "class": "logging.FileHandler",
             "filename": LOGS_DIR / "django.log",
-            "formatter": "verbose",
+            "formatter": "json",
             "encoding": "UTF-8",
         },
+        "queue": {
+            "()": "api.log.QueueListenerHandler",
+            "handlers": ["cfg://handlers.file"],
+        },
     },
     "loggers": {
         "django": {
-            "handlers": ["file"],
-            "level": "DEBUG",
-            "propagate": True,
+            "handlers": ["queue"],
+            "level": config("DJANGO_LOG_LEVEL", default=LOG_LEVEL),
+            "propagate": False,
+        },
+        "django.db.backends": {
+            "handlers": ["queue"],
+            "level": config("DB_LOG_LEVEL", default="WARNING"),
+            "propagate": False,
+        },
+        "django.server": {
+            "handlers": ["queue"],
+            "level": "INFO",
+            "filters": ["sampled"],
+            "propagate": False,
         },
         "api": {
-            "handlers": ["file"],
-            "level": "DEBUG",
+            "handlers": ["queue"],
+            "level": config("API_LOG_LEVEL", default=LOG_LEVEL),
+            "propagate": False,
+        },
+        "api.perf": {
+            "handlers": ["queue"],
+            "level": "INFO",
+            "filters": ["sampled"],
             "propagate": False,
         },
     },